@@ -0,0 +1,75 @@
+"""
+Synthetic job corpus shaped like data/job_posts/*.csv.
+
+Rows are resampled from the scraped CSVs. Each synthetic job gets a unique URL,
+a description built from the lines of a real one in shuffled order (so lengths and
+salary mentions follow the real distribution), and the card text the scraper would
+have read from the search results list.
+"""
+
+import sys
+import glob
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from utils.file_path import JD_DIR  # noqa: E402
+
+
+SCRAPED_COLUMNS = ['Job Title', 'Company', 'Location', 'Posted Time', 'Posted Ago',
+                   'Reposted', 'Salary', 'URL', 'Job Description']
+
+# Used only when no scraped CSVs exist yet.
+FALLBACK_SEED = pd.DataFrame([
+    {'Job Title': 'Machine Learning Engineer', 'Company': 'Shopify', 'Location': 'Toronto, ON (Hybrid)',
+     'Posted Time': '', 'Posted Ago': '3 hours ago', 'Reposted': False, 'Salary': '$120,000 - $150,000 CAD',
+     'URL': '', 'Job Description': "About the job\nWe build ML systems.\nSalary range: $120,000 - $150,000 CAD.\n"
+                                    "You know Python, PyTorch and SQL.\nBenefits include RRSP matching."},
+    {'Job Title': 'Data Scientist', 'Company': 'RBC', 'Location': 'Toronto, ON (On-site)',
+     'Posted Time': '', 'Posted Ago': '1 day ago', 'Reposted': False, 'Salary': '',
+     'URL': '', 'Job Description': "About the job\nAnalyze customer data.\nStrong statistics background.\n"
+                                    "Experience with Spark is an asset."},
+])
+
+
+def load_seed(pattern: str = None) -> pd.DataFrame:
+    """Reads the scraped CSVs used as the shape of the corpus."""
+    paths = sorted(glob.glob(pattern or str(JD_DIR / '*.csv')))
+    if not paths:
+        return FALLBACK_SEED.copy()
+    seed = pd.concat([pd.read_csv(p, keep_default_na=False) for p in paths], ignore_index=True)
+    return seed.reindex(columns=SCRAPED_COLUMNS).fillna('')
+
+
+def card_text(title: str, company: str, location: str, posted_ago: str) -> str:
+    """Search-result card text in the layout parse_card_text expects."""
+    return f"{title}\n{title}\n\n{company}\n\n{location}\n\n{posted_ago or '1 hour ago'}"
+
+
+def make_corpus(n: int, seed: pd.DataFrame = None, repost_rate: float = 0.15, random_state: int = 0) -> pd.DataFrame:
+    """
+    Generates n synthetic scraped jobs plus a 'Card Text' column.
+
+    Args:
+        n (int): Number of jobs.
+        seed (pd.DataFrame): Scraped jobs to resample. Defaults to load_seed().
+        repost_rate (float): Share of jobs flagged as reposted.
+        random_state (int): Seed for reproducible corpora.
+    """
+    rng = np.random.default_rng(random_state)
+    seed = load_seed() if seed is None else seed
+    df = seed.iloc[rng.integers(0, len(seed), n)].reset_index(drop=True)
+
+    descriptions = []
+    for text in df['Job Description']:
+        lines = text.split('\n')
+        head, body = lines[:1], lines[1:]
+        rng.shuffle(body)
+        descriptions.append('\n'.join(head + body))
+    df['Job Description'] = descriptions
+    df['URL'] = [f"https://www.linkedin.com/jobs/view/{4_000_000_000 + i}/" for i in range(n)]
+    df['Reposted'] = rng.random(n) < repost_rate
+    df['Card Text'] = [card_text(*fields) for fields in
+                       zip(df['Job Title'], df['Company'], df['Location'], df['Posted Ago'])]
+    return df
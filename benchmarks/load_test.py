@@ -0,0 +1,172 @@
+"""
+Load test for DeepseekMatcher.process_job_data and SalaryParser.process_df against the mock LLM server.
+
+Starts benchmarks/mock_llm.py in-process (or uses --url for one already running), runs both
+stages over a synthetic corpus and reports throughput, client-side latency percentiles
+(including the OpenAI client's own retries) and the server's status counts.
+
+    python benchmarks/load_test.py --jobs 200 --openai-latency lognormal:800,0.5 --rate-429 0.05
+    python benchmarks/load_test.py --jobs 500 --stages salary --ollama-latency fixed:50
+    python benchmarks/load_test.py --jobs 200 --stages match cascade --band 50 85
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import functools
+import urllib.request
+from pathlib import Path
+from datetime import datetime
+
+from corpus import make_corpus
+from mock_llm import MockLLMServer, add_fault_arguments, state_from_args
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+RESUME_TEXT = """Jane Doe
+jane@example.com | Toronto, ON
+
+SUMMARY
+Machine learning engineer with 5 years of experience shipping ranking and NLP models.
+
+SKILLS
+Python, PyTorch, scikit-learn, SQL, Spark, Docker, AWS, MLflow
+
+EXPERIENCE
+Senior ML Engineer, Acme Corp (2022-present): built a real-time ranking service serving 20M requests/day.
+ML Engineer, Beta Inc (2019-2022): trained and deployed text classification models.
+
+EDUCATION
+M.Sc. Computer Science, University of Toronto
+"""
+
+
+def percentiles(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {}
+
+    def pct(p):
+        return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1)
+    return {'p50_ms': pct(0.5), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99), 'max_ms': round(values[-1] * 1000, 1)}
+
+
+def timed(method, latencies: list):
+    """Wraps a bound method so each call's wall time is appended to `latencies`."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def server_stats(url: str, reset: bool = False) -> dict:
+    if reset:
+        urllib.request.urlopen(urllib.request.Request(f"{url}/reset", data=b'{}', method='POST')).read()
+        return {}
+    return json.loads(urllib.request.urlopen(f"{url}/stats").read())
+
+
+def run_match(url: str, df, resume_path: Path, token_budget: int, band=None) -> dict:
+    """Runs process_job_data; with a band, in cascade mode with the mock as the local model too."""
+    from deepseek_jd_resume_matcher import DeepseekMatcher, cascade_report
+    matcher = DeepseekMatcher(api_key='mock', base_url=url)
+    latencies = []
+    matcher._evaluate_match = timed(matcher._evaluate_match, latencies)
+    cascade = {'local_model': 'llama3.1', 'band': tuple(band), 'host': url} if band else None
+
+    server_stats(url, reset=True)
+    start = time.perf_counter()
+    result = matcher.process_job_data(
+        df=df.copy(), resume=str(resume_path), filename='load_test.csv',
+        csv_export=False, resume_token_budget=token_budget, persist=False, cascade=cascade
+    )
+    elapsed = time.perf_counter() - start
+    errors = 0 if result is None else int(result['Reasoning'].astype(str).str.startswith('API Error').sum())
+    report = {
+        'jobs': len(df),
+        'seconds': round(elapsed, 2),
+        'jobs_per_s': round(len(df) / elapsed, 2),
+        'failed_jobs': errors,
+        'remote_calls': len(latencies),
+        **percentiles(latencies),
+        'server': server_stats(url),
+    }
+    if cascade and result is not None:
+        report['cascade'] = cascade_report(result)
+    return report
+
+
+def run_salary(url: str, df) -> dict:
+    from salary_parser import SalaryParser
+    parser = SalaryParser(model_name='llama3.1', host=url)
+    latencies = []
+    parser.parse = timed(parser.parse, latencies)
+
+    frame = df.copy()
+    server_stats(url, reset=True)
+    start = time.perf_counter()
+    parser.process_df(frame)
+    elapsed = time.perf_counter() - start
+    failed = int((frame.get('Currency') == 'Error').sum()) if 'Currency' in frame else len(frame)
+    calls = int((frame['Salary'].astype(str).str.strip() != '').sum())
+    return {
+        'jobs': len(frame),
+        'llm_calls': calls,
+        'seconds': round(elapsed, 2),
+        'jobs_per_s': round(len(frame) / elapsed, 2),
+        'failed_jobs': failed,
+        **percentiles(latencies),
+        'server': server_stats(url),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the matcher and salary parser against a mock LLM.")
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--stages', nargs='+', default=['match', 'salary'], choices=['match', 'cascade', 'salary'])
+    parser.add_argument('--band', type=int, nargs=2, default=[50, 85], help="Cascade uncertainty band.")
+    parser.add_argument('--url', default=None, help="Use an already running mock server instead of starting one.")
+    parser.add_argument('--resume-token-budget', type=int, default=1000)
+    parser.add_argument('--output', type=Path, default=None)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    df = make_corpus(args.jobs).drop(columns=['Card Text'])
+    report = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'args': vars(args) | {'output': None}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        resume_path = Path(tmp) / 'resume.txt'
+        resume_path.write_text(RESUME_TEXT, encoding='utf-8')
+
+        server = None if args.url else MockLLMServer(state_from_args(args)).__enter__()
+        url = args.url or server.url
+        try:
+            if 'salary' in args.stages:
+                report['salary'] = run_salary(url, df)
+                print(f"salary: {json.dumps(report['salary'])}")
+            if 'match' in args.stages:
+                report['match'] = run_match(url, df, resume_path, args.resume_token_budget)
+                print(f"match:  {json.dumps(report['match'])}")
+            if 'cascade' in args.stages:
+                report['cascade'] = run_match(url, df, resume_path, args.resume_token_budget, band=args.band)
+                print(f"cascade: {json.dumps(report['cascade'])}")
+        finally:
+            if server:
+                server.__exit__(None, None, None)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = args.output or RESULTS_DIR / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+    print(f"Saved {output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Local stand-in for the DeepSeek (OpenAI-compatible) and Ollama chat APIs.
+
+Serves:
+
+    POST /chat/completions, /v1/chat/completions   OpenAI chat completion (DeepseekMatcher)
+    POST /api/chat                                 Ollama chat, non-streaming (SalaryParser, cascade matching)
+    GET  /stats                                    request, status and latency counters
+    POST /reset                                    clears the counters
+
+Each request sleeps for a latency drawn from a distribution, may be rejected with 429
+(random or over a requests-per-second limit) or 500, may return malformed JSON content,
+and otherwise answers with canned JSON: a match result for chat completions and a
+salary range for Ollama (a match result when the prompt asks for match_score, as in
+cascade mode). Canned answers can be replaced with --match-json/--salary-json
+(a JSON object, or a list of objects cycled through).
+
+    python benchmarks/mock_llm.py --port 8089 --openai-latency lognormal:800,0.5 --rate-429 0.05
+"""
+
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import itertools
+from pathlib import Path
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+DEFAULT_MATCH = [
+    {"match_score": 86, "reasoning": "Strong overlap in Python, PyTorch and MLOps. Seniority matches the role.",
+     "missing_skills": ["Kubernetes"]},
+    {"match_score": 72, "reasoning": "Core ML skills match. Missing the domain experience the team asks for.",
+     "missing_skills": ["Spark", "Airflow"]},
+    {"match_score": 41, "reasoning": "Role requires French and 10+ years of leadership. Large seniority gap.",
+     "missing_skills": ["French", "People management"]},
+]
+DEFAULT_SALARY = [
+    {"min": 110000, "max": 150000, "currency": "CAD"},
+    {"min": 0, "max": 0, "currency": "N/A"},
+    {"min": 95000, "max": 120000, "currency": "USD"},
+]
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Builds a latency sampler (seconds) from 'fixed:MS', 'uniform:LO,HI', 'exponential:MEAN'
+    or 'lognormal:MEDIAN,SIGMA' (all in milliseconds).
+    """
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'fixed':
+        return lambda: values[0] / 1000
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == 'exponential':
+        return lambda: random.expovariate(1 / values[0]) / 1000
+    if kind == 'lognormal':
+        mu, sigma = math.log(values[0]), values[1]
+        return lambda: random.lognormvariate(mu, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution '{spec}'.")
+
+
+def load_canned(path: str, default: List[dict]) -> List[dict]:
+    if not path:
+        return default
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    return data if isinstance(data, list) else [data]
+
+
+class MockLLMState:
+    """Fault injection settings plus thread-safe counters, shared by all request handlers."""
+
+    def __init__(self, openai_latency: str = 'lognormal:800,0.5', ollama_latency: str = 'lognormal:300,0.4',
+                 rate_429: float = 0.0, rps_limit: float = None, error_rate: float = 0.0,
+                 malformed_rate: float = 0.0, match_outputs: List[dict] = None, salary_outputs: List[dict] = None,
+                 seed: int = None):
+        self.openai_latency = parse_latency(openai_latency)
+        self.ollama_latency = parse_latency(ollama_latency)
+        self.rate_429 = rate_429
+        self.rps_limit = rps_limit
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.match_outputs = itertools.cycle(match_outputs or DEFAULT_MATCH)
+        self.salary_outputs = itertools.cycle(salary_outputs or DEFAULT_SALARY)
+        if seed is not None:
+            random.seed(seed)
+        self._lock = threading.Lock()
+        self._window = []  # request times in the last second, for rps_limit
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self.latencies = []
+
+    def record(self, endpoint: str, status: int, latency: float = None):
+        with self._lock:
+            key = f"{endpoint} {status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+            if latency is not None:
+                self.latencies.append(latency)
+
+    def admit(self) -> int:
+        """Returns the status to inject for a new request (200 = serve normally)."""
+        with self._lock:
+            now = time.monotonic()
+            self._window = [t for t in self._window if now - t < 1.0]
+            if self.rps_limit and len(self._window) >= self.rps_limit:
+                return 429
+            self._window.append(now)
+        if random.random() < self.rate_429:
+            return 429
+        if random.random() < self.error_rate:
+            return 500
+        return 200
+
+    def next_output(self, kind: str) -> str:
+        with self._lock:
+            output = next(self.match_outputs if kind == 'match' else self.salary_outputs)
+        if random.random() < self.malformed_rate:
+            return '{"match_score": 7'  # truncated JSON
+        return json.dumps(output)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counts = dict(self.counts)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+        return {'counts': counts, 'served': len(latencies), 'p50_ms': pct(0.5), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99)}
+
+
+def _estimate_tokens(messages) -> int:
+    return sum(len(str(m.get('content', ''))) for m in messages) // 4
+
+
+def make_handler(state: MockLLMState):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_json(self) -> dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send(200, state.stats())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/reset':
+                self._read_json()
+                state.reset()
+                self._send(200, {'ok': True})
+                return
+            if self.path in ('/chat/completions', '/v1/chat/completions'):
+                endpoint, latency = 'openai', state.openai_latency
+            elif self.path == '/api/chat':
+                endpoint, latency = 'ollama', state.ollama_latency
+            else:
+                self._send(404, {'error': 'not found'})
+                return
+
+            request = self._read_json()
+            status = state.admit()
+            if status == 429:
+                state.record(endpoint, 429)
+                self._send(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                           {'Retry-After': '1'})
+                return
+            delay = latency()
+            time.sleep(delay)
+            if status == 500:
+                state.record(endpoint, 500)
+                self._send(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+                return
+
+            messages = request.get('messages', [])
+            asks_match = endpoint == 'openai' or any('match_score' in str(m.get('content', '')) for m in messages)
+            content = state.next_output('match' if asks_match else 'salary')
+            state.record(endpoint, 200, delay)
+            if endpoint == 'openai':
+                prompt_tokens = _estimate_tokens(messages)
+                completion_tokens = len(content) // 4
+                self._send(200, {
+                    'id': f"mock-{time.time_ns()}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'mock'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {
+                        'prompt_tokens': prompt_tokens,
+                        'completion_tokens': completion_tokens,
+                        'total_tokens': prompt_tokens + completion_tokens,
+                        'prompt_cache_hit_tokens': 0,
+                        'prompt_cache_miss_tokens': prompt_tokens,
+                    },
+                })
+            else:
+                self._send(200, {
+                    'model': request.get('model', 'mock'),
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'message': {'role': 'assistant', 'content': content},
+                    'done': True,
+                    'done_reason': 'stop',
+                    'total_duration': int(delay * 1e9),
+                    'prompt_eval_count': _estimate_tokens(messages),
+                    'eval_count': len(content) // 4,
+                })
+
+    return Handler
+
+
+class MockLLMServer:
+    """Runs the mock server in a background thread, e.g. from the load-test harness."""
+
+    def __init__(self, state: MockLLMState = None, host: str = '127.0.0.1', port: int = 0):
+        self.state = state or MockLLMState()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='MockLLM', daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--openai-latency', default='lognormal:800,0.5',
+                        help="fixed:MS | uniform:LO,HI | exponential:MEAN | lognormal:MEDIAN,SIGMA")
+    parser.add_argument('--ollama-latency', default='lognormal:300,0.4')
+    parser.add_argument('--rate-429', type=float, default=0.0, help="Probability of a random 429.")
+    parser.add_argument('--rps-limit', type=float, default=None, help="Return 429 above this many requests/second.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 500.")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Probability of truncated JSON content.")
+    parser.add_argument('--match-json', default=None, help="Canned chat completion content (object or list).")
+    parser.add_argument('--salary-json', default=None, help="Canned Ollama content (object or list).")
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def state_from_args(args) -> MockLLMState:
+    return MockLLMState(
+        openai_latency=args.openai_latency,
+        ollama_latency=args.ollama_latency,
+        rate_429=args.rate_429,
+        rps_limit=args.rps_limit,
+        error_rate=args.error_rate,
+        malformed_rate=args.malformed_rate,
+        match_outputs=load_canned(args.match_json, DEFAULT_MATCH),
+        salary_outputs=load_canned(args.salary_json, DEFAULT_SALARY),
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible and Ollama chat server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockLLMServer(state_from_args(args), args.host, args.port)
+    print(f"Mock LLM server on {server.url}  (DeepSeek base_url={server.url}, Ollama host={server.url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Local stand-in for the Supabase PostgREST endpoints used by data_uploader.
+
+Serves:
+
+    POST /rest/v1/<table>?on_conflict=<column>   upsert (a JSON object or a list of objects)
+    GET  /rest/v1/<table>                        every stored row of the table
+    GET  /stats                                  request and status counters
+    POST /reset                                  clears the tables and counters
+
+Rows are kept in memory per table, keyed by the on_conflict column, so repeated upserts
+of the same key replace the row just as PostgREST's merge-duplicates does. A batch that
+holds the same key twice is rejected with the 500 Postgres raises for it. Failures can be
+injected at random (--error-rate) or for the next N upserts (fail_next), which is how the
+uploader's retry and outbox paths are exercised.
+
+    python benchmarks/mock_postgrest.py --port 8090 --error-rate 0.1
+    SUPABASE_URL=http://127.0.0.1:8090 SUPABASE_API_KEY=mock.mock.mock python src/main.py
+"""
+
+import json
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# create_client only accepts JWT-shaped keys; the stand-in never checks it.
+MOCK_API_KEY = 'mock.mock.mock'
+
+
+class MockPostgrestState:
+    """In-memory tables, fault injection settings and counters, shared by all request handlers."""
+
+    def __init__(self, error_rate: float = 0.0, seed: int = None):
+        self.error_rate = error_rate
+        if seed is not None:
+            random.seed(seed)
+        self._lock = threading.Lock()
+        self._fail_next = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.tables = {}
+            self.counts = {}
+            self.batches = []  # (table, rows) of every accepted upsert
+
+    def fail_next(self, n: int = 1):
+        """Answers the next n upserts with 503."""
+        with self._lock:
+            self._fail_next += n
+
+    def admit(self) -> int:
+        with self._lock:
+            if self._fail_next:
+                self._fail_next -= 1
+                return 503
+        return 500 if random.random() < self.error_rate else 200
+
+    def record(self, endpoint: str, status: int):
+        with self._lock:
+            key = f"{endpoint} {status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def upsert(self, table: str, rows: list, on_conflict: str = None) -> str:
+        """Stores rows; returns an error message instead when Postgres would reject the batch."""
+        keys = [row.get(on_conflict) for row in rows] if on_conflict else []
+        if on_conflict and len(set(map(str, keys))) < len(keys):
+            return 'ON CONFLICT DO UPDATE command cannot affect row a second time'
+        with self._lock:
+            stored = self.tables.setdefault(table, {})
+            for i, row in enumerate(rows):
+                stored[str(keys[i]) if on_conflict else f"#{len(stored)}"] = row
+            self.batches.append((table, len(rows)))
+        return None
+
+    def rows(self, table: str) -> list:
+        with self._lock:
+            return list(self.tables.get(table, {}).values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'counts': dict(self.counts),
+                'batches': len(self.batches),
+                'rows': {table: len(rows) for table, rows in self.tables.items()},
+            }
+
+
+def make_handler(state: MockPostgrestState):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def _table(self, path: str) -> str:
+            return path[len('/rest/v1/'):] if path.startswith('/rest/v1/') else None
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            table = self._table(url.path)
+            if url.path == '/stats':
+                self._send(200, state.stats())
+            elif table:
+                state.record('select', 200)
+                self._send(200, state.rows(table))
+            else:
+                self._send(404, {'message': 'not found'})
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path == '/reset':
+                self._read_json()
+                state.reset()
+                self._send(200, {'ok': True})
+                return
+            table = self._table(url.path)
+            if not table:
+                self._send(404, {'message': 'not found'})
+                return
+
+            body = self._read_json()
+            rows = body if isinstance(body, list) else [body]
+            status = state.admit()
+            if status != 200:
+                state.record('upsert', status)
+                self._send(status, {'code': 'PGRST000', 'message': 'Injected server error', 'details': None, 'hint': None})
+                return
+            on_conflict = parse_qs(url.query).get('on_conflict', [None])[0]
+            error = state.upsert(table, rows, on_conflict)
+            if error:
+                state.record('upsert', 500)
+                self._send(500, {'code': '21000', 'message': error, 'details': None, 'hint': None})
+                return
+            state.record('upsert', 201)
+            self._send(201, rows)
+
+    return Handler
+
+
+class MockPostgrestServer:
+    """Runs the stand-in server in a background thread, e.g. from a test."""
+
+    def __init__(self, state: MockPostgrestState = None, host: str = '127.0.0.1', port: int = 0):
+        self.state = state or MockPostgrestState()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='MockPostgrest', daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Supabase PostgREST server for upload tests.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 500 on an upsert.")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockPostgrestServer(MockPostgrestState(args.error_rate, args.seed), args.host, args.port)
+    print(f"Mock PostgREST server on {server.url}  (SUPABASE_URL={server.url}, SUPABASE_API_KEY={MOCK_API_KEY})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
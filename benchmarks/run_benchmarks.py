@@ -0,0 +1,218 @@
+"""
+CPU-side benchmarks for the CareerCopilot pipeline over a synthetic job corpus.
+
+Times (best and median of --repeat runs) and measures peak Python memory (tracemalloc,
+in a separate run) for the non-network hot paths:
+
+    card_parse       utils.job_text.parse_card_text on search-result card text
+    collect          job_records.JobBatch append + to_frame (the scraper's in-memory job list)
+    salary_extract   clean_description + extract_salary (salary spans) on card text, title and description
+    filter           job_filter.filter_eligible_jobs
+    token_count      deepseek_jd_resume_matcher.count_tokens (on a sample, see --token-sample)
+    assemble         deepseek_jd_resume_matcher.assemble_match_results
+    serialize        data_uploader.prepare_records + record_hash
+
+Results go to benchmarks/results/<timestamp>_<commit>.json. Pass --compare with an
+earlier result file to print the change per benchmark.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000
+    python benchmarks/run_benchmarks.py --sizes 10000 --compare benchmarks/results/<earlier>.json
+"""
+
+import gc
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict
+
+from corpus import make_corpus, load_seed
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+FILTER_PARAMS = {
+    'company_list': ['Shopify', 'RBC', 'TD', 'Google'],
+    'salary': True,
+    'repost': False,
+    'csv_export': False,
+    'user_name': 'bench',
+    'search': {'keyword': 'Machine Learning', 'city': 'Toronto, Ontario, Canada'},
+}
+
+
+def git_commit() -> str:
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(run: Callable, setup: Callable = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    Times run(setup()) `repeat` times, then once more under tracemalloc for peak memory.
+    setup() is excluded from both.
+    """
+    setup = setup or (lambda: None)
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        gc.collect()
+        start = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - start)
+
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'peak_mb': peak / 2**20}
+
+
+def build_benchmarks(df: pd.DataFrame, token_sample: int) -> Dict[str, tuple]:
+    """name -> (item count, run, setup), or (reason, None, None) when the module cannot be imported."""
+    from utils.job_text import parse_card_text, clean_description, extract_salary
+    benchmarks = {}
+
+    cards = df['Card Text'].tolist()
+    benchmarks['card_parse'] = (len(cards), lambda _: [parse_card_text(t) for t in cards], None)
+
+    from job_records import JobBatch
+    parsed = [parse_card_text(t) for t in cards]
+    rows = list(zip(parsed, df['Reposted'], df['Salary'], df['URL'], df['Job Description']))
+
+    def collect(_):
+        batch = JobBatch()
+        for card, reposted, salary, url, description in rows:
+            batch.append(card, reposted, salary, url, description)
+        batch.to_frame()
+        batch.close()
+    benchmarks['collect'] = (len(rows), collect, None)
+
+    salary_inputs = list(zip(df['Job Description'], cards, df['Job Title']))
+    benchmarks['salary_extract'] = (
+        len(salary_inputs),
+        lambda _: [extract_salary(clean_description(d), pill=c.split('\n\n', 1)[1] if '\n\n' in c else '', title=t) for d, c, t in salary_inputs],
+        None
+    )
+
+    scraped = df.drop(columns=['Card Text'])
+    try:
+        from job_filter import filter_eligible_jobs
+        benchmarks['filter'] = (len(scraped), lambda _: filter_eligible_jobs(scraped, FILTER_PARAMS), None)
+    except ImportError as e:
+        benchmarks['filter'] = (f"skipped: {e}", None, None)
+
+    try:
+        from deepseek_jd_resume_matcher import count_tokens, assemble_match_results
+        sample = df['Job Description'].tolist()[:token_sample]
+        count_tokens('warm up the encoder')
+        benchmarks['token_count'] = (len(sample), lambda _: [count_tokens(d) for d in sample], None)
+
+        rng = np.random.default_rng(0)
+        results = pd.DataFrame({
+            0: rng.integers(0, 100, len(scraped)),
+            1: ['Strong overlap in Python and ML. Missing cloud experience.'] * len(scraped),
+            2: [['Kubernetes', 'AWS']] * len(scraped),
+        })
+        eligible = scraped.assign(**{'Min Salary': 100000, 'Max Salary': 150000, 'Currency': 'CAD'})
+        benchmarks['assemble'] = (
+            len(eligible), lambda d: assemble_match_results(d, results), lambda: eligible.copy()
+        )
+    except ImportError as e:
+        benchmarks['token_count'] = benchmarks['assemble'] = (f"skipped: {e}", None, None)
+
+    try:
+        from data_uploader import prepare_records, record_hash
+        benchmarks['serialize'] = (
+            len(scraped), lambda _: [record_hash(r) for r in prepare_records(scraped, FILTER_PARAMS)], None
+        )
+    except ImportError as e:
+        benchmarks['serialize'] = (f"skipped: {e}", None, None)
+    return benchmarks
+
+
+def run_size(n: int, seed: pd.DataFrame, repeat: int, token_sample: int, only=None) -> Dict[str, dict]:
+    df = make_corpus(n, seed)
+    results = {}
+    for name, (items, run, setup) in build_benchmarks(df, token_sample).items():
+        if only and name not in only:
+            continue
+        if run is None:
+            results[name] = {'skipped': items}
+            print(f"  {name:<16}{items}")
+            continue
+        stats = measure(run, setup, repeat)
+        stats['items'] = items
+        stats['us_per_item'] = stats['best_s'] / max(items, 1) * 1e6
+        results[name] = stats
+        print(f"  {name:<16}{stats['best_s']:>9.3f}s {stats['us_per_item']:>10.1f}us/item {stats['peak_mb']:>9.1f}MB peak")
+    return results
+
+
+def compare(current: dict, previous_path: Path):
+    previous = json.loads(Path(previous_path).read_text(encoding='utf-8'))
+    print(f"\nChange vs {previous.get('commit')} ({previous_path}):")
+    for size, benches in current['results'].items():
+        for name, stats in benches.items():
+            old = previous.get('results', {}).get(size, {}).get(name)
+            if not old or 'best_s' not in old or 'best_s' not in stats:
+                continue
+            ratio = stats['best_s'] / old['best_s'] if old['best_s'] else float('nan')
+            mem = stats['peak_mb'] - old['peak_mb']
+            print(f"  n={size:<8}{name:<16}time x{ratio:5.2f}   peak {mem:+8.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CPU-side pipeline on a synthetic corpus.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Corpus sizes (jobs).")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--token-sample', type=int, default=2000, help="Descriptions used for token counting.")
+    parser.add_argument('--only', nargs='*', help="Run only these benchmarks.")
+    parser.add_argument('--seed-csv', default=None, help="Glob of scraped CSVs to shape the corpus.")
+    parser.add_argument('--output', type=Path, default=None, help="Result file (default: results/<time>_<commit>.json).")
+    parser.add_argument('--compare', type=Path, default=None, help="Earlier result file to compare against.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    seed = load_seed(args.seed_csv)
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed_rows': len(seed),
+        'repeat': args.repeat,
+        'results': {},
+    }
+    for n in args.sizes:
+        print(f"n={n}")
+        report['results'][str(n)] = run_size(n, seed, args.repeat, args.token_sample, args.only)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}.json"
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Saved {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
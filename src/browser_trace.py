@@ -0,0 +1,132 @@
+import re
+import random
+import shutil
+import logging
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import BrowserContext, TimeoutError as PlaywrightTimeoutError
+from utils.file_path import LOG_DIR
+from utils import tracing
+
+TRACE_DIR = LOG_DIR / 'traces'
+
+
+class ChunkOutcome:
+    """Handle yielded by ChunkedTracer.chunk(); call fail() to have the window persisted."""
+
+    __slots__ = ('reason',)
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+
+    def fail(self, reason: str):
+        # The first reason wins: a bot check found while handling a timeout stays 'timeout'
+        self.reason = self.reason or reason
+
+
+class ChunkedTracer:
+    """
+    Playwright tracing for production runs: one trace chunk per unit of work (a card,
+    a results page), of which only the last `window` are kept.
+
+    Each chunk is written to a fixed set of ring slots in a temporary directory, so
+    disk use stays at `window` chunks however long the run. When a unit fails (an
+    exception, a selector timeout, a bot check, or a card that produced no job) the
+    whole window, oldest first, is copied to TRACE_DIR/<time>_<reason>/ and can be
+    opened with `playwright show-trace`. Successful chunks are also kept with
+    probability `sample_rate`.
+
+    Sources are not recorded; screenshots and DOM snapshots are.
+    """
+
+    def __init__(self, context: BrowserContext, window: int = 5, sample_rate: float = 0.0,
+                 directory: Path = TRACE_DIR):
+        self.tracing = context.tracing
+        self.window = max(1, int(window))
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._ring_dir = Path(tempfile.mkdtemp(prefix='trace_ring_'))
+        self._ring = deque()  # (chunk name, slot path), most recent last
+        self._slot = 0
+        self.saved = 0
+        self.tracing.start(name='linkedin_scraping_trace', screenshots=True, snapshots=True, sources=False)
+        self.tracing.stop_chunk()  # start() opens a chunk implicitly; chunk() opens its own
+        self.logger.info(f"Sampled tracing started (window={self.window}, sample_rate={self.sample_rate}).")
+
+    @contextmanager
+    def chunk(self, name: str):
+        """
+        Records everything inside the block as one chunk.
+
+        Exceptions propagate; they mark the chunk as failed ('timeout' for Playwright
+        timeouts, 'error' otherwise).
+        """
+        outcome = ChunkOutcome()
+        try:
+            self.tracing.start_chunk(title=name)
+        except Exception as e:
+            self.logger.debug(f"Could not start trace chunk {name}: {e}")
+            yield outcome
+            return
+        try:
+            yield outcome
+        except PlaywrightTimeoutError:
+            outcome.fail('timeout')
+            raise
+        except Exception:
+            outcome.fail('error')
+            raise
+        finally:
+            self._finish(name, outcome.reason)
+
+    def _finish(self, name: str, reason: Optional[str]):
+        path = self._ring_dir / f"{self._slot}.zip"
+        self._slot = (self._slot + 1) % self.window
+        try:
+            self.tracing.stop_chunk(path=str(path))
+        except Exception as e:
+            self.logger.debug(f"Could not stop trace chunk {name}: {e}")
+            return
+        self._ring.append((name, path))
+        if len(self._ring) > self.window:
+            self._ring.popleft()  # Its slot has just been overwritten
+
+        if reason:
+            self.persist(reason)
+        elif self.sample_rate and random.random() < self.sample_rate:
+            self.persist('sampled', latest_only=True)
+
+    def persist(self, reason: str, latest_only: bool = False) -> Optional[Path]:
+        """Copies the window (or only the latest chunk) out of the ring. Returns the directory."""
+        chunks = list(self._ring)[-1:] if latest_only else list(self._ring)
+        if not chunks:
+            return None
+        dest = self.directory / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{reason}"
+        try:
+            dest.mkdir(parents=True, exist_ok=True)
+            for i, (name, path) in enumerate(chunks):
+                shutil.copyfile(path, dest / f"{i:02d}_{re.sub(r'[^A-Za-z0-9_-]+', '_', name)}.zip")
+        except OSError as e:
+            self.logger.warning(f"Failed to save trace chunks to {dest}: {e}")
+            return None
+        if not latest_only:
+            self._ring.clear()  # Already saved; the next failure gets a fresh window
+        self.saved += 1
+        tracing.set_attributes(browser_trace=str(dest))
+        log = self.logger.debug if latest_only else self.logger.warning
+        log(f"Saved {len(chunks)} trace chunk(s) ({reason}) to {dest}")
+        return dest
+
+    def close(self):
+        """Stops tracing without writing the pending chunk and removes the ring."""
+        try:
+            self.tracing.stop()
+        except Exception as e:
+            self.logger.debug(f"Could not stop tracing: {e}")
+        shutil.rmtree(self._ring_dir, ignore_errors=True)
+        self.logger.info(f"Sampled tracing stopped. {self.saved} trace(s) saved to {self.directory}")
@@ -0,0 +1,230 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+import pandas as pd
+from datetime import datetime, timedelta
+from pathlib import Path
+from utils.file_path import BUDGET_PATH
+from utils import metrics
+
+# USD per million tokens for deepseek-chat; override with api_budget.pricing in the config.
+DEFAULT_PRICING = {
+    'input_per_mtok': 0.28,
+    'cached_input_per_mtok': 0.028,
+    'output_per_mtok': 0.42,
+}
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int, cache_hit_tokens: int = 0, pricing: dict = None) -> float:
+    """Estimated USD cost of one call. Cache-hit prompt tokens are billed at the cached rate."""
+    pricing = {**DEFAULT_PRICING, **(pricing or {})}
+    cache_hit_tokens = min(cache_hit_tokens or 0, prompt_tokens or 0)
+    return (
+        ((prompt_tokens or 0) - cache_hit_tokens) * pricing['input_per_mtok']
+        + cache_hit_tokens * pricing['cached_input_per_mtok']
+        + (completion_tokens or 0) * pricing['output_per_mtok']
+    ) / 1_000_000
+
+
+class BudgetGovernor:
+    """
+    Daily token / dollar limit on LLM calls, shared by every run and process on this machine.
+
+    Usage is summed per calendar day in a small SQLite file. Before each call, acquire()
+    compares today's usage with the limits:
+
+    - below throttle_at of a limit: the call goes ahead;
+    - between throttle_at and the limit: the call is delayed, up to max_delay seconds as
+      usage approaches the limit, which spreads the remaining budget over the day;
+    - at or over a limit: the call is refused and the caller defers the job.
+
+    Deferred jobs are stored with their full row and put back in front of the next run's
+    jobs for the same user and keyword (take_deferred) until they are scored (settle). A job keeps the time it was first
+    deferred, and is dropped once that is deferred_max_days old, so a backlog that never
+    clears cannot grow without bound.
+    """
+
+    def __init__(self, daily_tokens: int = None, daily_usd: float = None, throttle_at: float = 0.8,
+                 max_delay: float = 10.0, pricing: dict = None, deferred_max_days: float = 3,
+                 path: Path = BUDGET_PATH):
+        """
+        Args:
+            daily_tokens (int): Total tokens per day across runs. None = unlimited.
+            daily_usd (float): Estimated USD per day across runs. None = unlimited.
+            throttle_at (float): Share of a limit after which calls are slowed down.
+            max_delay (float): Delay in seconds just below the limit.
+            pricing (dict): Overrides for DEFAULT_PRICING.
+            deferred_max_days (float): Deferred jobs older than this are dropped. None = kept until scored.
+            path (Path): SQLite file holding daily usage and deferred jobs.
+        """
+        self.daily_tokens = daily_tokens
+        self.daily_usd = daily_usd
+        self.throttle_at = throttle_at
+        self.max_delay = max_delay
+        self.pricing = {**DEFAULT_PRICING, **(pricing or {})}
+        self.deferred_max_days = deferred_max_days
+        self.resumed = {}  # (user, keyword, url) -> first deferral time of the jobs take_deferred returned
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._throttle_logged = False
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                day TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                calls INTEGER NOT NULL DEFAULT 0,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, provider)
+            );
+            CREATE TABLE IF NOT EXISTS deferred (
+                user TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                url TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                deferred_at TEXT NOT NULL,
+                PRIMARY KEY (user, keyword, url)
+            );
+            """
+        )
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'BudgetGovernor':
+        """Builds a governor from params['api_budget']. Without daily limits it only meters spend."""
+        budget = params.get('api_budget') or {}
+        return cls(
+            daily_tokens=budget.get('daily_tokens'),
+            daily_usd=budget.get('daily_usd'),
+            throttle_at=budget.get('throttle_at') or 0.8,
+            max_delay=budget.get('max_delay', 10.0),
+            pricing=budget.get('pricing'),
+            deferred_max_days=budget.get('deferred_max_days', 3),
+        )
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime('%Y-%m-%d')
+
+    def usage(self) -> dict:
+        """Today's calls, tokens and cost summed over providers."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(calls), 0), COALESCE(SUM(tokens), 0), COALESCE(SUM(cost), 0) FROM usage WHERE day = ?",
+                (self._today(),)
+            ).fetchone()
+        return {'calls': row[0], 'tokens': row[1], 'cost': row[2]}
+
+    def used_ratio(self) -> float:
+        """The larger of today's token and dollar usage as a share of its limit (0 without limits)."""
+        used = self.usage()
+        ratios = [0.0]
+        if self.daily_tokens:
+            ratios.append(used['tokens'] / self.daily_tokens)
+        if self.daily_usd:
+            ratios.append(used['cost'] / self.daily_usd)
+        return max(ratios)
+
+    def acquire(self) -> bool:
+        """Returns False once a daily limit is reached; otherwise waits out any throttle delay and returns True."""
+        if not self.daily_tokens and not self.daily_usd:
+            return True
+        ratio = self.used_ratio()
+        metrics.set_gauge('budget_used_ratio', round(ratio, 4))
+        if ratio >= 1:
+            return False
+        if ratio >= self.throttle_at:
+            delay = self.max_delay * (ratio - self.throttle_at) / max(1 - self.throttle_at, 1e-9)
+            if not self._throttle_logged:
+                self.logger.warning(f"{ratio:.0%} of today's API budget used. Throttling LLM calls.")
+                self._throttle_logged = True
+            time.sleep(delay)
+        return True
+
+    def record(self, prompt_tokens: int, completion_tokens: int, cache_hit_tokens: int = 0,
+               provider: str = 'deepseek') -> float:
+        """Adds one call to today's usage. Returns its estimated cost."""
+        cost = estimate_cost(prompt_tokens, completion_tokens, cache_hit_tokens, self.pricing)
+        tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO usage (day, provider, calls, tokens, cost) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(day, provider) DO UPDATE SET calls = calls + 1, tokens = tokens + excluded.tokens, "
+                "cost = cost + excluded.cost",
+                (self._today(), provider, tokens, cost)
+            )
+        return cost
+
+    def defer(self, df: pd.DataFrame, user: str, keyword: str) -> int:
+        """
+        Stores jobs (full rows, keyed by URL) for the next run of this user and keyword.
+        Jobs that were already deferred keep their first deferral time.
+        """
+        if df is None or df.empty:
+            return 0
+        records = json.loads(df.to_json(orient='records', date_format='iso', force_ascii=False))
+        now = datetime.now().isoformat(timespec='seconds')
+        user, keyword = user or '', keyword or ''
+        rows = []
+        for i, r in enumerate(records):
+            url = str(r.get('URL') or i)
+            rows.append((user, keyword, url, json.dumps(r, ensure_ascii=False), self.resumed.get((user, keyword, url), now)))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO deferred (user, keyword, url, payload, deferred_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user, keyword, url) DO UPDATE SET payload = excluded.payload, "
+                "deferred_at = MIN(deferred.deferred_at, excluded.deferred_at)", rows
+            )
+        metrics.inc('jobs_deferred_total', len(rows))
+        self.logger.warning(f"Deferred {len(rows)} jobs to the next run.")
+        return len(rows)
+
+    def take_deferred(self, df: pd.DataFrame, user: str, keyword: str) -> pd.DataFrame:
+        """
+        Puts the deferred jobs of this user and keyword in front of df, skipping URLs df already
+        has. They stay in the store until settle() removes them once scored, so a run that fails
+        or is killed leaves them for the next one. Jobs past deferred_max_days are dropped
+        (for every user) instead.
+        """
+        user, keyword = user or '', keyword or ''
+        with self._lock, self.conn:
+            if self.deferred_max_days is not None:
+                cutoff = (datetime.now() - timedelta(days=self.deferred_max_days)).isoformat(timespec='seconds')
+                expired = self.conn.execute("DELETE FROM deferred WHERE deferred_at < ?", (cutoff,)).rowcount
+                if expired:
+                    metrics.inc('jobs_deferred_expired_total', expired)
+                    self.logger.warning(f"Dropped {expired} deferred jobs older than {self.deferred_max_days} days.")
+            rows = self.conn.execute(
+                "SELECT url, payload, deferred_at FROM deferred WHERE user = ? AND keyword = ? ORDER BY deferred_at",
+                (user, keyword)
+            ).fetchall()
+        if not rows:
+            return df
+        self.resumed.update({(user, keyword, url): deferred_at for url, _, deferred_at in rows})
+        deferred = pd.DataFrame([json.loads(payload) for _, payload, _ in rows])
+        if 'URL' in df.columns and 'URL' in deferred.columns:
+            deferred = deferred[~deferred['URL'].isin(df['URL'])]
+        self.logger.info(f"Resuming {len(deferred)} jobs deferred by an earlier run.")
+        return pd.concat([deferred, df], ignore_index=True) if len(deferred) else df
+
+    def settle(self, df: pd.DataFrame, user: str, keyword: str) -> int:
+        """Removes scored jobs (by URL) from the deferred store of this user and keyword. Returns how many."""
+        if df is None or df.empty or 'URL' not in df.columns:
+            return 0
+        user, keyword = user or '', keyword or ''
+        urls = [(user, keyword, str(url)) for url in df['URL']]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("DELETE FROM deferred WHERE user = ? AND keyword = ? AND url = ?", urls)
+            settled = self.conn.total_changes - before
+        for key in urls:
+            self.resumed.pop(key, None)
+        return settled
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,218 @@
+import time
+_START = time.perf_counter()
+
+import sys
+import argparse
+import builtins
+import logging
+from pathlib import Path
+from contextlib import contextmanager, nullcontext
+from utils.logger import setup_logging
+from utils.config_loader import get_run_parameters
+from utils.file_path import CONFIG_DIR
+
+# Each stage imports its own dependencies inside its handler, so `filter` never pays for
+# Playwright, `parse-salary` never pays for openai/tiktoken, and so on.
+
+
+class ImportReport:
+    """
+    Records how long each module takes to import, like `python -X importtime`, but summarized.
+
+    Wraps builtins.__import__ while active. Self time excludes nested imports,
+    cumulative time includes them; both are in milliseconds.
+    """
+
+    def __init__(self):
+        self.timings = {}  # top-level package -> [self_ms, cumulative_ms]
+        self._stack = []  # [package, ms spent in nested imports] per import in progress
+        self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        package = name.split('.')[0]
+        start = time.perf_counter()
+        self._stack.append([package, 0.0])
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            _, nested = self._stack.pop()
+            elapsed = (time.perf_counter() - start) * 1000
+            entry = self.timings.setdefault(package, [0.0, 0.0])
+            entry[0] += elapsed - nested
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            # Only the outermost import of a package counts towards its cumulative time.
+            if not any(frame[0] == package for frame in self._stack):
+                entry[1] += elapsed
+
+    @contextmanager
+    def record(self):
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        try:
+            yield self
+        finally:
+            builtins.__import__ = self._original
+
+    def summary(self, top: int = 15) -> str:
+        rows = sorted(self.timings.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        lines = [f"{'package':<28}{'self ms':>10}{'cumulative ms':>16}"]
+        lines += [f"{name:<28}{s:>10.1f}{c:>16.1f}" for name, (s, c) in rows]
+        return "\n".join(lines)
+
+
+def read_artifact(path: Path):
+    import pandas as pd
+    path = Path(path)
+    if path.suffix.lower() == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_csv(path, keep_default_na=False)
+
+
+def write_artifact(df, path: Path):
+    if df is None or path is None:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    logging.getLogger('CLI').info(f"Wrote {len(df)} rows to {path}")
+
+
+def cmd_scrape(args, params):
+    from job_scraper import LinkedInScraper
+    scraper = LinkedInScraper()
+    try:
+        df = scraper.run(params)
+    finally:
+        scraper.close()
+    write_artifact(df, args.output)
+    return df
+
+
+def cmd_filter(args, params):
+    from job_filter import filter_eligible_jobs
+    df = filter_eligible_jobs(read_artifact(args.input), params)
+    write_artifact(df, args.output)
+    return df
+
+
+def cmd_parse_salary(args, params):
+    from salary_parser import SalaryParser
+    df = read_artifact(args.input)
+    SalaryParser(model_name=args.model).process_df(df)
+    write_artifact(df, args.output)
+    return df
+
+
+def cmd_match(args, params):
+    from datetime import datetime
+    from deepseek_jd_resume_matcher import DeepseekMatcher
+    from budget_governor import BudgetGovernor
+    current_date = datetime.now().strftime("%Y%m%d")
+    governor = BudgetGovernor.from_params(params)
+    try:
+        df = DeepseekMatcher(governor=governor).process_job_data(
+            df=governor.take_deferred(read_artifact(args.input), params['user_name'], params['search']['keyword']),
+            resume=params['resume'],
+            job_type=params['job_type'],
+            current_salary=params['current_salary'],
+            filename=f"{current_date}_{params['user_name']}_{params['search']['keyword']}.csv",
+            keyword=params['search']['keyword'],
+            user=params['user_name'],
+            csv_export=params['csv_export'],
+            resume_token_budget=params['resume_token_budget'],
+            max_jobs=params['api_budget']['max_jobs'],
+            max_tokens=params['api_budget']['max_tokens'],
+            cascade=params['cascade'],
+            company_list=params['company_list']
+        )
+    finally:
+        governor.close()
+    if df is None:
+        raise RuntimeError("Matching aborted; see the matcher log above.")
+    write_artifact(df, args.output)
+    return df
+
+
+def cmd_upload(args, params):
+    from data_uploader import upload_table_to_supabase
+    report = upload_table_to_supabase(read_artifact(args.input), params, destination=args.destination, sync=not args.no_sync)
+    logging.getLogger('CLI').info(f"Upload report: {report}")
+    return report
+
+
+def cmd_run(args, params):
+    from main import CareerCopilot
+    df = CareerCopilot(args.config)
+    write_artifact(df, args.output)
+    return df
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='careercopilot', description="CareerCopilot pipeline stages.")
+    parser.add_argument('--config', default='default_setting.yaml',
+                        help="Config file name in config/ or a path to a YAML file.")
+    parser.add_argument('--import-report', action='store_true',
+                        help="Print a summary of module import times for the selected stage.")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Debug logging.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def stage(name, handler, help_text, needs_input=True):
+        p = sub.add_parser(name, help=help_text)
+        if needs_input:
+            p.add_argument('--input', type=Path, required=True, help="Input artifact (.csv or .parquet).")
+        p.add_argument('--output', type=Path, default=None, help="Write the stage result to this .csv or .parquet file.")
+        p.set_defaults(handler=handler)
+        return p
+
+    stage('scrape', cmd_scrape, "Scrape LinkedIn for the configured search.", needs_input=False)
+    stage('filter', cmd_filter, "Filter scraped jobs by company, salary and repost preferences.")
+    salary = stage('parse-salary', cmd_parse_salary, "Extract Min/Max Salary with the local LLM.")
+    salary.add_argument('--model', default='llama3.1', help="Ollama model name.")
+    stage('match', cmd_match, "Score jobs against the resume with DeepSeek.")
+    upload = stage('upload', cmd_upload, "Queue (and sync) an artifact to a Supabase table.")
+    upload.add_argument('--destination', default='MATCH_OUTPUT', help="Supabase table, e.g. JOB_POSTS or MATCH_OUTPUT.")
+    upload.add_argument('--no-sync', action='store_true', help="Only write to the local outbox.")
+    stage('run', cmd_run, "Run the whole pipeline.", needs_input=False)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(logging.DEBUG if args.verbose else logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logger = logging.getLogger('CLI')
+
+    config_path = Path(args.config)
+    if not config_path.is_absolute() and not config_path.exists():
+        config_path = CONFIG_DIR / args.config
+    params = get_run_parameters(config_path)
+    args.config = config_path
+
+    # Stage modules are imported inside the handlers, so recording around the handler
+    # captures exactly the dependencies the stage pulls in.
+    report = ImportReport()
+    ready_ms = (time.perf_counter() - _START) * 1000
+    stage_start = time.perf_counter()
+    status = 0
+    try:
+        with report.record() if args.import_report else nullcontext():
+            args.handler(args, params)
+    except Exception as e:
+        logger.error(f"Stage '{args.command}' failed: {e}", exc_info=True)
+        status = 1
+
+    if args.import_report:
+        stage_ms = (time.perf_counter() - stage_start) * 1000
+        print(f"\nCLI ready after {ready_ms:.0f} ms; '{args.command}' took {stage_ms:.0f} ms")
+        print(report.summary())
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
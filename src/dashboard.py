@@ -1,18 +1,32 @@
+import os
 import streamlit as st
-from supabase import create_client
-import pandas as pd
 import ast
+from dashboard_data import SupabaseJobSource, LocalJobSource, PAGE_SIZE, next_cursor
 
 
 # 配置页面
 st.set_page_config(page_title="CareerCopilot", layout="wide")
 
-# 初始化 Supabase 连接
+# 数据源：DASHBOARD_BACKEND=local 时离线读取本地运行产物（data/jobs.db），否则连接 Supabase
+def get_backend():
+    backend = os.getenv("DASHBOARD_BACKEND")
+    if backend:
+        return backend
+    try:
+        return st.secrets.get("BACKEND", "supabase")
+    except Exception: # 没有 secrets.toml
+        return "local"
+
+# 初始化数据源连接（跨 rerun 复用）
 @st.cache_resource
-def init_connection():
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_API_KEY"])
+def init_connection(backend):
+    if backend == "local":
+        return LocalJobSource()
+    from supabase import create_client
+    return SupabaseJobSource(create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_API_KEY"]))
 
-supabase = init_connection()
+backend = get_backend()
+source = init_connection(backend)
 
 st.title("🚀 CareerCopilot: 智能职位匹配看板")
 
@@ -21,15 +35,38 @@ with st.sidebar:
     st.header("账户信息")
     st.info("当前用户: Test_User")
     st.write("订阅状态: **Premium**")
+    st.caption(f"数据源: {'本地离线' if backend == 'local' else 'Supabase'}")
     if st.button("升级/续费"):
         st.write("跳转至支付页面...")
 
 # 从数据库获取数据
-def fetch_jobs():
-    response = supabase.table("MATCH_OUTPUT").select("*").order("Match Score", desc=True).execute()
-    return pd.DataFrame(response.data)
+# 上传时间戳作为缓存键：有新数据上传时自动失效，否则在 TTL 内直接复用
+# backend 参与缓存键，避免切换数据源后读到另一数据源的缓存
+@st.cache_data(ttl=60)
+def fetch_upload_version(_source, backend):
+    return _source.upload_version()
+
+@st.cache_data(ttl=3600)
+def fetch_jobs_page(_source, backend, upload_version, after):
+    return _source.list_page(PAGE_SIZE, after)
+
+@st.cache_data(ttl=3600)
+def fetch_job_detail(_source, backend, upload_version, key):
+    return _source.job_detail(key)
+
+@st.cache_data(ttl=3600)
+def fetch_market_table(_source, backend, upload_version, name):
+    return _source.market_table(name)
 
-df = fetch_jobs()
+upload_version = fetch_upload_version(source, backend)
+
+# 分页游标：cursors[i] 是第 i 页之前最后一行的 (Match Score, key)
+if st.session_state.get("upload_version") != upload_version:
+    st.session_state["upload_version"] = upload_version
+    st.session_state["cursors"] = [None]
+cursors = st.session_state["cursors"]
+
+df = fetch_jobs_page(source, backend, upload_version, cursors[-1])
 
 # 主界面：展示数据
 if not df.empty:
@@ -39,25 +76,40 @@ if not df.empty:
     cols = ["Job Title", "Company", "Match Score", "Posted Ago", "Min Salary", "Max Salary"]
     edited_df = st.data_editor(df[cols], use_container_width=True)
 
-    # 详细分析区块
-    selected_job_title = st.selectbox("选择职位查看详细 AI 分析:", df["Job Title"] + " @ " + df["Company"])
-    selected_job = df[df["Job Title"] + " @ " + df["Company"] == selected_job_title].iloc[0]
+    # 翻页
+    prev_col, page_col, next_col = st.columns([1, 4, 1])
+    with prev_col:
+        if st.button("⬅️ 上一页", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with page_col:
+        st.caption(f"第 {len(cursors)} 页")
+    with next_col:
+        if st.button("下一页 ➡️", disabled=len(df) < PAGE_SIZE):
+            cursors.append(next_cursor(df, source.key_column))
+            st.rerun()
+
+    # 详细分析区块（按需加载单个职位的详情）
+    labels = df["Job Title"] + " @ " + df["Company"]
+    selected_idx = st.selectbox("选择职位查看详细 AI 分析:", labels.index, format_func=lambda i: labels[i])
+    selected_job = fetch_job_detail(source, backend, upload_version, df.loc[selected_idx, source.key_column])
     
     # 创建三列布局
     col1, col2, col3 = st.columns([1, 1.5, 0.8]) # 调整比例，中间分析区给宽一点
 
     with col1:
-        st.metric("匹配度分数", f"{selected_job['match_score']}%")
+        score = selected_job.get('Match Score')
+        st.metric("匹配度分数", f"{score}%" if score is not None else "未评分")
         st.write("**💡 AI 核心建议:**")
         # 使用 info 框让文字更有质感
-        st.info(selected_job['reasoning'])
+        st.info(selected_job.get('Reasoning', ''))
 
     with col2:
         st.write("**🛠️ 缺失技能 (需在面试/简历中补强):**")
         
         # 既然是 list，我们可以把它们渲染成漂亮的标签
-        skills = selected_job['Missing Skills']
-        skills = skills.split(', ')
+        skills = selected_job.get('Missing Skills') or ''
+        skills = [s for s in skills.split(', ') if s]
         if isinstance(skills, list) and len(skills) > 0:
             # 这种方式会生成一排带有背景色的漂亮标签
             skills_html = "".join([f'<span style="background-color: #ff4b4b22; color: #ff4b4b; padding: 2px 8px; border-radius: 10px; margin-right: 5px; border: 1px solid #ff4b4b; font-size: 0.8rem;">{s}</span>' for s in skills])
@@ -82,5 +134,24 @@ if not df.empty:
         if st.button("✅ 标记为已申请", use_container_width=True):
             st.toast("功能开发中... 之后可以更新数据库状态！")
 
+    # 市场分析（读取上传时预计算好的汇总表）
+    with st.expander("📊 市场分析"):
+        salary_tab, volume_tab, skills_tab = st.tabs(["薪资分布", "职位数量", "常见技能缺口"])
+        with salary_tab:
+            salary = fetch_market_table(source, backend, upload_version, "MARKET_SALARY")
+            if not salary.empty:
+                dimension = st.radio("维度", ["company", "city", "keyword"], horizontal=True)
+                view = salary[salary["Dimension"] == dimension].sort_values("Jobs", ascending=False).head(20)
+                st.dataframe(view[["Value", "Currency", "Jobs", "P25", "P50", "P75"]], use_container_width=True)
+        with volume_tab:
+            volume = fetch_market_table(source, backend, upload_version, "MARKET_VOLUME")
+            if not volume.empty:
+                st.line_chart(volume.pivot_table(index="Posting Date", columns="Keyword", values="Postings"))
+        with skills_tab:
+            skills = fetch_market_table(source, backend, upload_version, "MARKET_SKILLS")
+            if not skills.empty:
+                top = skills.groupby("Label")["Jobs"].sum().sort_values(ascending=False).head(20)
+                st.bar_chart(top)
+
 else:
     st.warning("目前数据库中没有职位信息，请运行本地爬虫同步数据。")
\ No newline at end of file
@@ -0,0 +1,224 @@
+import sqlite3
+import logging
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Tuple
+from utils.file_path import INDEX_PATH, ANALYTICS_PATH
+from job_index import COLUMN_MAP
+from market_analytics import DESTINATIONS
+
+# Columns needed by the list view; the long text columns are only fetched per job.
+LIST_COLUMNS = ["URL", "Job Title", "Company", "Match Score", "Posted Ago", "Min Salary", "Max Salary"]
+DETAIL_COLUMNS = [
+    "URL", "Job Title", "Company", "Match Score", "Reasoning", "Missing Skills",
+    "Posted Ago", "Min Salary", "Max Salary", "Salary", "Job Description"
+]
+PAGE_SIZE = 50
+UPLOAD_STATE_TABLE = "UPLOAD_STATE"  # written by data_uploader.mark_upload_state
+# Precomputed by market_analytics.update_market_analytics
+MARKET_TABLES = ["MARKET_SALARY", "MARKET_VOLUME", "MARKET_SKILLS"]
+
+Cursor = Tuple[Optional[float], str]  # (Match Score or None, key column) of the last row on the previous page
+
+
+def _quote(column: str) -> str:
+    """Quotes a column name for PostgREST (several columns contain spaces)."""
+    return f'"{column}"'
+
+
+def _quote_value(value) -> str:
+    """Quotes a filter value so commas and parentheses in URLs survive PostgREST parsing."""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class SupabaseJobSource:
+    """
+    Read-side access to the MATCH_OUTPUT table for the dashboard.
+
+    The list view pulls a projected page at a time, ordered by match score with
+    keyset pagination, so each page costs the same no matter how deep it is or how
+    large the table grows. Full job details are fetched one job at a time on demand.
+    """
+
+    key_column = "URL"  # unique per row; paging tie-breaker and job_detail() argument
+
+    def __init__(self, client, table: str = "MATCH_OUTPUT"):
+        """
+        Args:
+            client: Supabase client.
+            table (str): Table holding the scored jobs.
+        """
+        self.client = client
+        self.table = table
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def list_page(self, page_size: int = PAGE_SIZE, after: Optional[Cursor] = None) -> pd.DataFrame:
+        """
+        Returns one page of jobs ordered by Match Score (desc), then URL. Jobs without a
+        score (e.g. skipped because the description was too long) come last.
+
+        Args:
+            page_size (int): Rows per page.
+            after (Cursor): Cursor from next_cursor() for the previous page, or None for the first page.
+
+        Returns:
+            pd.DataFrame: Up to page_size rows with LIST_COLUMNS.
+        """
+        score_column, key_column = _quote("Match Score"), _quote(self.key_column)
+        query = self.client.table(self.table).select(",".join(_quote(c) for c in LIST_COLUMNS))
+        if after is not None:
+            score, key = after
+            if score is None:  # already among the unscored jobs
+                query = query.is_(score_column, "null").gt(key_column, key)
+            else:
+                query = query.or_(
+                    f'{score_column}.lt.{score},'
+                    f'and({score_column}.eq.{score},{key_column}.gt.{_quote_value(key)}),'
+                    f'{score_column}.is.null'
+                )
+        response = (
+            query.order(score_column, desc=True, nullsfirst=False)
+            .order(key_column)
+            .limit(page_size)
+            .execute()
+        )
+        return pd.DataFrame(response.data, columns=LIST_COLUMNS)
+
+    def job_detail(self, url: str) -> dict:
+        """
+        Fetches the analysis fields of a single job.
+
+        Returns:
+            dict: The job's DETAIL_COLUMNS, or an empty dict if it no longer exists.
+        """
+        response = (
+            self.client.table(self.table)
+            .select(",".join(_quote(c) for c in DETAIL_COLUMNS))
+            .eq(_quote(self.key_column), url)
+            .limit(1)
+            .execute()
+        )
+        return response.data[0] if response.data else {}
+
+    def market_table(self, name: str, keyword: str = None) -> pd.DataFrame:
+        """
+        Reads one of the small precomputed MARKET_TABLES, optionally for a single search keyword.
+        """
+        if name not in MARKET_TABLES:
+            raise ValueError(f"Unknown market table '{name}'. Valid options: {MARKET_TABLES}")
+        query = self.client.table(name).select("*")
+        if keyword:
+            query = query.eq(_quote("Keyword"), keyword)
+        return pd.DataFrame(query.execute().data)
+
+    def upload_version(self) -> Optional[str]:
+        """
+        Returns the time of the last upload to the table, used as the cache key for page data.
+        Returns None if the upload state table is unavailable, in which case caches rely on their TTL.
+        """
+        try:
+            response = (
+                self.client.table(UPLOAD_STATE_TABLE)
+                .select('"Uploaded At"')
+                .eq(_quote("Destination"), self.table)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not read {UPLOAD_STATE_TABLE}: {e}")
+            return None
+        return response.data[0]["Uploaded At"] if response.data else None
+
+
+class LocalJobSource:
+    """
+    Offline counterpart of SupabaseJobSource, reading the artifacts a local run produces:
+    scored jobs from the SQLite job index (data/jobs.db) and market summaries from
+    data/analytics.db. Both are opened read-only and memory-mapped, so paging through
+    thousands of jobs never leaves the machine.
+
+    Older CSV output can be brought in with `python job_index.py import ...`.
+    """
+
+    key_column = "Key"
+
+    # dashboard column -> jobs table column
+    COLUMNS = dict(COLUMN_MAP, Key="job_key")
+    # dashboard market table -> (analytics.db table, column renames)
+    MARKET = {destination: (table, columns) for table, (destination, columns) in DESTINATIONS.items()}
+    MMAP_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, index_path: Path = INDEX_PATH, analytics_path: Path = ANALYTICS_PATH):
+        """
+        Args:
+            index_path (Path): SQLite job index written by the pipeline.
+            analytics_path (Path): SQLite market analytics written by the pipeline.
+        """
+        self.index_path = Path(index_path)
+        self.analytics_path = Path(analytics_path)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.conn = self._connect(self.index_path)
+        self.analytics = self._connect(self.analytics_path) if self.analytics_path.exists() else None
+
+    def _connect(self, path: Path) -> sqlite3.Connection:
+        if not path.exists():
+            raise FileNotFoundError(f"Local data not found: {path}. Run the pipeline or `python job_index.py import` first.")
+        # Streamlit serves reruns from worker threads; the connection is only ever read.
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={self.MMAP_BYTES}")
+        return conn
+
+    def _select(self, columns) -> str:
+        return ", ".join(f'{self.COLUMNS[c]} AS "{c}"' for c in columns)
+
+    def list_page(self, page_size: int = PAGE_SIZE, after: Optional[Cursor] = None) -> pd.DataFrame:
+        """
+        Same contract as SupabaseJobSource.list_page, plus a 'Key' column used for paging.
+        Only matched jobs are listed, as in MATCH_OUTPUT; the index also holds every scraped posting.
+        """
+        columns = ["Key"] + LIST_COLUMNS
+        sql = f"SELECT {self._select(columns)} FROM jobs WHERE match_score IS NOT NULL"
+        args = []
+        if after is not None:
+            score, key = after
+            sql += " AND (match_score < ? OR (match_score = ? AND job_key > ?))"
+            args += [score, score, key]
+        sql += " ORDER BY match_score DESC, job_key LIMIT ?"
+        args.append(page_size)
+        return pd.read_sql_query(sql, self.conn, params=args)
+
+    def job_detail(self, key: str) -> dict:
+        """Same contract as SupabaseJobSource.job_detail, looked up by job key."""
+        row = pd.read_sql_query(
+            f"SELECT {self._select(DETAIL_COLUMNS)} FROM jobs WHERE job_key = ?", self.conn, params=[key]
+        )
+        # NULLs as None, like the Supabase JSON, rather than NaN
+        return row.astype(object).where(row.notna(), None).iloc[0].to_dict() if not row.empty else {}
+
+    def market_table(self, name: str, keyword: str = None) -> pd.DataFrame:
+        """Same contract as SupabaseJobSource.market_table."""
+        if name not in self.MARKET:
+            raise ValueError(f"Unknown market table '{name}'. Valid options: {list(self.MARKET)}")
+        if self.analytics is None:
+            return pd.DataFrame()
+        table, columns = self.MARKET[name]
+        sql, args = f"SELECT * FROM {table}", []
+        if keyword:
+            sql += " WHERE keyword = ?"
+            args.append(keyword)
+        return pd.read_sql_query(sql, self.analytics, params=args).rename(columns=columns)
+
+    def upload_version(self) -> Optional[str]:
+        """Last modification time of the local databases, so caches refresh after each local run."""
+        paths = [self.index_path, Path(f"{self.index_path}-wal"), self.analytics_path, Path(f"{self.analytics_path}-wal")]
+        mtimes = [p.stat().st_mtime for p in paths if p.exists()]
+        return str(max(mtimes)) if mtimes else None
+
+
+def next_cursor(page: pd.DataFrame, key_column: str = "URL") -> Optional[Cursor]:
+    """Builds the cursor for the page after `page`, or None if it was empty."""
+    if page.empty:
+        return None
+    last = page.iloc[-1]
+    score = None if pd.isna(last["Match Score"]) else float(last["Match Score"])
+    return (score, str(last[key_column]))
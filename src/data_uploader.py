@@ -2,27 +2,346 @@ from supabase import create_client
 import pandas as pd
 from dotenv import load_dotenv
 import os
-
+import json
+import time
+import random
+import sqlite3
+import hashlib
 import logging
+import threading
+import contextvars
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import tracing, metrics
+from utils.file_path import LEDGER_PATH, OUTBOX_PATH
+from upload_outbox import UploadOutbox, OutboxSyncWorker
+
+# Batch limits keep each upsert well below PostgREST request size limits.
+MAX_BATCH_ROWS = 200
+MAX_BATCH_BYTES = 1_000_000
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds; doubled on every retry, plus jitter
+PREPARE_CHUNK_ROWS = 500
+
+# Columns that change on every run without the posting changing.
+VOLATILE_COLUMNS = ['Date']
+
+# Columns kept only in the local store; the Supabase tables do not have them.
+LOCAL_ONLY_COLUMNS = {'MATCH_OUTPUT': ['Local Score', 'Remote Score', 'Tier']}
+
+# One row per destination with the time of its last successful upload; readers use it to invalidate caches.
+UPLOAD_STATE_TABLE = 'UPLOAD_STATE'
+
+
+@lru_cache(maxsize=None)
+def get_client(url: str = None, key: str = None):
+    """
+    Returns a process-wide Supabase client, created once per (url, key).
+    The underlying HTTP connection pool is shared by every upload in the run.
+    """
+    load_dotenv()
+    url = url or os.getenv('SUPABASE_URL')
+    key = key or os.getenv('SUPABASE_API_KEY')
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_API_KEY must be set in the environment or .env")
+    client = create_client(url, key)
+    logging.getLogger('DataUploader').info('Successfully connecting to Supabase table. ')
+    return client
+
+
+class UploadLedger:
+    """
+    Local record of the content hash last acknowledged by Supabase for each row,
+    used to skip rows that have not changed since the previous upload.
+    """
+
+    def __init__(self, path: Path = LEDGER_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ledger ("
+            "destination TEXT NOT NULL, row_key TEXT NOT NULL, hash TEXT NOT NULL, uploaded_at TEXT NOT NULL, "
+            "PRIMARY KEY (destination, row_key))"
+        )
+
+    def known_hashes(self, destination: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self.conn.execute("SELECT row_key, hash FROM ledger WHERE destination = ?", (destination,))
+            return dict(rows.fetchall())
+
+    def mark_uploaded(self, destination: str, entries: List[Tuple[str, str]]):
+        now = pd.Timestamp.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO ledger (destination, row_key, hash, uploaded_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(destination, row_key) DO UPDATE SET hash = excluded.hash, uploaded_at = excluded.uploaded_at",
+                [(destination, k, h, now) for k, h in entries]
+            )
+
+    def close(self):
+        self.conn.close()
 
-def upload_table_to_supabase(df: pd.DataFrame, params: dict, destination: str):
-    logger = logging.getLogger('JobFilter')
-    url = os.getenv('SUPABASE_URL')
-    key = os.getenv('SUPABASE_API_KEY')
+
+def prepare_records(df: pd.DataFrame, params: dict) -> List[dict]:
+    """
+    Converts a pipeline DataFrame into JSON-safe upsert records without modifying it.
+
+    Args:
+        df: Jobs to upload.
+        params (dict): Run configuration providing 'user_name' and the search keyword.
+
+    Returns:
+        List[dict]: One record per row, with 'User', 'Keyword' and 'Date' added.
+    """
+    extra = {
+        'User': params['user_name'],
+        'Keyword': params['search']['keyword'],
+        'Date': pd.Timestamp.now().strftime('%Y-%m-%d'),
+    }
+    records = []
+    # Converted PREPARE_CHUNK_ROWS rows at a time so the object-dtype copy and the JSON text
+    # (mostly job descriptions) stay small however many jobs the run collected.
+    for start in range(0, len(df), PREPARE_CHUNK_ROWS):
+        out = df.iloc[start:start + PREPARE_CHUNK_ROWS].assign(**extra)
+        out = out.astype(object).where(out.notna(), '')
+        # Round-trip through JSON to turn Timestamps, numpy scalars and lists into plain values.
+        records.extend(json.loads(out.to_json(orient='records', date_format='iso', force_ascii=False)))
+    return records
+
+
+def record_hash(record: dict) -> str:
+    """Stable content hash of a record, ignoring columns that change on every run."""
+    content = {k: v for k, v in record.items() if k not in VOLATILE_COLUMNS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def chunk_records(records: List[dict], max_rows: int = MAX_BATCH_ROWS, max_bytes: int = MAX_BATCH_BYTES) -> List[Tuple[List[dict], int]]:
+    """
+    Splits records into batches bounded by row count and encoded payload size.
+
+    Returns:
+        List of (batch, approximate payload bytes) tuples.
+    """
+    batches = []
+    batch, size = [], 2  # enclosing brackets
+    for record in records:
+        record_size = len(json.dumps(record, ensure_ascii=False, default=str).encode('utf-8')) + 1
+        if batch and (len(batch) >= max_rows or size + record_size > max_bytes):
+            batches.append((batch, size))
+            batch, size = [], 2
+        batch.append(record)
+        size += record_size
+    if batch:
+        batches.append((batch, size))
+    return batches
+
+
+def send_batch(client, destination: str, batch: List[dict], on_conflict: str = 'URL', max_retries: int = MAX_RETRIES):
+    """
+    Upserts one batch, retrying transient failures with exponential backoff and jitter.
+    Raises the last error once retries are exhausted.
+    """
+    logger = logging.getLogger('DataUploader')
+    start = time.perf_counter()
+    with tracing.span('upsert', kind='batch', destination=destination, rows=len(batch), retries=0) as span:
+        for attempt in range(max_retries + 1):
+            try:
+                client.table(destination).upsert(batch, on_conflict=on_conflict).execute()
+                metrics.inc('upload_rows_total', len(batch), destination=destination, status='ok')
+                metrics.observe('upload_batch_seconds', time.perf_counter() - start, destination=destination)
+                return
+            except Exception as e:
+                if attempt == max_retries:
+                    metrics.inc('upload_rows_total', len(batch), destination=destination, status='error')
+                    metrics.observe('upload_batch_seconds', time.perf_counter() - start, destination=destination)
+                    raise
+                span.add('retries')
+                delay = BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+                logger.warning(f"Upsert of {len(batch)} rows to {destination} failed ({e}). Retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+
+def mark_upload_state(client, destination: str):
+    """
+    Records the time of the latest successful upload to a destination in UPLOAD_STATE_TABLE.
+    Failures are logged and ignored; the dashboard then falls back to time-based cache expiry.
+    """
     try:
-        supabase = create_client(url, key)
-        logger.info('Successfully connecting to Supabase table. ')
-    except:
-        logging.error('Error connecting to Supabase table. ')
-    df.fillna('', inplace = True)
-    keyword = params['search']['keyword']
-    today = pd.Timestamp.now().strftime('%Y-%m-%d')
-    df['User'] = params['user_name']
-    df['Keyword'] = keyword
-    df['Date'] = today
-    output = df.to_dict('records')
+        client.table(UPLOAD_STATE_TABLE).upsert(
+            {'Destination': destination, 'Uploaded At': pd.Timestamp.now(tz='UTC').isoformat()},
+            on_conflict='Destination'
+        ).execute()
+    except Exception as e:
+        logging.getLogger('DataUploader').warning(f"Could not update {UPLOAD_STATE_TABLE} for {destination}: {e}")
+
+
+def sync_outbox(client=None, destinations: List[str] = None,
+                outbox_path: Path = OUTBOX_PATH, ledger_path: Path = LEDGER_PATH,
+                max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Drains pending outbox records to Supabase.
+
+    Records are sent as size-bounded batches, several at a time, with retries. A batch
+    is acknowledged in the outbox and recorded in the upload ledger only after the
+    upsert succeeds; failed batches stay queued for the next sync. Destinations that
+    received rows get their UPLOAD_STATE timestamp bumped, and acknowledged records
+    are compacted away at the end.
+
+    Args:
+        client: Supabase client. Defaults to the shared client from get_client(); any client
+            pointed at a PostgREST-compatible URL works, e.g. benchmarks/mock_postgrest.py.
+        destinations (List[str]): Tables to drain. Defaults to every table with pending records.
+        outbox_path (Path): Location of the local outbox.
+        ledger_path (Path): Location of the upload ledger.
+        max_workers (int): Number of batches in flight at once.
+
+    Returns:
+        dict: Sync report with row, batch and byte counts.
+    """
+    logger = logging.getLogger('DataUploader')
+    report = {'rows_sent': 0, 'rows_failed': 0, 'batches': 0, 'failed_batches': 0, 'bytes_sent': 0}
+
+    outbox = UploadOutbox(outbox_path)
+    ledger = UploadLedger(ledger_path)
     try:
-        supabase.table(destination).upsert(output, on_conflict="URL").execute()
-        logger.info('Successfully loading data to Supabase table. ')
-    except:
-        logging.error('Error loading data to Supabase table. ')
\ No newline at end of file
+        destinations = destinations or outbox.destinations()
+        if not destinations:
+            return report
+        client = client or get_client()
+
+        for destination in destinations:
+            items = outbox.pending(destination)
+            if not items:
+                continue
+            sent_before = report['rows_sent']
+            groups = {}
+            for item in items:
+                groups.setdefault(item['key_column'], []).append(item)
+
+            for conflict_column, group in groups.items():
+                by_key = {item['row_key']: item for item in group}
+                batches = chunk_records([item['record'] for item in group])
+                report['batches'] += len(batches)
+
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    # Pool threads do not inherit contextvars; a copy per batch keeps upsert spans under the caller's span
+                    futures = {
+                        pool.submit(contextvars.copy_context().run, send_batch, client, destination, batch, conflict_column): (batch, size)
+                        for batch, size in batches
+                    }
+                    for future in as_completed(futures):
+                        batch, size = futures[future]
+                        sent = [by_key[str(r.get(conflict_column, ''))] for r in batch]
+                        try:
+                            future.result()
+                        except Exception as e:
+                            report['failed_batches'] += 1
+                            report['rows_failed'] += len(batch)
+                            outbox.fail([item['id'] for item in sent], e)
+                            logger.error(f"Error loading {len(batch)} rows to Supabase table {destination}: {e}")
+                            continue
+                        report['rows_sent'] += len(batch)
+                        report['bytes_sent'] += size
+                        outbox.ack([(item['id'], item['hash']) for item in sent])
+                        ledger.mark_uploaded(destination, [(item['row_key'], item['hash']) for item in sent])
+
+            if report['rows_sent'] > sent_before:
+                mark_upload_state(client, destination)
+
+        outbox.compact()
+    finally:
+        outbox.close()
+        ledger.close()
+
+    if report['batches']:
+        logger.info(
+            f"Synced {report['rows_sent']} rows to Supabase "
+            f"({report['bytes_sent'] / 1024:.1f} KB in {report['batches']} batches, {report['rows_failed']} failed)."
+        )
+    return report
+
+
+def upload_table_to_supabase(df: pd.DataFrame, params: dict, destination: str, key_column: str = 'URL',
+                             sync: bool = True, outbox_path: Path = OUTBOX_PATH, ledger_path: Path = LEDGER_PATH,
+                             max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Queues new or changed rows of a DataFrame for a Supabase table, and optionally syncs them.
+
+    Each row is hashed and compared against the local upload ledger; unchanged rows
+    are skipped. Rows with an empty key_column cannot be upserted on it and are rejected
+    with a warning instead of overwriting each other. The rest are written to the durable local outbox first, so nothing is
+    lost when Supabase is unreachable. With sync=True the outbox is drained right away;
+    with sync=False the call never touches the network and an OutboxSyncWorker (or
+    the next run) delivers the rows.
+
+    Args:
+        df: Jobs to upload. The frame is not modified.
+        params (dict): Run configuration providing 'user_name' and the search keyword.
+        destination (str): Supabase table name (e.g. 'JOB_POSTS', 'MATCH_OUTPUT').
+        key_column (str): Upsert conflict column and ledger key.
+        sync (bool): If True, drain the outbox for this destination before returning.
+        outbox_path (Path): Location of the local outbox.
+        ledger_path (Path): Location of the upload ledger.
+        max_workers (int): Number of batches in flight at once.
+
+    Returns:
+        dict: Upload report with row, batch and byte counts.
+    """
+    logger = logging.getLogger('DataUploader')
+    report = {'rows_total': 0, 'rows_skipped': 0, 'rows_rejected': 0, 'rows_queued': 0}
+    if df is None or df.empty:
+        logger.warning(f"No rows to upload to {destination}. Skipping.")
+        return report
+
+    records = prepare_records(df.drop(columns=LOCAL_ONLY_COLUMNS.get(destination, []), errors='ignore'), params)
+    report['rows_total'] = len(records)
+
+    ledger = UploadLedger(ledger_path)
+    try:
+        known = ledger.known_hashes(destination)
+    finally:
+        ledger.close()
+
+    # Last occurrence wins when the same key appears twice in one frame,
+    # which would otherwise make a single upsert statement fail.
+    pending = {}
+    for record in records:
+        row_key = str(record.get(key_column, ''))
+        if not row_key.strip():
+            report['rows_rejected'] += 1
+            continue
+        digest = record_hash(record)
+        if known.get(row_key) == digest:
+            continue
+        pending[row_key] = (row_key, digest, record)
+    report['rows_skipped'] = report['rows_total'] - report['rows_rejected'] - len(pending)
+    if report['rows_rejected']:
+        logger.warning(f"Rejected {report['rows_rejected']} rows without a {key_column} for {destination}.")
+
+    outbox = UploadOutbox(outbox_path)
+    try:
+        report['rows_queued'] = outbox.enqueue(destination, list(pending.values()), key_column=key_column)
+    finally:
+        outbox.close()
+    logger.info(f"Queued {report['rows_queued']}/{report['rows_total']} rows for {destination} ({report['rows_skipped']} unchanged).")
+
+    if sync and pending:
+        report.update(sync_outbox(destinations=[destination], outbox_path=outbox_path,
+                                  ledger_path=ledger_path, max_workers=max_workers))
+    return report
+
+
+def start_background_sync(interval: float = 30.0, **kwargs) -> OutboxSyncWorker:
+    """
+    Starts a daemon thread that drains the outbox every `interval` seconds and on trigger().
+    Keyword arguments are passed through to sync_outbox.
+    """
+    worker = OutboxSyncWorker(lambda: sync_outbox(**kwargs), interval=interval)
+    worker.start()
+    return worker
@@ -5,12 +5,168 @@ import logging
 import pandas as pd
 import numpy as np
 import tiktoken
+from functools import lru_cache
 from tqdm import tqdm
 from openai import OpenAI
 from pathlib import Path
+from typing import Callable
 from dotenv import load_dotenv
 from utils.file_path import OUTPUT_DIR
-from utils.resume_to_string import load_resume_pdf
+from utils.job_text import posted_timestamps
+from utils.resume_to_string import load_resume, compact_resume
+from utils import tracing, metrics
+from job_store import JobStore
+from job_index import JobIndex
+from budget_governor import BudgetGovernor, estimate_cost
+
+# System prompt plus the JSON answer, added to resume + JD tokens when estimating a job's cost.
+PROMPT_OVERHEAD_TOKENS = 600
+OUTPUT_COLUMNS = [
+    'Job Title', 'Company', 'Posted Ago', 'Min Salary', 'Max Salary',
+    'Recommend Apply', 'Match Score', 'Reasoning', 'Missing Skills',
+    'URL', 'Posted Time', 'Salary', 'Reposted', 'Job Description'
+]
+# Added after OUTPUT_COLUMNS in cascade mode (see DeepseekMatcher.cascade_evaluate).
+CASCADE_COLUMNS = ['Local Score', 'Remote Score', 'Tier']
+# Optional input column from an earlier screening step; higher scores are matched sooner.
+PREFILTER_COLUMN = 'Prefilter Score'
+# Scored jobs published (output file, upload outbox) together while a run is in progress.
+PARTIAL_BATCH_JOBS = 5
+# Reasoning of a job whose API call failed; its score of 0 is a placeholder, not a judgement.
+API_ERROR_REASONING = "API Error: Consult system logs."
+
+# Scoring rubric shared by DeepSeek and the local cascade model, so both scores are comparable.
+MATCH_INSTRUCTION = """
+        You are an elite Technical Talent Acquisition Specialist with 20 years of experience. 
+        Analyze the alignment between a candidate's resume and a job description. 
+
+        ### SCORING RUBRIC:
+        * 80-100: Strong Match. High likelihood of being accepted by hiring manager. Only missing minor "nice-to-have" tools or has minor (within 20% safe zone) seniority gap.
+        * 60-79: Moderate Match. Likelihood depends on candidate's interview prep. Core skills match but missing specific domain or tools.
+        * 0-59: Reject. Deal-breakers present (Language mismatch, huge seniority gap).
+
+        ### CRITICAL RULES:
+        * Be skeptical: Prioritize verifiable skills and evidence over self-claims.
+        * Anti-assumption: Do not infer unstated expertise (e.g., no "Python → FastAPI"). 
+        * Overqualified: If the candidate is clearly very overqualified (title, seniority), the score should be < 70. If the candidate's current salary (if given) is higher than the job's salary range (if given), the score should be < 60.
+
+        ### OUTPUT:
+        Output strictly in JSON. No preamble. No markdown code blocks.
+        Keys: 'match_score' (int), 'reasoning' (2-sentence string), 'missing_skills' (list of strings).
+        """
+
+
+def match_prompt(resume_text: str, jd_text: str, job_type: str, current_salary: str) -> str:
+    if current_salary == '':
+        current_salary = 'unknown'
+    return f"Note: The candidate is interested in {job_type} jobs. \n The candidate's current salary is {current_salary}. \n\n RESUME:\n{resume_text} \n\n JOB DESCRIPTION:\n{jd_text}"
+
+
+@lru_cache(maxsize=None)
+def _encoding(model_encoding: str):
+    # encoding_for_model rebuilds its lookup on every call; the encoder itself is reusable.
+    return tiktoken.encoding_for_model(model_encoding)
+
+
+def count_tokens(text: str, model_encoding: str = "gpt-4") -> int:
+    """Counts tokens with tiktoken. Raises if the encoding cannot be loaded."""
+    return len(_encoding(model_encoding).encode(str(text)))
+
+
+def prioritize_jobs(df: pd.DataFrame, company_list: list = None, now: pd.Timestamp = None,
+                    first=None) -> pd.DataFrame:
+    """
+    Orders jobs for scoring, most relevant first, so that budgets keep them and partial results
+    show them first: jobs whose URL is in `first` (e.g. resumed deferred jobs), then by posting
+    age in whole days (unknown last), then preferred companies, then PREFILTER_COLUMN if present
+    (higher first), then newest first. Ties keep their order.
+    """
+    if len(df) < 2:
+        return df
+    now = now if now is not None else pd.Timestamp.now()
+    empty = pd.Series(None, index=df.index, dtype=object)
+    posted = posted_timestamps(df.get('Posted Time', empty), df.get('Posted Ago', empty), now)
+    age = ((now - posted).dt.total_seconds()).fillna(np.inf).to_numpy()
+    preferred = df['Company'].isin(company_list).to_numpy() if company_list and 'Company' in df.columns \
+        else np.zeros(len(df), dtype=bool)
+    prefilter = pd.to_numeric(df[PREFILTER_COLUMN], errors='coerce').fillna(-np.inf).to_numpy() \
+        if PREFILTER_COLUMN in df.columns else np.zeros(len(df))
+    resumed = df['URL'].isin(list(first)).to_numpy() if first and 'URL' in df.columns \
+        else np.zeros(len(df), dtype=bool)
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((age, -prefilter, ~preferred, np.floor(age / 86400), ~resumed))
+    if (order == np.arange(len(df))).all():
+        return df
+    return df.take(order)
+
+
+def assemble_match_results(df: pd.DataFrame, results: pd.DataFrame, logger: logging.Logger = None,
+                           log_summary: bool = True) -> pd.DataFrame:
+    """
+    Attaches (score, reasoning, missing skills) results to the jobs and formats the output table:
+    Recommend Apply flag, OUTPUT_COLUMNS order, sorted by Match Score, Missing Skills as text.
+    Named result columns after the first three (e.g. CASCADE_COLUMNS) are appended as they are.
+    log_summary=False skips the high-score count (for partial batches).
+    """
+    logger = logger or logging.getLogger('DeepseekMatcher')
+    added = {name: results.iloc[:, i] for i, name in enumerate(['Match Score', 'Reasoning', 'Missing Skills'])}
+    extra = {name: results[name] for name in results.columns[3:]}
+
+    # Automated Flagging
+    added['Recommend Apply'] = added['Match Score'] >= 80
+    if log_summary:
+        logger.info(f"Filtering complete. Found {added['Recommend Apply'].sum()} high-score matches.")
+
+    # Data Integrity & Formatting
+    columns = OUTPUT_COLUMNS
+    if any(c not in added and c not in df.columns for c in OUTPUT_COLUMNS):
+        logger.warning('Missing critical columns. Outputing...')
+        columns = list(df.columns) + [c for c in added if c not in df.columns]
+    added.update(extra)
+    columns = columns + [c for c in extra if c not in columns]
+
+    # The input is not modified; each output column is gathered once, already in score order.
+    order = added['Match Score'].reset_index(drop=True).sort_values(ascending=False).index.to_numpy()
+    out = pd.DataFrame({c: (added[c] if c in added else df[c]).take(order) for c in columns})
+    out['Missing Skills'] = out['Missing Skills'].apply(lambda x: ', '.join(x) if isinstance(x, list) else x)
+    return out
+
+
+def _write_csv(df: pd.DataFrame, path: Path):
+    # Via a temporary file, so readers of a file being updated mid-run never see half of it
+    tmp = path.with_suffix('.csv.tmp')
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def cascade_report(results: pd.DataFrame, threshold: int = 80) -> dict:
+    """
+    Escalation and agreement statistics of a cascade run, for tuning the uncertainty band.
+
+    Agreement is measured on escalated jobs that got both scores: 'decision_agreement' is the
+    share on the same side of the Recommend Apply threshold, 'mean_abs_diff' the mean score gap.
+    Failed DeepSeek calls (tier 'remote_error', no Remote Score) are counted in 'remote_errors'
+    and left out of the agreement.
+    """
+    both = results[['Local Score', 'Remote Score']].apply(pd.to_numeric, errors='coerce').dropna()
+    jobs = len(results)
+    remote = int(results['Tier'].isin(['remote', 'remote_error']).sum())
+    report = {
+        'jobs': jobs,
+        'local_only': int((results['Tier'] == 'local').sum()),
+        'escalated': remote,
+        'over_budget': int((results['Tier'] == 'local_over_budget').sum()),
+        'local_errors': int(results['Local Score'].isna().sum()),
+        'remote_errors': int((results['Tier'] == 'remote_error').sum()),
+        'escalation_rate': round(remote / jobs, 3) if jobs else 0.0,
+        'compared': len(both),
+    }
+    if len(both):
+        report['decision_agreement'] = round(float(
+            ((both['Local Score'] >= threshold) == (both['Remote Score'] >= threshold)).mean()), 3)
+        report['mean_abs_diff'] = round(float((both['Local Score'] - both['Remote Score']).abs().mean()), 1)
+        report['mean_remote_minus_local'] = round(float((both['Remote Score'] - both['Local Score']).mean()), 1)
+    return report
 
 class DeepseekMatcher:
     """
@@ -19,12 +175,17 @@ class DeepseekMatcher:
     resume-to-JD alignment analysis.
     """
 
-    def __init__(self, api_key: str = None, base_url: str = "https://api.deepseek.com"):
+    def __init__(self, api_key: str = None, base_url: str = "https://api.deepseek.com", governor: BudgetGovernor = None):
         """
         Initializes the DeepSeek client and loads environment variables.
+
+        Args:
+            governor (BudgetGovernor): Daily API budget checked before and charged after every
+                DeepSeek call. Without one, calls are only metered.
         """
         load_dotenv()
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.governor = governor
         
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
         if not self.api_key:
@@ -40,8 +201,7 @@ class DeepseekMatcher:
         """
         text = str(text)
         try:
-            encoding = tiktoken.encoding_for_model(model_encoding)
-            count = len(encoding.encode(text))
+            count = count_tokens(text, model_encoding)
             self.logger.debug(f"Token count calculated: {count} tokens.")
             return count
         except Exception as e:
@@ -58,33 +218,14 @@ class DeepseekMatcher:
         
         if jd_token_count > 10000:
             self.logger.error(f"Safety Gate: JD is too large ({jd_token_count} tokens). Skipping API call to prevent cost overflow.")
+            tracing.set_attributes(jd_tokens=jd_token_count, skipped='jd_too_long')
             return {
                 "match_score": np.nan,
                 "reasoning": "JOB DESCRIPTION TOO LONG: Exceeded 10,000 token limit. Manual review required.",
                 "missing_skills": []
             }
 
-        system_instruction = """
-        You are an elite Technical Talent Acquisition Specialist with 20 years of experience. 
-        Analyze the alignment between a candidate's resume and a job description. 
-
-        ### SCORING RUBRIC:
-        * 80-100: Strong Match. High likelihood of being accepted by hiring manager. Only missing minor "nice-to-have" tools or has minor (within 20% safe zone) seniority gap.
-        * 60-79: Moderate Match. Likelihood depends on candidate's interview prep. Core skills match but missing specific domain or tools.
-        * 0-59: Reject. Deal-breakers present (Language mismatch, huge seniority gap).
-
-        ### CRITICAL RULES:
-        * Be skeptical: Prioritize verifiable skills and evidence over self-claims.
-        * Anti-assumption: Do not infer unstated expertise (e.g., no "Python → FastAPI"). 
-        * Overqualified: If the candidate is clearly very overqualified (title, seniority), the score should be < 70. If the candidate's current salary (if given) is higher than the job's salary range (if given), the score should be < 60.
-
-        ### OUTPUT:
-        Output strictly in JSON. No preamble. No markdown code blocks.
-        Keys: 'match_score' (int), 'reasoning' (2-sentence string), 'missing_skills' (list of strings).
-        """
-        if current_salary == '':
-            current_salary = 'unknown'
-        user_content = f"Note: The candidate is interested in {job_type} jobs. \n The candidate's current salary is {current_salary}. \n\n RESUME:\n{resume_text} \n\n JOB DESCRIPTION:\n{jd_text}"
+        user_content = match_prompt(resume_text, jd_text, job_type, current_salary)
         self.logger.debug(f"Sending payload to DeepSeek. JD length: {len(jd_text)} chars.")
         
         start_time = time.time()
@@ -92,7 +233,7 @@ class DeepseekMatcher:
             response = self.client.chat.completions.create(
                 model="deepseek-chat",
                 messages=[
-                    {"role": "system", "content": system_instruction},
+                    {"role": "system", "content": MATCH_INSTRUCTION},
                     {"role": "user", "content": user_content}
                 ],
                 response_format={"type": "json_object"},
@@ -102,6 +243,23 @@ class DeepseekMatcher:
 
             elapsed_time = time.time() - start_time
             usage = response.usage
+            cache_hit_tokens = getattr(usage, 'prompt_cache_hit_tokens', 0) or 0
+            if self.governor is not None:
+                cost = self.governor.record(usage.prompt_tokens, usage.completion_tokens, cache_hit_tokens)
+            else:
+                cost = estimate_cost(usage.prompt_tokens, usage.completion_tokens, cache_hit_tokens)
+            metrics.record_llm_call(
+                'deepseek', 'match', elapsed_time, prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens, cache_hit_tokens=cache_hit_tokens, cost=cost
+            )
+            tracing.set_attributes(
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                total_tokens=usage.total_tokens,
+                cache_hit_tokens=cache_hit_tokens,
+                cost_usd=round(cost, 6),
+                api_ms=round(elapsed_time * 1000, 1),
+            )
 
             self.logger.debug(
                 f"DeepSeek Match Complete | Time: {elapsed_time:.2f}s | "
@@ -115,66 +273,309 @@ class DeepseekMatcher:
             self.logger.error(f"Failed to parse DeepSeek JSON response: {e}")
             return None
         except Exception as e:
+            metrics.record_llm_call('deepseek', 'match', time.time() - start_time, status='error')
             self.logger.error(f"DeepSeek API call failed: {str(e)}", exc_info=True)
             return None
 
-    def trigger_deepseek_evaluate(self, resume: str, jd: str, job_type: str, current_salary : str) -> pd.Series:
+    def trigger_deepseek_evaluate(self, resume: str, jd: str, job_type: str, current_salary : str, job_id: str = None) -> pd.Series:
         """
         Public entry point for row-by-row DataFrame evaluation.
         """
         self.logger.debug("Triggering evaluation for single row...")
-        result = self._evaluate_match(resume, jd, job_type, current_salary)
+        with tracing.span('deepseek', kind='job', job_id=job_id, bytes=len(str(jd))):
+            result = self._evaluate_match(resume, jd, job_type, current_salary)
         
         if result is None:
             self.logger.warning("Evaluation returned None. Defaulting to error Series.")
-            return pd.Series([0, "API Error: Consult system logs.", []])
+            return pd.Series([0, API_ERROR_REASONING, []])
             
         return pd.Series([result['match_score'], result['reasoning'], result['missing_skills']])
 
-    def process_job_data(self, df: pd.DataFrame, resume: str, job_type = 'full time', current_salary = '', filename = 'result.csv'):
+    def _evaluate_local(self, client, model: str, resume_text: str, jd_text: str, job_type: str,
+                        current_salary: str, job_id: str = None) -> dict:
+        """
+        Scores one job with a local Ollama model, using the DeepSeek rubric and JSON schema.
+        Returns None on any failure, which escalates the job.
+        """
+        with tracing.span('local_match', kind='job', job_id=job_id, model=model, bytes=len(str(jd_text))):
+            start = time.perf_counter()
+            try:
+                response = client.chat(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": MATCH_INSTRUCTION},
+                        {"role": "user", "content": match_prompt(resume_text, jd_text, job_type, current_salary)}
+                    ],
+                    format='json',
+                    options={'temperature': 0, 'num_ctx': 8192}  # The default context would cut off resume + JD
+                )
+            except Exception as e:
+                metrics.record_llm_call('ollama', 'cascade', time.perf_counter() - start, status='error')
+                self.logger.warning(f"Local model evaluation failed: {e}")
+                return None
+
+            metrics.record_llm_call(
+                'ollama', 'cascade', time.perf_counter() - start,
+                prompt_tokens=response.get('prompt_eval_count') or 0,
+                completion_tokens=response.get('eval_count') or 0,
+            )
+            try:
+                result = json.loads(response['message']['content'])
+                result['match_score'] = float(result['match_score'])
+                tracing.set_attributes(score=result['match_score'])
+                return result
+            except Exception as e:
+                self.logger.warning(f"Local model evaluation failed: {e}")
+                return None
+
+    def cascade_evaluate(self, df: pd.DataFrame, resume_str: str, job_type: str, current_salary: str,
+                         local_model: str, band=(50, 85), host: str = None,
+                         max_jobs: int = None, max_tokens: int = None,
+                         on_batch: Callable[[pd.DataFrame, pd.DataFrame], None] = None,
+                         batch_size: int = PARTIAL_BATCH_JOBS) -> pd.DataFrame:
+        """
+        Two-tier scoring: the local model scores every job, and only jobs whose local score
+        falls inside `band` (inclusive), or that the local model failed on, go to DeepSeek.
+
+        The API budget (see apply_budget) and the daily governor apply to the escalated jobs only;
+        escalated jobs over either keep their local result.
+
+        on_batch(jobs, results), as in evaluate_jobs, gets the jobs settled by the local model
+        in batches of batch_size during the local pass, then the escalated jobs as DeepSeek
+        scores them, then whatever is left (e.g. over budget) at the end.
+
+        Returns:
+            pd.DataFrame: One row per job (same index as df): score, reasoning, missing skills,
+            then the CASCADE_COLUMNS 'Local Score', 'Remote Score' and 'Tier'
+            ('local', 'remote', 'remote_error' or 'local_over_budget'). A job whose DeepSeek call
+            failed ('remote_error') keeps its local result, if any, and has no Remote Score.
+        """
+        import ollama
+        client = ollama.Client(host=host) if host else ollama
+        low, high = band
+        job_ids = df['URL'].tolist() if 'URL' in df.columns else [None] * len(df)
+        descriptions = df['Job Description'].tolist()
+        local, local_scores, escalate = [], [], []
+        published, pending = set(), []
+
+        def row(pos: int, remote: tuple = None) -> list:
+            if remote is not None and remote[1] != API_ERROR_REASONING:
+                score, reasoning, missing = remote
+                return [score, reasoning, missing, local_scores[pos], score, 'remote']
+            if remote is not None:
+                tier = 'remote_error'
+            else:
+                tier = 'local_over_budget' if escalate[pos] else 'local'
+            result = local[pos]
+            if result is None:
+                return [0, API_ERROR_REASONING, [], np.nan, np.nan, tier]
+            return [result['match_score'], result.get('reasoning', ''), result.get('missing_skills', []),
+                    local_scores[pos], np.nan, tier]
+
+        def publish(rows: dict):
+            if on_batch is None or not rows:
+                return
+            published.update(rows)
+            jobs = df.iloc[list(rows)]
+            on_batch(jobs, pd.DataFrame(list(rows.values()), index=jobs.index, columns=[0, 1, 2] + CASCADE_COLUMNS))
+
+        for pos, (jd, job_id) in enumerate(tqdm(zip(descriptions, job_ids), total=len(df), desc="Local Matching Progress")):
+            result = self._evaluate_local(client, local_model, resume_str, jd, job_type, current_salary, job_id=job_id)
+            score = np.nan if result is None else result['match_score']
+            local.append(result)
+            local_scores.append(score)
+            escalate.append(bool(np.isnan(score) or low <= score <= high))
+            if on_batch is not None and not escalate[pos]:
+                pending.append(pos)
+                if len(pending) >= batch_size:
+                    publish({p: row(p) for p in pending})
+                    pending = []
+        publish({p: row(p) for p in pending})
+        escalate = np.array(escalate, dtype=bool)
+
+        # Positions are carried in a column so budget trimming maps back to rows even with duplicate labels
+        candidates = df[escalate].assign(_position=np.flatnonzero(escalate))
+        budgeted = self.apply_budget(candidates, resume_str, max_jobs, max_tokens)
+        self.logger.info(
+            f"Cascade: {int(escalate.sum())} of {len(df)} jobs in the uncertainty band {low}-{high} or unscored locally; "
+            f"escalating {len(budgeted)} to DeepSeek."
+        )
+
+        def on_remote(jobs: pd.DataFrame, results: pd.DataFrame):
+            publish({p: row(p, r) for p, r in zip(jobs['_position'], results.itertuples(index=False, name=None))})
+
+        evaluated, remote_results = self.evaluate_jobs(
+            budgeted, resume_str, job_type, current_salary,
+            on_batch=on_remote if on_batch is not None else None, batch_size=batch_size
+        )
+        remote = dict(zip(evaluated['_position'], remote_results.itertuples(index=False, name=None)))
+
+        rows = [row(pos, remote.get(pos)) for pos in range(len(df))]
+        publish({pos: rows[pos] for pos in range(len(df)) if pos not in published})
+        return pd.DataFrame(rows, index=df.index, columns=[0, 1, 2] + CASCADE_COLUMNS)
+
+    def evaluate_jobs(self, df: pd.DataFrame, resume_str: str, job_type: str, current_salary: str,
+                      on_batch: Callable[[pd.DataFrame, pd.DataFrame], None] = None,
+                      batch_size: int = PARTIAL_BATCH_JOBS):
+        """
+        Scores jobs with DeepSeek in order, stopping early once the budget governor (if any)
+        refuses another call.
+
+        on_batch(jobs, results), if given, is called with every batch_size newly scored jobs
+        and their results (and with the remainder at the end), while scoring goes on.
+
+        Returns:
+            (pd.DataFrame, pd.DataFrame): The leading jobs that were scored, and their
+            (score, reasoning, missing skills) rows with the same index.
+        """
+        def results_frame(start: int, stop: int):
+            jobs = df.iloc[start:stop]
+            return jobs, pd.DataFrame([list(r) for r in rows[start:stop]], index=jobs.index, columns=[0, 1, 2])
+
+        # One trigger_deepseek_evaluate call per job, traced with the job URL
+        job_ids = df['URL'].tolist() if 'URL' in df.columns else [None] * len(df)
+        rows = []
+        flushed = 0
+        for jd, job_id in tqdm(zip(df['Job Description'], job_ids), total=len(df), desc="DeepSeek Matching Progress"):
+            if self.governor is not None and not self.governor.acquire():
+                self.logger.warning(f"Daily API budget reached: {len(df) - len(rows)} of {len(df)} jobs not evaluated.")
+                break
+            rows.append(self.trigger_deepseek_evaluate(resume_str, jd, job_type, current_salary, job_id=job_id))
+            if on_batch is not None and len(rows) - flushed >= batch_size:
+                on_batch(*results_frame(flushed, len(rows)))
+                flushed = len(rows)
+        if on_batch is not None and len(rows) > flushed:
+            on_batch(*results_frame(flushed, len(rows)))
+        return results_frame(0, len(rows))
+
+    def apply_budget(self, df: pd.DataFrame, resume_str: str, max_jobs: int = None, max_tokens: int = None) -> pd.DataFrame:
+        """
+        Keeps the leading jobs that fit a per-run API budget.
+
+        Each job is estimated at resume + JD + PROMPT_OVERHEAD_TOKENS tokens. Jobs past
+        max_jobs or past the cumulative max_tokens are not sent to the API.
+
+        Returns:
+            pd.DataFrame: The jobs to evaluate, in their original order.
+        """
+        if max_jobs is None and max_tokens is None:
+            return df
+        kept = df.head(max_jobs) if max_jobs is not None else df
+        if max_tokens is not None:
+            resume_tokens = self._get_token_count(resume_str) + PROMPT_OVERHEAD_TOKENS
+            cost = kept['Job Description'].map(self._get_token_count) + resume_tokens
+            kept = kept[cost.cumsum() <= max_tokens]
+        if len(kept) == len(df):
+            return df
+        self.logger.warning(
+            f"API budget (max_jobs={max_jobs}, max_tokens={max_tokens}) reached: "
+            f"evaluating {len(kept)} of {len(df)} jobs."
+        )
+        return kept
+
+    def _partial_publisher(self, path: Path, csv_export: bool, publish: Callable[[pd.DataFrame], None]):
+        """
+        An evaluate_jobs on_batch callback: formats each scored batch, rewrites the output
+        file with everything scored so far (best first) and hands the batch to publish.
+        """
+        parts = []
+
+        def on_batch(jobs: pd.DataFrame, results: pd.DataFrame):
+            part = assemble_match_results(jobs, results, self.logger, log_summary=False)
+            parts.append(part)
+            try:
+                if csv_export:
+                    _write_csv(pd.concat(parts).sort_values('Match Score', ascending=False, kind='stable'), path)
+                if publish is not None:
+                    publish(part)
+            except Exception as e:
+                self.logger.warning(f"Could not publish partial results: {e}")
+        return on_batch
+
+    def process_job_data(self, df: pd.DataFrame, resume: str, job_type = 'full time', current_salary = '', filename = 'result.csv',
+                         keyword: str = None, user: str = None, csv_export: bool = True, resume_token_budget: int = None,
+                         max_jobs: int = None, max_tokens: int = None, persist: bool = True, cascade: dict = None,
+                         company_list: list = None, publish: Callable[[pd.DataFrame], None] = None):
         """
         Orchestrates the end-to-end evaluation flow from CSV loading to result persistence.
+
+        The resume is loaded through the ingestion cache and, when resume_token_budget is set,
+        reduced to its highest-priority sections (skills, experience, projects, ...) within
+        that many tokens before being sent with every job.
+
+        Results are appended to the MATCH_OUTPUT table of the job store when a keyword is given,
+        merged into the full-text job index, and written to OUTPUT_DIR / filename when csv_export is True.
+
+        max_jobs and max_tokens bound the API spend of the run (see apply_budget), and the
+        matcher's BudgetGovernor the spend of the day; jobs over either budget are left out of
+        the result. Only jobs the governor refuses are deferred to the next run; jobs past the
+        per-run budget are skipped. Resumed deferred jobs leave the deferral store only once the
+        run has scored them (BudgetGovernor.settle). persist=False skips the job store, index and
+        deferral (used by load tests against the mock LLM server).
+
+        cascade ({'local_model', 'band', 'host'}) scores with a local Ollama model first and sends
+        only borderline jobs to DeepSeek (see cascade_evaluate); the budget then applies to those
+        jobs only and nothing is left out. Disabled when cascade or its local_model is empty.
+
+        Jobs are scored in prioritize_jobs order (jobs resumed from an earlier deferral, then fresh
+        postings and company_list), so budgets keep the most relevant ones. Every PARTIAL_BATCH_JOBS
+        scored jobs are written to the output file (when csv_export) and passed to publish (e.g.
+        queued for upload), so results show up while the run is still going.
         """
         self.logger.info(f"Starting batch process: {len(df)} jobs total.")
+        resumed = [url for (u, k, url) in (self.governor.resumed if self.governor is not None else {})
+                   if (u, k) == (user or '', keyword or '')]
+        df = prioritize_jobs(df, company_list, first=resumed)
         try:
             # Resource Loading
-            resume_str = load_resume_pdf(resume, logger=self.logger)
-            self.logger.info(f"Successfully loaded and parsed resume: {resume}")
+            resume_doc = load_resume(resume, logger=self.logger)
+            resume_str = compact_resume(resume_doc, resume_token_budget, count_tokens=self._get_token_count)
+            self.logger.info(
+                f"Successfully loaded and parsed resume: {resume} "
+                f"({self._get_token_count(resume_str)} of {self._get_token_count(resume_doc.get('text', ''))} tokens sent per job)"
+            )
             
             path = Path(OUTPUT_DIR / filename)
             self.logger.info(f"Final results will be saved to: {path}")
-
+            on_batch = self._partial_publisher(path, csv_export, publish) if csv_export or publish else None
             # Processing
-            self.logger.info("Iterating through jobs via DeepSeekMatcher...")
-            tqdm.pandas(desc="DeepSeek Matching Progress")
-
-            # Use trigger_deepseek_evaluate for pandas apply
-            # Note: For large DFs, consider a progress bar or batching
-            results = df['Job Description'].progress_apply(lambda x: self.trigger_deepseek_evaluate(resume_str, x, job_type, current_salary))
+            if cascade and cascade.get('local_model'):
+                results = self.cascade_evaluate(
+                    df, resume_str, job_type, current_salary, cascade['local_model'],
+                    band=cascade.get('band') or (50, 85), host=cascade.get('host'),
+                    max_jobs=max_jobs, max_tokens=max_tokens, on_batch=on_batch
+                )
+                report = cascade_report(results)
+                tracing.set_attributes(**{f"cascade_{k}": v for k, v in report.items()})
+                self.logger.info(f"Cascade report: {report}")
+            else:
+                self.logger.info("Iterating through jobs via DeepSeekMatcher...")
+                budgeted = self.apply_budget(df, resume_str, max_jobs, max_tokens)
+                evaluated, results = self.evaluate_jobs(budgeted, resume_str, job_type, current_salary, on_batch=on_batch)
+                # evaluate_jobs stops at the first refused call, so the refused jobs are a suffix of budgeted
+                if persist and self.governor is not None and len(evaluated) < len(budgeted):
+                    self.governor.defer(budgeted.iloc[len(evaluated):], user, keyword)
+                df = evaluated
             
             self.logger.info("Applying AI results to DataFrame columns...")
-            df[['Match Score', 'Reasoning', 'Missing Skills']] = results
-
-            # Automated Flagging
-            high_match_count = (df['Match Score'] >= 80).sum()
-            df['Recommend Apply'] = df['Match Score'] >= 80
-            self.logger.info(f"Filtering complete. Found {high_match_count} high-score matches.")
-
-            # Data Integrity & Formatting
-            try:
-                cols = [
-                    'Job Title', 'Company', 'Posted Ago', 'Min Salary', 'Max Salary',
-                    'Recommend Apply', 'Match Score', 'Reasoning', 'Missing Skills',
-                    'URL', 'Posted Time', 'Salary', 'Reposted', 'Job Description'
-                ]
-                df = df[cols]
-            except:
-                self.logger.warning('Missing critical columns. Outputing...')
-            df = df.sort_values(by = 'Match Score', ascending = False)
-            df['Missing Skills'] = ', '.join(df['Missing Skills'])
+            df = assemble_match_results(df, results, self.logger)
             # File Persistence
-            df.to_csv(path, index=False)
-            self.logger.info(f"Job processing successful. File exported: {path}")
+            if persist and keyword is not None:
+                try:
+                    JobStore().append(df, 'MATCH_OUTPUT', keyword=keyword, user=user)
+                except Exception as e:
+                    self.logger.error(f"Failed to append results to the job store: {e}")
+            if persist:
+                try:
+                    with JobIndex() as index:
+                        index.add(df, keyword=keyword, user=user)
+                except Exception as e:
+                    self.logger.error(f"Failed to add results to the search index: {e}")
+            if csv_export:
+                _write_csv(df, path)
+                self.logger.info(f"Job processing successful. File exported: {path}")
+            if persist and self.governor is not None:
+                self.governor.settle(df, user, keyword)
             
             return df
             
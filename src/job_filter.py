@@ -16,26 +16,28 @@ def filter_eligible_jobs(df: pd.DataFrame, params: dict):
     
     Args:
         df: Dataframe of scraped jobs.
-        params (dict): Configuration dictionary containing 'company_list', 'user_name', and 'repost'.
+        params (dict): Configuration dictionary containing 'company_list', 'user_name', 'repost' and 'csv_export'.
     """
     logger = logging.getLogger('JobFilter')
     company_list = params['company_list']
     user = params['user_name']
 
+    # Conditions are combined into one mask so the frame is sliced (and copied) once.
+    keep = pd.Series(True, index=df.index)
     if company_list == []:
         logger.info(f"No company list provided. ")
         if not params['salary']:
             logger.info(f"No salary boolean provided. ")
         else:
             logger.info(f"Filtering jobs with salaries... ")
-            df = df[df['Salary'] != '']
+            keep &= df['Salary'] != ''
     else:
         if not params['salary']:
             logger.info(f"No salary boolean provided. ")
-            df = df[df['Company'].isin(company_list)]
+            keep &= df['Company'].isin(company_list)
         else:
             logger.info(f"Filtering jobs with either intested companies or presented salaries... ")
-            df = df[(df['Salary'] != '') | (df['Company'].isin(company_list))]
+            keep &= (df['Salary'] != '') | (df['Company'].isin(company_list))
     
     # if not params['salary']:
     #     self.logger.info(f"No salary boolean provided. ")
@@ -47,7 +49,14 @@ def filter_eligible_jobs(df: pd.DataFrame, params: dict):
         logger.info(f"No repost boolean provided. ")
     else:
         logger.info(f"Filtering newly posted jobs... ")
-        df = df[~df['Reposted']]
+        keep &= ~df['Reposted']
+
+    # Nothing dropped: a shallow copy keeps later stages from adding columns to the caller's frame
+    df = df[keep] if not keep.all() else df.copy(deep=False)
+
+    if not params.get('csv_export', True):
+        logger.info(f"Filtered {len(df)} eligible jobs.")
+        return df
 
     current_date = datetime.now().strftime("%Y%m%d")
     search = params['search']
@@ -0,0 +1,358 @@
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+import pandas as pd
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional
+from utils.file_path import INDEX_PATH, OUTPUT_DIR
+
+# DataFrame column -> jobs table column
+COLUMN_MAP = {
+    'Job Title': 'job_title',
+    'Company': 'company',
+    'Location': 'location',
+    'Posted Time': 'posted_time',
+    'Posted Ago': 'posted_ago',
+    'Reposted': 'reposted',
+    'Salary': 'salary',
+    'Min Salary': 'min_salary',
+    'Max Salary': 'max_salary',
+    'Currency': 'currency',
+    'Match Score': 'match_score',
+    'Reasoning': 'reasoning',
+    'Missing Skills': 'missing_skills',
+    'URL': 'url',
+    'Job Description': 'description',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    job_title TEXT,
+    company TEXT,
+    location TEXT,
+    posted_time TEXT,
+    posted_ago TEXT,
+    reposted INTEGER,
+    salary TEXT,
+    min_salary REAL,
+    max_salary REAL,
+    currency TEXT,
+    match_score REAL,
+    reasoning TEXT,
+    missing_skills TEXT,
+    url TEXT,
+    description TEXT,
+    date TEXT NOT NULL,
+    keyword TEXT,
+    user TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_date ON jobs(date);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
+CREATE INDEX IF NOT EXISTS idx_jobs_match_score ON jobs(match_score);
+CREATE INDEX IF NOT EXISTS idx_jobs_max_salary ON jobs(max_salary);
+CREATE INDEX IF NOT EXISTS idx_jobs_has_salary ON jobs(date) WHERE salary <> '';
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    job_title, company, description,
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, job_title, company, description)
+    VALUES (new.id, new.job_title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, job_title, company, description)
+    VALUES ('delete', old.id, old.job_title, old.company, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF job_title, company, description ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, job_title, company, description)
+    VALUES ('delete', old.id, old.job_title, old.company, old.description);
+    INSERT INTO jobs_fts(rowid, job_title, company, description)
+    VALUES (new.id, new.job_title, new.company, new.description);
+END;
+"""
+
+# Columns returned by search(); the full description is replaced by a highlighted snippet.
+RESULT_COLUMNS = [
+    'date', 'keyword', 'job_title', 'company', 'location', 'match_score',
+    'min_salary', 'max_salary', 'salary', 'url'
+]
+
+# A double-quoted phrase or a run of non-space characters
+_QUERY_TERM = re.compile(r'"[^"]*"|[^\s"]+')
+
+
+def job_key(url: str, title: str = '', company: str = '', location: str = '') -> str:
+    """
+    Builds a stable identity for a posting.
+
+    LinkedIn apply URLs carry per-session tracking parameters, so the numeric job id is
+    preferred. External apply links are LinkedIn redirects whose target lives in the query
+    string, so they are kept whole. Falls back to a hash of the card fields.
+    """
+    url = url if isinstance(url, str) else ''
+    match = re.search(r'/jobs/view/(\d+)', url)
+    if match:
+        return f"li:{match.group(1)}"
+    if url:
+        return url
+    digest = hashlib.sha1(f"{title}|{company}|{location}".encode('utf-8')).hexdigest()
+    return f"card:{digest[:16]}"
+
+
+def fts_query(text: str) -> str:
+    """
+    Turns free text into an FTS5 query that cannot raise a syntax error.
+
+    Every term becomes an FTS5 string, so 'c++', 'node.js' or 'machine-learning' are
+    matched as text instead of being read as operators. Double-quoted phrases stay phrases.
+    """
+    terms = [t.strip('"') for t in _QUERY_TERM.findall(text)]
+    return ' '.join('"' + t.replace('"', '""') + '"' for t in terms if t)
+
+
+def _clean(value):
+    """Converts a pandas cell to an SQLite-friendly scalar."""
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):  # numpy scalars
+        return value.item()
+    return value
+
+
+class JobIndex:
+    """
+    Local SQLite store of every scraped and scored posting with an FTS5 index
+    over title, company and description.
+
+    Rows are keyed by LinkedIn job id, so the raw scrape and the later match results
+    for the same posting collapse into one row. Ordinary B-tree indexes cover the
+    date, company, match score and salary filters used alongside full-text queries.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        """
+        Args:
+            path (Path): SQLite database file. Created with its schema on first use.
+        """
+        self.path = Path(path)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)  # per-user workers may write concurrently
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, df: pd.DataFrame, keyword: str = None, user: str = None, date: str = None) -> int:
+        """
+        Inserts or updates postings from a pipeline DataFrame.
+
+        Columns missing from the frame (e.g. match results on a raw scrape) leave the
+        stored values untouched, so scraper and matcher output can be added in any order.
+
+        Args:
+            df: Jobs from the scraper, filter or matcher.
+            keyword (str): Search keyword. Falls back to a 'Keyword' column if present.
+            user (str): User name. Falls back to a 'User' column if present.
+            date (str): Run date as 'YYYY-MM-DD'. Falls back to a 'Date' column, then today.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if df is None or df.empty:
+            return 0
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        present = [c for c in COLUMN_MAP if c in df.columns]
+        fields = [COLUMN_MAP[c] for c in present] + ['date', 'keyword', 'user']
+
+        if date is None and 'Date' in df.columns:
+            dates = pd.to_datetime(df['Date'], errors='coerce').dt.strftime('%Y-%m-%d').fillna(today).tolist()
+        else:
+            dates = [date or today] * len(df)
+
+        rows = []
+        for record, row_date in zip(df.to_dict('records'), dates):
+            values = [_clean(record[c]) for c in present]
+            values += [
+                row_date,
+                keyword or _clean(record.get('Keyword')),
+                user or _clean(record.get('User')),
+            ]
+            key = job_key(record.get('URL'), record.get('Job Title', ''), record.get('Company', ''), record.get('Location', ''))
+            rows.append([key] + values)
+
+        # 'date' keeps the first day a posting was seen; everything else takes the newest non-null value.
+        updates = ', '.join(
+            f"{f} = COALESCE(jobs.{f}, excluded.{f})" if f == 'date' else f"{f} = COALESCE(excluded.{f}, jobs.{f})"
+            for f in fields
+        )
+        sql = (
+            f"INSERT INTO jobs (job_key, {', '.join(fields)}) VALUES ({', '.join('?' * (len(fields) + 1))}) "
+            f"ON CONFLICT(job_key) DO UPDATE SET {updates}"
+        )
+        with self.conn:
+            self.conn.executemany(sql, rows)
+        self.logger.info(f"Indexed {len(rows)} jobs into {self.path.name}.")
+        return len(rows)
+
+    def search(self, query: str = None, days: int = None, since: str = None, companies: Iterable[str] = None,
+               min_score: float = None, has_salary: bool = False, keyword: str = None, limit: int = 20,
+               columns: List[str] = None, raw: bool = False) -> pd.DataFrame:
+        """
+        Returns postings ranked by full-text relevance (BM25), or by match score without a query.
+
+        Args:
+            query (str): Search terms, e.g. 'pytorch kubernetes' or '"machine learning" c++'. All terms must match.
+            days (int): Only postings indexed in the last N days.
+            since (str): Only postings on or after this date ('YYYY-MM-DD').
+            companies (Iterable[str]): Restrict to these companies.
+            min_score (float): Minimum match score.
+            has_salary (bool): Only postings with salary text.
+            keyword (str): Restrict to one search keyword.
+            limit (int): Maximum number of rows.
+            columns (List[str]): jobs columns to return. Defaults to RESULT_COLUMNS.
+            raw (bool): Pass query to FTS5 as is, for operators like NOT, OR and prefix*. Raises
+                sqlite3.OperationalError on invalid syntax.
+
+        Returns:
+            pd.DataFrame: Matching rows, with 'snippet' and 'rank' columns for text queries.
+        """
+        columns = columns or RESULT_COLUMNS
+        select = ', '.join(f"j.{c}" for c in columns)
+        where, args = [], []
+
+        if days is not None:
+            since = max(since or '', (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d'))
+        if since:
+            where.append("j.date >= ?")
+            args.append(since)
+        if companies:
+            companies = list(companies)
+            where.append(f"j.company IN ({', '.join('?' * len(companies))})")
+            args += companies
+        if min_score is not None:
+            where.append("j.match_score >= ?")
+            args.append(min_score)
+        if has_salary:
+            where.append("j.salary <> ''")
+        if keyword:
+            where.append("j.keyword = ?")
+            args.append(keyword)
+
+        if query and not raw:
+            query = fts_query(query)
+        if query:
+            # Title hits weigh more than company hits, which weigh more than description hits.
+            sql = (
+                f"SELECT {select}, snippet(jobs_fts, 2, '[', ']', '...', 12) AS snippet, "
+                f"bm25(jobs_fts, 10.0, 5.0, 1.0) AS rank "
+                f"FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid WHERE jobs_fts MATCH ?"
+            )
+            args = [query] + args
+            order = "rank"
+        else:
+            sql = f"SELECT {select} FROM jobs j WHERE 1 = 1"
+            order = "j.match_score DESC, j.date DESC"
+
+        if where:
+            sql += " AND " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ?"
+        args.append(limit)
+
+        cursor = self.conn.execute(sql, args)
+        names = [d[0] for d in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=names)
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def optimize(self):
+        """Merges FTS5 index segments. Worth running after large backfills."""
+        with self.conn:
+            self.conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('optimize')")
+
+
+def _keyword_from_filename(path: Path) -> Optional[str]:
+    """
+    Recovers the keyword from a pipeline file name: '<date>_<user>_<keyword>.csv' for match
+    output (data/output), '<date>_<keyword>_<city>_<period>.csv' for raw scrapes.
+    """
+    parts = path.stem.split('_')
+    if len(parts) < 3:
+        return None
+    if path.parent.name == OUTPUT_DIR.name or len(parts) == 3:
+        return parts[-1]
+    return parts[1]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Query the local full-text job index.")
+    parser.add_argument('--db', type=Path, default=INDEX_PATH, help="SQLite index file.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search = sub.add_parser('search', help="Full-text search over indexed postings.")
+    search.add_argument('query', nargs='?', default=None, help="Search terms, e.g. 'pytorch kubernetes' or 'c++'.")
+    search.add_argument('--raw', action='store_true', help="Treat the query as FTS5 syntax (NOT, OR, prefix*).")
+    search.add_argument('--days', type=int, default=None)
+    search.add_argument('--company', action='append', default=None)
+    search.add_argument('--min-score', type=float, default=None)
+    search.add_argument('--salary', action='store_true', help="Only postings with salary text.")
+    search.add_argument('--keyword', default=None)
+    search.add_argument('--limit', type=int, default=20)
+
+    add = sub.add_parser('import', help="Backfill the index from historical CSV files.")
+    add.add_argument('files', nargs='+', type=Path)
+    add.add_argument('--keyword', default=None, help="Defaults to the keyword in each file name.")
+
+    sub.add_parser('optimize', help="Merge FTS5 segments.")
+
+    args = parser.parse_args(argv)
+    with JobIndex(args.db) as index:
+        if args.command == 'search':
+            start = time.perf_counter()
+            try:
+                result = index.search(
+                    args.query, days=args.days, companies=args.company, min_score=args.min_score,
+                    has_salary=args.salary, keyword=args.keyword, limit=args.limit, raw=args.raw
+                )
+            except sqlite3.OperationalError as e:
+                print(f"Invalid query {args.query!r}: {e}")
+                return 1
+            elapsed = (time.perf_counter() - start) * 1000
+            with pd.option_context('display.max_colwidth', 60, 'display.width', 200):
+                print(result.drop(columns=['url']).to_string(index=False) if not result.empty else "No matches.")
+            print(f"\n{len(result)} rows in {elapsed:.1f} ms ({index.count()} jobs indexed)")
+        elif args.command == 'import':
+            for path in args.files:
+                df = pd.read_csv(path)
+                index.add(df, keyword=args.keyword or _keyword_from_filename(path))
+            index.optimize()
+            print(f"{index.count()} jobs indexed.")
+        elif args.command == 'optimize':
+            index.optimize()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
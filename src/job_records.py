@@ -0,0 +1,153 @@
+import sys
+import mmap
+import tempfile
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+
+class TextSegment:
+    """
+    Append-only UTF-8 text store backed by a temporary file and read through mmap.
+
+    Job descriptions are the bulk of a scrape (several KB each). Keeping them here
+    instead of in Python strings keeps the heap small while thousands of cards are
+    collected; a description is decoded again only when a DataFrame is built.
+    """
+
+    def __init__(self, directory: Path = None):
+        """
+        Args:
+            directory (Path): Where to create the backing file. Defaults to the system temp dir.
+        """
+        self._file = tempfile.TemporaryFile(mode='w+b', dir=directory)
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+
+    def append(self, text: str) -> Tuple[int, int]:
+        """Stores text and returns its (offset, byte length)."""
+        data = text.encode('utf-8')
+        offset = self._size
+        self._file.seek(offset)
+        self._file.write(data)
+        self._size += len(data)
+        return offset, len(data)
+
+    def get(self, offset: int, length: int) -> str:
+        if length == 0:
+            return ''
+        if offset + length > self._mapped:
+            # The file grew since it was last mapped; remap it at its current size.
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+            self._mapped = self._size
+        return self._map[offset:offset + length].decode('utf-8')
+
+    @property
+    def nbytes(self) -> int:
+        return self._size
+
+    def clear(self):
+        if self._map is not None:
+            self._map.close()
+            self._map, self._mapped = None, 0
+        self._file.truncate(0)
+        self._size = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class JobRecord:
+    """
+    One scraped job card. Repeated strings (title, company, location, posted-ago text) are
+    interned so thousands of cards from the same employers share them; the description
+    lives in a TextSegment and is referenced by offset.
+    """
+
+    __slots__ = ('title', 'company', 'location', 'posted_time', 'posted_ago', 'reposted',
+                 'salary', 'url', 'jd_offset', 'jd_length')
+
+    def __init__(self, title: str, company: str, location: str, posted_time, posted_ago: Optional[str],
+                 reposted: bool, salary: str, url: str, jd_offset: int, jd_length: int):
+        self.title = sys.intern(title)
+        self.company = sys.intern(company)
+        self.location = sys.intern(location)
+        self.posted_time = posted_time
+        self.posted_ago = sys.intern(posted_ago) if posted_ago else posted_ago
+        self.reposted = reposted
+        self.salary = salary
+        self.url = url
+        self.jd_offset = jd_offset
+        self.jd_length = jd_length
+
+
+class JobBatch:
+    """
+    The jobs collected by one scrape: compact JobRecords plus their descriptions in a TextSegment.
+
+    Replaces the former list of per-job dicts. to_frame() builds the pipeline DataFrame
+    in one pass, column by column.
+    """
+
+    # DataFrame column -> JobRecord attribute, in the order the scraper has always produced
+    COLUMNS = {
+        'Job Title': 'title',
+        'Company': 'company',
+        'Location': 'location',
+        'Posted Time': 'posted_time',
+        'Posted Ago': 'posted_ago',
+        'Reposted': 'reposted',
+        'Salary': 'salary',
+        'URL': 'url',
+    }
+
+    def __init__(self, directory: Path = None):
+        self.records: List[JobRecord] = []
+        self.segment = TextSegment(directory)
+
+    def append(self, card: dict, reposted: bool, salary: str, url: str, job_description: str):
+        """
+        Args:
+            card (dict): Output of utils.job_text.parse_card_text.
+        """
+        offset, length = self.segment.append(job_description)
+        self.records.append(JobRecord(
+            card['Job Title'], card['Company'], card['Location'], card['Posted Time'], card['Posted Ago'],
+            reposted, salary, url, offset, length
+        ))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[JobRecord]:
+        return iter(self.records)
+
+    def description(self, record: JobRecord) -> str:
+        return self.segment.get(record.jd_offset, record.jd_length)
+
+    def to_frame(self, descriptions: bool = True) -> pd.DataFrame:
+        """
+        Builds the scraper's DataFrame (same columns as before), optionally without the descriptions.
+
+        Every description is decoded at once, so at save time peak memory is that of the full
+        frame, as before; the segment only keeps the heap small while cards are collected.
+        """
+        data = {column: [getattr(r, attr) for r in self.records] for column, attr in self.COLUMNS.items()}
+        if descriptions:
+            data['Job Description'] = [self.description(r) for r in self.records]
+        return pd.DataFrame(data)
+
+    def clear(self):
+        self.records = []
+        self.segment.clear()
+
+    def close(self):
+        self.records = []
+        self.segment.close()
@@ -1,12 +1,19 @@
 import os
 import time
 import logging
-import pandas as pd
+from contextlib import nullcontext
 from dotenv import load_dotenv
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
 from utils.file_path import USER_DATA_DIR, JD_DIR
+from utils import tracing, metrics
+from utils.job_text import parse_card_text, clean_description, salary_spans, salary_text
+from job_store import JobStore
+from job_index import JobIndex
+from job_records import JobBatch
+from browser_trace import ChunkedTracer, ChunkOutcome
+from scrape_pacing import PacingController
 from playwright.sync_api import sync_playwright, Page, BrowserContext, Locator, expect
 
 class LinkedInScraper:
@@ -29,11 +36,15 @@ class LinkedInScraper:
         self.browser = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.job_list: List[Dict] = []
+        self.jobs = JobBatch()  # Compact records; descriptions live in an mmap'd temp file
         self.logger = logging.getLogger(self.__class__.__name__)
         self.is_tracing = False
+        self.chunk_tracer: Optional[ChunkedTracer] = None
+        self.pacer: Optional[PacingController] = None
+        self.throttled_responses = 0  # HTTP 429/999 seen by the page, for the pacer
 
-    def start_browser(self, headless: bool = False, enable_tracing: bool = False):
+    def start_browser(self, headless: bool = False, enable_tracing=False, trace_window: int = 5,
+                      trace_sample_rate: float = 0.0):
         """
         Initializes the Playwright engine and launches a persistent browser context.
         
@@ -42,6 +53,10 @@ class LinkedInScraper:
         
         Args:
             headless (bool): If True, runs the browser in the background without a UI.
+            enable_tracing (bool | str): True records the whole session (saved on close).
+                'sampled' keeps only the last trace_window card/page chunks and saves them
+                when a card fails, a selector times out or a bot check shows up, plus
+                successful cards at trace_sample_rate (see browser_trace.ChunkedTracer).
         """
         self.logger.info("Initializing Playwright and launching browser...")
         try:
@@ -59,7 +74,9 @@ class LinkedInScraper:
                 ]
             )
             # Start tracing if enabled
-            if enable_tracing:
+            if enable_tracing == 'sampled':
+                self.chunk_tracer = ChunkedTracer(self.context, window=trace_window, sample_rate=trace_sample_rate)
+            elif enable_tracing:
                 self.is_tracing = True
                 self.context.tracing.start(
                     name="linkedin_scraping_trace",
@@ -69,6 +86,7 @@ class LinkedInScraper:
                 )
                 self.logger.info("Tracing started.")
             self.page = self.context.new_page()
+            self.page.on('response', self._on_response)
             # stealth_sync(self.page)
             self.logger.info("Browser session started successfully.")
         except Exception as e:
@@ -111,12 +129,51 @@ class LinkedInScraper:
             self.logger.error(f"Authentication failed: {e}")
             raise
 
-        if self.page.get_by_text('security check').is_visible():
+        if self._bot_check_visible():
             self.logger.warning("Bot check detected. Pausing to wait for user input...")
             input("Press Enter after completing the bot check on the page...")
             self.logger.info("Resuming after bot check.")
 
 
+    def _bot_check_visible(self) -> bool:
+        """True on a security check, or on a checkpoint / authwall interstitial."""
+        try:
+            if any(marker in self.page.url for marker in ('/checkpoint/', '/authwall')):
+                return True
+            return self.page.get_by_text('security check').is_visible()
+        except Exception:
+            return False
+
+    def _on_response(self, response):
+        if response.status in (429, 999):  # 999 is LinkedIn's own "slow down"
+            self.throttled_responses += 1
+
+    def _pace(self, latency: float, failed: bool, challenged: bool, throttled: bool) -> bool:
+        """
+        Reports one card to the pacing controller. Returns False if the search should stop:
+        a security check that is still there after the cool-down.
+        """
+        if self.pacer is None:
+            return True
+        reason = 'challenge' if challenged else 'throttled' if throttled else 'timeout' if failed else None
+        if reason is None:
+            self.pacer.success(latency)
+            return True
+        cooldown = self.pacer.signal(reason)
+        if cooldown:
+            self.logger.warning(f"Security check detected. Cooling down for {cooldown:.0f}s.")
+            time.sleep(cooldown)
+            if self._bot_check_visible():
+                self.logger.warning("Security check still present. Stopping this search.")
+                return False
+        return True
+
+    def _trace_chunk(self, name: str):
+        """A sampled-tracing chunk for the block, or a no-op when sampled tracing is off."""
+        if self.chunk_tracer is None:
+            return nullcontext(ChunkOutcome())
+        return self.chunk_tracer.chunk(name)
+
     def search_jobs(self, keywords: str, city: str):
         """
         Executes a job search query using the provided keywords and location.
@@ -193,43 +250,81 @@ class LinkedInScraper:
         Workflow:
         1. Validates presence of SearchResultsMainContent.
         2. Locates all job cards using data-view-name attributes.
-        3. Sequentially processes cards via _process_single_job.
+        3. Sequentially processes cards via _process_single_job, paced by self.pacer
+           (scrape_pacing.PacingController) when set.
         4. Detects and clicks the 'Next' pagination button.
-        5. Terminates if max_page is reached or the 'Next' button is missing.
+        5. Terminates if max_page is reached, the 'Next' button is missing or a security
+           check does not go away.
         """
         self.logger.info("Starting job scraping sequence...")
         exit_loop = False
         cnt_page = 1
+        started, cards = time.perf_counter(), 0
 
         while not exit_loop:
-            try:
-                self.page.locator('div[componentkey = "SearchResultsMainContent"]').wait_for()
-                self.logger.info('Page content loaded. Extracting job cards...')
-                
-                # Retrieve job cards
-                jobs = self.page.locator('div[data-view-name = "job-search-job-card"] div[role = "button"]').all()
-                self.logger.info(f"Found {len(jobs)} jobs on the current page.")
+            with tracing.span('page', kind='page', page=cnt_page) as page_span:
+                try:
+                    with self._trace_chunk(f"page-{cnt_page}") as chunk:
+                        self.page.locator('div[componentkey = "SearchResultsMainContent"]').wait_for()
+                        self.logger.info('Page content loaded. Extracting job cards...')
+                    
+                        # Retrieve job cards
+                        jobs = self.page.locator('div[data-view-name = "job-search-job-card"] div[role = "button"]').all()
+                        self.logger.info(f"Found {len(jobs)} jobs on the current page.")
+                        page_span.set(cards=len(jobs))
+                        if not jobs and self.chunk_tracer and self._bot_check_visible():
+                            chunk.fail('bot_check')
                 
-                for i, job in enumerate(jobs, 1):
-                    self.logger.debug(f"Processing job {i}...")
-                    self._process_single_job(job, i)
+                    for i, job in enumerate(jobs, 1):
+                        self.logger.debug(f"Processing job {i}...")
+                        if self.pacer:
+                            self.pacer.wait()
+                        with tracing.span('card', kind='job', index=i), \
+                                self._trace_chunk(f"page-{cnt_page}-card-{i}") as chunk:
+                            collected, throttled = len(self.jobs), self.throttled_responses
+                            card_start = time.perf_counter()
+                            self._process_single_job(job, i)
+                            latency = time.perf_counter() - card_start
+                            cards += 1
+                            failed = len(self.jobs) == collected
+                            # No description: the details panel selector timed out
+                            no_description = not failed and self.jobs.records[-1].jd_length == 0
+                            challenged = (failed or no_description) and self._bot_check_visible()
+                            metrics.inc('cards_total', status='failed' if failed else 'ok')
+                            metrics.set_gauge('cards_per_minute', round(cards / (time.perf_counter() - started) * 60, 2))
+                            if self.chunk_tracer and (failed or no_description):
+                                chunk.fail('bot_check' if challenged else 'card_failed' if failed else 'no_description')
+                        if not self._pace(latency, failed or no_description, challenged,
+                                          self.throttled_responses > throttled):
+                            exit_loop = True
+                            break
+                    if exit_loop:
+                        break
                 
-                # Handle Pagination
-                next_button = self.page.locator("button[data-testid *= 'pagination-controls-next-button-visible']")
-                if next_button.count() == 0:
-                    self.logger.info('Pagination end reached. Terminating scrape loop.')
-                    exit_loop = True
-                elif cnt_page == max_page:
-                    self.logger.info('Max page reached. Terminating scrape loop.')
-                    exit_loop = True
-                else:
-                    self.logger.info('Navigating to next page...')
-                    next_button.first.click()
-                    cnt_page += 1
+                    # Handle Pagination
+                    next_button = self.page.locator("button[data-testid *= 'pagination-controls-next-button-visible']")
+                    if next_button.count() == 0:
+                        self.logger.info('Pagination end reached. Terminating scrape loop.')
+                        exit_loop = True
+                    elif cnt_page == max_page:
+                        self.logger.info('Max page reached. Terminating scrape loop.')
+                        exit_loop = True
+                    else:
+                        self.logger.info('Navigating to next page...')
+                        if self.pacer:
+                            self.pacer.wait()
+                        next_button.first.click()
+                        cnt_page += 1
                     
-            except Exception as e:
-                self.logger.error(f"Unexpected error during pagination loop: {e}")
-                exit_loop = True
+                except Exception as e:
+                    self.logger.error(f"Unexpected error during pagination loop: {e}")
+                    if self.pacer:
+                        self.pacer.signal('challenge' if self._bot_check_visible() else 'timeout')
+                    exit_loop = True
+
+        if self.pacer:
+            self.pacer.save()
+            self.logger.info(f"Pacing after this search: {self.pacer.summary()}")
 
     def _process_single_job(self, job_element: Locator, count: int):
         """
@@ -239,7 +334,7 @@ class LinkedInScraper:
         - Parses title, company, location, and post date from the card text.
         - Clicks the card to load the details panel.
         - Extracts the full job description.
-        - Identifies salary information (if present in text).
+        - Collects salary spans from the card's pay-range pill, the title and the description.
         - Detects 'Reposted' status.
         
         Args:
@@ -255,40 +350,20 @@ class LinkedInScraper:
             return
 
         # Basic Parsing
-        try:
-            parts = job_text.split('\n\n') # Might consider updating to locator
-            job_title = parts[0].split('\n')[-1]
-            company = parts[1]
-            location = parts[2]
-            # Clean posted time
-            posted_text = '\n'.join([t for t in parts if 'ago' in t or 'just posted' in t.lower()])
-            posted_text = posted_text.split('\n')
-            for time_text in posted_text:
-                if 'Posted on' in time_text:
-                    time_text = time_text.replace('Posted on ', '')
-                    posted_time = pd.to_datetime(time_text)
-                elif 'ago' in time_text or 'now' in time_text:
-                    posted_ago = time_text
-                else:
-                    posted_time = None
-                    posted_ago = None
-            # Text cleaning
-            job_title = job_title.replace('\u00a0', ' ')
-            company = company.replace('\u00a0', ' ')
-            location = location.replace('\u00a0', ' ')
-        except IndexError:
+        card = parse_card_text(job_text)
+        if card is None:
             self.logger.warning(f"Job #{count} has an unexpected text structure. Skipping.")
             return
+        job_title, company = card['Job Title'], card['Company']
 
         # Detail Extraction
         job_description = ''
-        salary = ''
         url = ''
         
         try:
             job_element.click()
 
-            # Extract description/salary
+            # Extract description
             try:
                 try:
                     details = self.page.get_by_role('heading', name = 'About the job').locator('..').locator('..')
@@ -309,20 +384,7 @@ class LinkedInScraper:
                     self.logger.warning('Cannot verify if the job is reposted or not. ')
 
                 if desc_text != '':
-                    job_description = '\n'.join([line for line in desc_text.split('\n') if line.strip()])
-                    # Salary extraction logic
-                    salary = []
-                    salary_lines = job_description.split('\n')
-                    for line in salary_lines:
-                        if ('$' not in line) & ('CAD' not in line):
-                            continue
-                        sentences = line.split('. ')
-                        for sentence in sentences:
-                            if ('$' in sentence or 'CAD' in sentence) & (' raise' not in sentence):
-                                sentence = sentence.strip()
-                                if len(sentence) < 100:
-                                    salary.append(sentence)
-                    salary = ' | '.join(salary)
+                    job_description = clean_description(desc_text)
             except Exception:
                 self.logger.debug(f"Could not extract description details for {job_title} at {company}.")
 
@@ -336,38 +398,57 @@ class LinkedInScraper:
             self.logger.warning(f"Interaction failed for {job_title} at {company}")
             return
 
+        # Salary: the card repeats LinkedIn's pay-range pill (e.g. 'CA$90K/yr - CA$110K/yr') below the title
+        pill = job_text.split('\n\n', 1)[1] if '\n\n' in job_text else ''  # No separator: no pill, not the title
+        spans = salary_spans(job_description, pill=pill, title=job_title)
+        salary = salary_text(spans)
+
         # Store Data
-        self.job_list.append({
-            'Job Title': job_title,
-            'Company': company,
-            'Location': location,
-            'Posted Time': posted_time,
-            'Posted Ago': posted_ago,
-            'Reposted': reposted,
-            'Salary': salary,
-            'URL': url,
-            'Job Description': job_description
-        })
+        self.jobs.append(card, reposted=reposted, salary=salary, url=url, job_description=job_description)
+        tracing.set_attributes(
+            job_id=url, bytes=len(job_description), has_salary=bool(salary),
+            salary_source=spans[0].source if spans else None
+        )
         self.logger.info(f"Successfully scraped: {job_title} at {company}")
 
-    def save_to_csv(self, filepath: Path, search): 
+    def save_to_csv(self, filepath: Path, search, user: str = None, csv_export: bool = True, users: list = None):
         """
-        Persists the collected job list to a CSV file.
+        Persists the collected job list to the columnar job store and the full-text index,
+        and optionally to a CSV file.
         
         Args:
-            filepath (Path): The directory path to save the file.
-            search (Dict): Search parameters to construct the filename.
+            filepath (Path): The directory path to save the CSV file.
+            search (Dict): Search parameters to construct the filename and store partition.
+            user (str): User name recorded with each row in the job store.
+            csv_export (bool): If True, also writes the legacy per-run CSV file.
+            users (list): Users sharing this search (multi-user runs). Replaces user: the jobs are
+                stored once per user, and indexed without a user, which each user's matcher sets.
         """
-        if not self.job_list:
+        if not self.jobs:
             self.logger.warning("No jobs were collected. Skipping CSV generation.")
             return
         
+        df = self.jobs.to_frame()
+        try:
+            store = JobStore()
+            for name in users or [user]:
+                store.append(df, 'JOB_POSTS', keyword=search['keyword'], user=name)
+        except Exception as e:
+            self.logger.error(f"Failed to append jobs to the job store: {e}")
+        try:
+            with JobIndex() as index:
+                index.add(df, keyword=search['keyword'], user=None if users else user)
+        except Exception as e:
+            self.logger.error(f"Failed to add jobs to the search index: {e}")
+
+        if not csv_export:
+            return df
+
         current_date = datetime.now().strftime("%Y%m%d")
         filepath = Path(filepath / f"{current_date}_{search['keyword']}_{search['city']}_{search['period']}.csv")
-        self.logger.info(f"Saving {len(self.job_list)} jobs to {filepath}...")
+        self.logger.info(f"Saving {len(self.jobs)} jobs to {filepath}...")
         
         try:
-            df = pd.DataFrame(self.job_list)
             df.to_csv(filepath, index=False, encoding='utf-8-sig')
             self.logger.info("File saved successfully.")
             return df
@@ -382,16 +463,38 @@ class LinkedInScraper:
         Args:
             params (dict): Run configuration loaded from YAML.
         """
+        try:
+            self.start_browser(headless=params['headless'], enable_tracing=params['tracing'],
+                               trace_window=params['trace_window'], trace_sample_rate=params['trace_sample_rate'])
+        except Exception as e:
+            self.logger.critical(f"Unexpected error: {e}", exc_info=True)
+            return None
+        return self.scrape(params)
+
+    def scrape(self, params, users: list = None):
+        """
+        Runs one search on the already started browser and returns the scraped jobs.
+
+        Used directly by the scheduler daemon, which keeps one browser context warm
+        across runs instead of launching Chromium every time.
+
+        Args:
+            params (dict): Run configuration loaded from YAML.
+            users (list): Users sharing this search, stored in place of params['user_name'] (see save_to_csv).
+        """
         try:
             search = params['search']
-            self.logger.info(f"Starting task for [{params['user_name']}]: {search['keyword']} in {search['city']}")
-            self.start_browser(headless=params['headless'], enable_tracing=params['tracing'])
+            self.logger.info(f"Starting task for [{', '.join(users or [params['user_name']])}]: {search['keyword']} in {search['city']}")
+            self.jobs.clear()  # A warm scraper must not carry jobs over from the previous run
+            # Fresh from the saved state, which other runs (e.g. another user's) may have updated
+            self.pacer = PacingController.from_params(params) if params['pacing']['enabled'] else None
             self.sign_in()
             self.search_jobs(search['keyword'], search['city'])
             self.filter_period(search['period'])
             self.set_distance(search['distance'])
             self.scrape_available_jobs(params['max_page'])
-            result = self.save_to_csv(JD_DIR, search)
+            result = self.save_to_csv(JD_DIR, search, user=params['user_name'], csv_export=params.get('csv_export', True),
+                                      users=users)
             # result = self.filter_eligible_jobs(OUTPUT_DIR, params)
             self.logger.info("Task completed successfully.")
             return result
@@ -402,12 +505,27 @@ class LinkedInScraper:
             self.logger.critical(f"Unexpected error: {e}", exc_info=True)
             return None
 
+    def is_healthy(self) -> bool:
+        """
+        Checks that the browser context and page are still usable (not closed or crashed).
+        """
+        if not self.context or not self.page or self.page.is_closed():
+            return False
+        try:
+            self.page.evaluate("1")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Browser health check failed: {e}")
+            return False
+
     def close(self, trace_path: str = "trace.zip"):
         """
         Gracefully terminates the browser context and stops the Playwright engine.
         """
         self.logger.info("Closing browser resources.")
         if self.context:
+            if self.chunk_tracer:
+                self.chunk_tracer.close()
             if self.is_tracing:
                 self.context.tracing.stop(path=trace_path)
                 self.logger.info(f"Trace saved to {trace_path}")
@@ -416,6 +534,8 @@ class LinkedInScraper:
             self.context.close()
         if self.playwright:
             self.playwright.stop()
+        self.playwright = self.context = self.page = self.chunk_tracer = None
+        self.is_tracing = False
 
 # if __name__ == '__main__':
 #     setup_logging()
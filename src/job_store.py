@@ -0,0 +1,252 @@
+import os
+import uuid
+import logging
+import urllib.parse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+from utils.file_path import STORE_DIR
+
+# Low-cardinality columns stored as dictionaries (one copy of each distinct value per row group).
+DICTIONARY_COLUMNS = ['Company', 'Location', 'User', 'Currency', 'Tier']
+# Long free-text columns get the stronger codec; everything else stays on the fast default.
+TEXT_COLUMNS = ['Job Description', 'Reasoning', 'URL', 'Salary']
+PARTITION_COLUMNS = ['Date', 'Keyword']
+
+_STRING = pa.string()
+_DICT = pa.dictionary(pa.int32(), pa.string())
+
+COLUMN_TYPES = {
+    'Job Title': _STRING,
+    'Company': _DICT,
+    'Location': _DICT,
+    'Posted Time': pa.timestamp('ms'),
+    'Posted Ago': _STRING,
+    'Reposted': pa.bool_(),
+    'Salary': _STRING,
+    'URL': _STRING,
+    'Job Description': _STRING,
+    'Min Salary': pa.float64(),
+    'Max Salary': pa.float64(),
+    'Currency': _DICT,
+    'Recommend Apply': pa.bool_(),
+    'Match Score': pa.float64(),
+    'Reasoning': _STRING,
+    'Missing Skills': _STRING,
+    'Local Score': pa.float64(),
+    'Remote Score': pa.float64(),
+    'Tier': _DICT,
+    'User': _DICT,
+}
+
+# Mirrors the Supabase destinations so the same table names work locally and remotely.
+TABLES = {
+    'JOB_POSTS': [
+        'Job Title', 'Company', 'Location', 'Posted Time', 'Posted Ago', 'Reposted',
+        'Salary', 'URL', 'Job Description', 'User'
+    ],
+    'MATCH_OUTPUT': [
+        'Job Title', 'Company', 'Location', 'Posted Ago', 'Min Salary', 'Max Salary', 'Currency',
+        'Recommend Apply', 'Match Score', 'Reasoning', 'Missing Skills',
+        'URL', 'Posted Time', 'Salary', 'Reposted', 'Job Description', 'User',
+        'Local Score', 'Remote Score', 'Tier'
+    ],
+}
+
+# Keyword lives only in the directory name, so it costs nothing on disk; loaders expose it as a category.
+_PARTITION_SCHEMA = pa.schema([('Date', pa.string()), ('Keyword', pa.string())])
+_PARTITIONING = ds.partitioning(_PARTITION_SCHEMA, flavor='hive')
+
+
+def _as_text(value) -> Optional[str]:
+    """Normalizes a cell to a string, joining list values (e.g. missing skills) with commas."""
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(v) for v in value)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def _to_arrow(df: pd.DataFrame, columns: List[str]) -> pa.Table:
+    """
+    Converts a pipeline DataFrame to an Arrow table with the store's fixed schema.
+    Missing columns are written as nulls so every file in a table shares one schema.
+    """
+    arrays = []
+    fields = []
+    for col in columns:
+        col_type = COLUMN_TYPES[col]
+        if col in df.columns:
+            series = df[col]
+        else:
+            series = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+        if pa.types.is_timestamp(col_type):
+            array = pa.array(pd.to_datetime(series, errors='coerce'), from_pandas=True).cast(col_type)
+        elif pa.types.is_floating(col_type):
+            array = pa.array(pd.to_numeric(series, errors='coerce'), type=col_type, from_pandas=True)
+        elif pa.types.is_boolean(col_type):
+            array = pa.array(series.astype('boolean'), type=col_type, from_pandas=True)
+        else:
+            array = pa.array([_as_text(v) for v in series], type=pa.string())
+            if pa.types.is_dictionary(col_type):
+                array = array.dictionary_encode()
+        arrays.append(array)
+        fields.append(pa.field(col, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class JobStore:
+    """
+    Append-only columnar store for scraped and scored jobs.
+
+    Each write becomes a new Parquet file under a hive-style partition:
+        STORE_DIR / <table> / Date=<YYYY-MM-DD> / Keyword=<keyword> / part-*.parquet
+    Readers project columns and prune partitions, so history scans only touch
+    the bytes they need instead of re-parsing every daily CSV.
+    """
+
+    def __init__(self, root: Path = STORE_DIR):
+        """
+        Args:
+            root (Path): Base directory of the store. Created lazily on first write.
+        """
+        self.root = Path(root)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _table_dir(self, table: str) -> Path:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table '{table}'. Valid options: {list(TABLES)}")
+        return self.root / table
+
+    def append(self, df: pd.DataFrame, table: str, keyword: str, date: str = None, user: str = None) -> Optional[Path]:
+        """
+        Appends a batch of jobs as a new file in the (date, keyword) partition.
+
+        Args:
+            df: Jobs to persist. The frame is not modified.
+            table (str): One of TABLES ('JOB_POSTS' or 'MATCH_OUTPUT').
+            keyword (str): Search keyword, used as the second partition level.
+            date (str): Partition date as 'YYYY-MM-DD'. Defaults to today.
+            user (str): Optional user name stored alongside each row.
+
+        Returns:
+            Path: The written file, or None if there was nothing to write.
+        """
+        table_dir = self._table_dir(table)
+        if df is None or df.empty:
+            self.logger.warning(f"No rows to append to {table}. Skipping.")
+            return None
+
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        if user is not None and 'User' not in df.columns:
+            df = df.assign(User=user)
+
+        arrow_table = _to_arrow(df, TABLES[table])
+        partition = table_dir / f"Date={date}" / f"Keyword={urllib.parse.quote(str(keyword), safe='')}"
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"part-{datetime.now().strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+
+        self._write(arrow_table, path)
+        self.logger.info(f"Appended {arrow_table.num_rows} rows to {table} ({path.stat().st_size / 1024:.1f} KB).")
+        return path
+
+    @staticmethod
+    def _write(arrow_table: pa.Table, path: Path):
+        pq.write_table(
+            arrow_table,
+            path,
+            use_dictionary=[c for c in DICTIONARY_COLUMNS if c in arrow_table.column_names],
+            compression={c: ('zstd' if c in TEXT_COLUMNS else 'snappy') for c in arrow_table.column_names},
+        )
+
+    def rewrite(self, table: str, transform: Callable[[pd.DataFrame], Optional[pd.DataFrame]]) -> int:
+        """
+        Rewrites a table file by file, e.g. to backfill a column.
+
+        Args:
+            table (str): One of TABLES.
+            transform: Gets one file's rows and returns the rows to write back, or None to
+                leave the file untouched. Files are replaced atomically, keeping their partition.
+
+        Returns:
+            int: The number of files rewritten.
+        """
+        table_dir = self._table_dir(table)
+        if not table_dir.exists():
+            return 0
+        rewritten = 0
+        for path in sorted(table_dir.rglob('*.parquet')):
+            df = transform(pq.read_table(path, partitioning=None).to_pandas())
+            if df is None:
+                continue
+            tmp = path.with_suffix('.parquet.tmp')
+            self._write(_to_arrow(df, TABLES[table]), tmp)
+            os.replace(tmp, path)
+            rewritten += 1
+        if rewritten:
+            self.logger.info(f"Rewrote {rewritten} files of {table}.")
+        return rewritten
+
+    def dataset(self, table: str) -> Optional[ds.Dataset]:
+        """
+        Opens a table as a pyarrow dataset, or returns None if nothing was written yet.
+        """
+        table_dir = self._table_dir(table)
+        if not table_dir.exists():
+            return None
+        schema = pa.schema([pa.field(c, COLUMN_TYPES[c]) for c in TABLES[table]] + list(_PARTITION_SCHEMA))
+        return ds.dataset(table_dir, format='parquet', partitioning=_PARTITIONING, schema=schema)
+
+    def load(self, table: str, columns: List[str] = None, start_date: str = None,
+             end_date: str = None, keywords: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Reads a projection of a table, pruning partitions by date and keyword.
+
+        Args:
+            table (str): One of TABLES.
+            columns (List[str]): Columns to read (partition columns allowed). Defaults to all.
+            start_date (str): Inclusive lower bound, 'YYYY-MM-DD'.
+            end_date (str): Inclusive upper bound, 'YYYY-MM-DD'.
+            keywords (Iterable[str]): Restrict to these search keywords.
+
+        Returns:
+            pd.DataFrame: The matching rows. Empty if the table does not exist yet.
+        """
+        dataset = self.dataset(table)
+        if dataset is None:
+            return pd.DataFrame(columns=columns or TABLES[table] + PARTITION_COLUMNS)
+
+        expr = None
+        if start_date:
+            expr = ds.field('Date') >= start_date
+        if end_date:
+            cond = ds.field('Date') <= end_date
+            expr = cond if expr is None else expr & cond
+        if keywords:
+            cond = ds.field('Keyword').isin(list(keywords))
+            expr = cond if expr is None else expr & cond
+
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+        if 'Keyword' in df.columns:
+            df['Keyword'] = df['Keyword'].astype('category')
+        return df
+
+    def partitions(self, table: str) -> pd.DataFrame:
+        """
+        Lists the (Date, Keyword) partitions of a table with their file counts.
+        """
+        dataset = self.dataset(table)
+        if dataset is None:
+            return pd.DataFrame(columns=PARTITION_COLUMNS + ['Files'])
+        rows = []
+        for fragment in dataset.get_fragments():
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            rows.append({'Date': keys.get('Date'), 'Keyword': keys.get('Keyword')})
+        if not rows:
+            return pd.DataFrame(columns=PARTITION_COLUMNS + ['Files'])
+        return pd.DataFrame(rows).value_counts().rename('Files').reset_index().sort_values(PARTITION_COLUMNS)
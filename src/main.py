@@ -3,15 +3,11 @@ from pathlib import Path
 from utils.logger import setup_logging
 from utils.config_loader import get_run_parameters
 from utils.file_path import CONFIG_DIR
-from job_filter import filter_eligible_jobs
-from job_scraper import LinkedInScraper
-from data_uploader import upload_table_to_supabase
-from salary_parser import SalaryParser
-from deepseek_jd_resume_matcher import DeepseekMatcher
+from utils import tracing, metrics
 import logging
 from datetime import datetime
 
-def CareerCopilot(config_name):
+def CareerCopilot(config_name, scraper=None):
     # Set up logging
     setup_logging(logging.INFO)
     logger = logging.getLogger(__name__)
@@ -19,59 +15,142 @@ def CareerCopilot(config_name):
 
     # Load config
     params = get_run_parameters(CONFIG_DIR / config_name)
+    tracing.tracer.configure(profile=params['profile'], profiler=params['profiler'])
+
+    with tracing.run('CareerCopilot', config=str(config_name), user=params['user_name']):
+        return _run_pipeline(params, scraper, logger)
+
+def _run_pipeline(params, scraper, logger):
+    # Stage modules pull in Playwright, openai, tiktoken, ollama, PyMuPDF and supabase;
+    # they are imported here so `import main` (and cli.py) stays cheap.
+    from job_scraper import LinkedInScraper
+    from data_uploader import upload_table_to_supabase, start_background_sync
+
+    # Upload sync: drains the local outbox (including rows left over from earlier runs) in the background
+    sync_worker = start_background_sync()
+    exporter = metrics.start_exporter(params['metrics'])
 
-    # Linkedin Scrapper
-    try:
-        scraper = LinkedInScraper()
-        df = scraper.run(params) # Filtered jobs
-        scraper.close()
-    except Exception as e:
-        logger.error(f"Application crashed at Linkedin Scrapper: {e}")
-        sys.exit(1)
-    
-    # DataUploader
     try:
-        upload_table_to_supabase(df, params, destination = 'JOB_POSTS')
-    except Exception as e:
-        logger.error(f"Unable to upload data to Supabase. Skipping.")
+        # Linkedin Scrapper (the scheduler daemon passes in a scraper whose browser is already running)
+        try:
+            with tracing.stage('scrape') as span:
+                if scraper is not None:
+                    df = scraper.scrape(params)
+                else:
+                    scraper = LinkedInScraper()
+                    df = scraper.run(params) # Filtered jobs
+                    scraper.close()
+                span.set(jobs=0 if df is None else len(df))
+        except Exception as e:
+            logger.error(f"Application crashed at Linkedin Scrapper: {e}")
+            sys.exit(1)
+
+        # DataUploader
+        try:
+            with tracing.stage('queue_job_posts'):
+                upload_table_to_supabase(df, params, destination = 'JOB_POSTS', sync = False)
+            sync_worker.trigger()
+        except Exception as e:
+            logger.error(f"Unable to queue data for Supabase: {e}. Skipping.")
+
+        df = process_user_jobs(df, params, sync_worker)
+    finally:
+        sync_worker.stop() # Anything not yet delivered stays in the outbox for the next run
+        if exporter:
+            exporter.stop()
+
+    return df
+
+def process_user_jobs(df, params, sync_worker=None):
+    """
+    Runs the per-user stages on scraped jobs: filter, salary parsing, resume matching,
+    market analytics, and queueing MATCH_OUTPUT for upload. Exits on a failed stage.
+
+    Match results are queued in small batches while matching runs; sync_worker (if given)
+    is woken up for each batch so they reach Supabase within seconds.
+
+    Shared by CareerCopilot and the multi-user runner, which calls it in worker processes.
+    """
+    from job_filter import filter_eligible_jobs
+    from data_uploader import upload_table_to_supabase
+    from salary_parser import SalaryParser
+    from deepseek_jd_resume_matcher import DeepseekMatcher
+    from market_analytics import update_market_analytics
+    from budget_governor import BudgetGovernor
+    logger = logging.getLogger(__name__)
 
     # Job Filter
     try:
-        df = filter_eligible_jobs(df, params)
+        with tracing.stage('filter', jobs_in=len(df)) as span:
+            df = filter_eligible_jobs(df, params)
+            span.set(jobs_out=len(df))
     except Exception as e:
         logger.error(f"Application crashed at Linkedin Scrapper: {e}")
         sys.exit(1)
 
     # Salary Parser
     try:
-        parser = SalaryParser(model_name="llama3.1")
-        parser.process_df(df)
+        with tracing.stage('salary', jobs=len(df)):
+            parser = SalaryParser(model_name="llama3.1")
+            parser.process_df(df)
     except Exception as e:
         logger.error(f"Application crashed at Salary Parser: {e}")
         sys.exit(1)
 
-    # Resume-JD Matcher
+    # Resume-JD Matcher (jobs deferred by an earlier run's daily API budget go first)
+    governor = BudgetGovernor.from_params(params)
+    df = governor.take_deferred(df, params['user_name'], params['search']['keyword'])
+    eligible = df
+
+    def publish(part):
+        upload_table_to_supabase(part, params, destination = 'MATCH_OUTPUT', sync = False)
+        if sync_worker is not None:
+            sync_worker.trigger()
+
     try:
-        matcher = DeepseekMatcher()
-        current_date = datetime.now().strftime("%Y%m%d") # For filename
-        df = matcher.process_job_data(
-            df = df,
-            resume = params['resume'],
-            job_type = params['job_type'],
-            current_salary = params['current_salary'],
-            filename = f"{current_date}_{params['user_name']}_{params['search']['keyword']}.csv"
-        )
+        with tracing.stage('match', jobs=len(df)):
+            matcher = DeepseekMatcher(governor=governor)
+            current_date = datetime.now().strftime("%Y%m%d") # For filename
+            df = matcher.process_job_data(
+                df = df,
+                resume = params['resume'],
+                job_type = params['job_type'],
+                current_salary = params['current_salary'],
+                filename = f"{current_date}_{params['user_name']}_{params['search']['keyword']}.csv",
+                keyword = params['search']['keyword'],
+                user = params['user_name'],
+                csv_export = params['csv_export'],
+                resume_token_budget = params['resume_token_budget'],
+                max_jobs = params['api_budget']['max_jobs'],
+                max_tokens = params['api_budget']['max_tokens'],
+                cascade = params['cascade'],
+                company_list = params['company_list'],
+                publish = publish
+            )
     except Exception as e:
         logger.error(f"Application crashed at Resume-JD Matcher: {e}")
         sys.exit(1)
+    finally:
+        governor.close()
+    if df is None:
+        logger.error("Application crashed at Resume-JD Matcher: matching aborted.")
+        sys.exit(1)
+
+    # Market Analytics (match output drops Location/Currency, so they are joined back from the eligible jobs)
+    try:
+        with tracing.stage('analytics'):
+            update_market_analytics(df.join(eligible.reindex(columns=['Location', 'Currency'])), params)
+    except Exception as e:
+        logger.error(f"Unable to update market analytics: {e}. Skipping.")
 
     # DataUploader
     try:
-        upload_table_to_supabase(df, params, destination = 'MATCH_OUTPUT')
+        with tracing.stage('queue_match_output'):
+            upload_table_to_supabase(df, params, destination = 'MATCH_OUTPUT', sync = False)
     except Exception as e:
-        logger.error(f"Unable to upload data to Supabase. Skipping.")
+        logger.error(f"Unable to queue data for Supabase: {e}. Skipping.")
 
     return df
 
 if __name__ == '__main__':
-    CareerCopilot(config_name="config_arron.yaml")
\ No newline at end of file
+    CareerCopilot(config_name="config_arron.yaml")
@@ -0,0 +1,361 @@
+import re
+import sqlite3
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+from utils.file_path import ANALYTICS_PATH
+from job_index import job_key
+
+# Common spellings that should count as the same skill.
+SKILL_ALIASES = {
+    'k8s': 'kubernetes',
+    'gcp': 'google cloud',
+    'google cloud platform': 'google cloud',
+    'amazon web services': 'aws',
+    'ml': 'machine learning',
+    'nlp': 'natural language processing',
+    'llm': 'llms',
+    'large language models': 'llms',
+    'genai': 'generative ai',
+    'gen ai': 'generative ai',
+    'tf': 'tensorflow',
+    'postgres': 'postgresql',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'ci/cd pipelines': 'ci/cd',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS salary_facts (
+    job_key TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    city TEXT,
+    company TEXT,
+    currency TEXT,
+    salary REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_salary_city ON salary_facts(keyword, city);
+CREATE INDEX IF NOT EXISTS idx_salary_company ON salary_facts(keyword, company);
+
+CREATE TABLE IF NOT EXISTS posting_facts (
+    job_key TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    match_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_posting_date ON posting_facts(keyword, date);
+
+CREATE TABLE IF NOT EXISTS skill_index (
+    skill TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (skill, job_key)
+);
+CREATE INDEX IF NOT EXISTS idx_skill_job ON skill_index(job_key);
+
+CREATE TABLE IF NOT EXISTS salary_summary (
+    key TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    p25 REAL, p50 REAL, p75 REAL, min REAL, max REAL
+);
+CREATE TABLE IF NOT EXISTS volume_daily (
+    key TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    date TEXT NOT NULL,
+    postings INTEGER NOT NULL,
+    high_match INTEGER NOT NULL,
+    avg_score REAL
+);
+CREATE TABLE IF NOT EXISTS skill_frequency (
+    key TEXT PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    label TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    share REAL NOT NULL
+);
+"""
+
+# Summary table -> (Supabase destination, DataFrame column names)
+DESTINATIONS = {
+    'salary_summary': ('MARKET_SALARY', {
+        'key': 'Key', 'keyword': 'Keyword', 'dimension': 'Dimension', 'value': 'Value', 'currency': 'Currency',
+        'jobs': 'Jobs', 'p25': 'P25', 'p50': 'P50', 'p75': 'P75', 'min': 'Min', 'max': 'Max'}),
+    'volume_daily': ('MARKET_VOLUME', {
+        'key': 'Key', 'keyword': 'Keyword', 'date': 'Posting Date', 'postings': 'Postings',
+        'high_match': 'High Match', 'avg_score': 'Avg Score'}),
+    'skill_frequency': ('MARKET_SKILLS', {
+        'key': 'Key', 'keyword': 'Keyword', 'skill': 'Skill', 'label': 'Label', 'jobs': 'Jobs', 'share': 'Share'}),
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """Lower-cases, trims punctuation and applies SKILL_ALIASES so variants count together."""
+    skill = re.sub(r'\s+', ' ', str(skill)).strip(' .;:-*"\'').lower()
+    skill = re.sub(r'\s*\(.*?\)$', '', skill)  # "Kubernetes (K8s)" -> "kubernetes"
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def split_skills(value) -> List[str]:
+    """Splits a 'Missing Skills' cell (list or comma-separated string) into raw skill labels."""
+    if isinstance(value, (list, tuple)):
+        items = value
+    elif isinstance(value, str):
+        items = value.split(',')
+    else:
+        return []
+    return [str(s).strip() for s in items if str(s).strip()]
+
+
+def city_of(location: str) -> str:
+    """'Toronto, ON (Hybrid)' -> 'Toronto'."""
+    if not isinstance(location, str) or not location.strip():
+        return 'Unknown'
+    return re.sub(r'\(.*?\)', '', location).split(',')[0].strip() or 'Unknown'
+
+
+def annual_salary(min_salary, max_salary) -> float:
+    """Representative annual salary of a posting: the range midpoint, or the only bound given."""
+    low = pd.to_numeric(min_salary, errors='coerce')
+    high = pd.to_numeric(max_salary, errors='coerce')
+    low = low if pd.notna(low) and low > 0 else None
+    high = high if pd.notna(high) and high > 0 else None
+    if low and high:
+        return (low + high) / 2
+    return low or high or np.nan
+
+
+class MarketAnalytics:
+    """
+    Incrementally maintained market summaries built from scored jobs.
+
+    Every batch from process_job_data is folded into per-job fact tables
+    (salary, posting, missing skill -> job). Only the groups touched by the batch
+    are recomputed: salary percentiles by keyword, city and company, daily posting
+    volume, and missing-skill frequencies. The dashboard reads the small summary
+    tables instead of scanning and re-splitting raw match output.
+    """
+
+    def __init__(self, path: Path = ANALYTICS_PATH):
+        """
+        Args:
+            path (Path): SQLite file holding facts and summaries. Created on first use.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.conn = sqlite3.connect(self.path, timeout=30)  # per-user workers may write concurrently
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, df: pd.DataFrame, keyword: str, date: str = None) -> Dict[str, pd.DataFrame]:
+        """
+        Folds a batch of scored jobs into the facts and refreshes the affected summaries.
+
+        Args:
+            df: Output of DeepseekMatcher.process_job_data.
+            keyword (str): Search keyword of the batch.
+            date (str): Run date 'YYYY-MM-DD'. Defaults to today.
+
+        Returns:
+            Dict[str, pd.DataFrame]: The refreshed summary rows per summary table.
+        """
+        if df is None or df.empty:
+            return {}
+        date = date or pd.Timestamp.now().strftime('%Y-%m-%d')
+
+        salary_rows, posting_rows, skill_rows = [], [], []
+        groups: Set[Tuple[str, str, str]] = set()
+        skills_touched: Set[str] = set()
+        keys = []
+        for record in df.to_dict('records'):
+            key = job_key(record.get('URL'), record.get('Job Title', ''), record.get('Company', ''), record.get('Location', ''))
+            keys.append(key)
+            score = pd.to_numeric(record.get('Match Score'), errors='coerce')
+            posting_rows.append((key, date, keyword, None if pd.isna(score) else float(score)))
+
+            salary = annual_salary(record.get('Min Salary'), record.get('Max Salary'))
+            if pd.notna(salary):
+                currency = record.get('Currency') if isinstance(record.get('Currency'), str) else 'CAD'
+                city, company = city_of(record.get('Location')), str(record.get('Company', '')).strip()
+                salary_rows.append((key, date, keyword, city, company, currency, float(salary)))
+                groups.update({('keyword', keyword, currency), ('city', city, currency), ('company', company, currency)})
+
+            for label in split_skills(record.get('Missing Skills')):
+                skill = normalize_skill(label)
+                if skill:
+                    skill_rows.append((skill, key, keyword, label))
+                    skills_touched.add(skill)
+
+        placeholders = ', '.join('?' * len(keys))
+        with self.conn:
+            # Groups a re-scored job used to belong to must be recomputed too.
+            for city, company, currency in self.conn.execute(
+                f"SELECT city, company, currency FROM salary_facts WHERE job_key IN ({placeholders})", keys
+            ).fetchall():
+                groups.update({('keyword', keyword, currency), ('city', city, currency), ('company', company, currency)})
+            skills_touched.update(r[0] for r in self.conn.execute(
+                f"SELECT DISTINCT skill FROM skill_index WHERE job_key IN ({placeholders})", keys
+            ))
+            postings_before = self._postings(keyword)
+
+            # First-seen date wins so reruns do not move a posting between days.
+            self.conn.executemany(
+                "INSERT INTO posting_facts VALUES (?, ?, ?, ?) ON CONFLICT(job_key) DO UPDATE SET match_score = excluded.match_score",
+                posting_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO salary_facts VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(job_key) DO UPDATE SET "
+                "city = excluded.city, company = excluded.company, currency = excluded.currency, salary = excluded.salary",
+                salary_rows
+            )
+            # A re-scored job replaces its previous skill gaps.
+            self.conn.execute(f"DELETE FROM skill_index WHERE job_key IN ({placeholders})", keys)
+            self.conn.executemany("INSERT OR IGNORE INTO skill_index VALUES (?, ?, ?, ?)", skill_rows)
+
+            dates = {r[0] for r in self.conn.execute(
+                f"SELECT DISTINCT date FROM posting_facts WHERE job_key IN ({placeholders})", keys
+            )}
+            refreshed = {
+                'salary_summary': self._refresh_salary(keyword, groups),
+                'volume_daily': self._refresh_volume(keyword, dates),
+                'skill_frequency': self._refresh_skills(keyword, skills_touched, postings_before),
+            }
+        self.logger.info(
+            f"Market analytics updated: {len(salary_rows)} salaries, {len(skill_rows)} skill gaps, "
+            f"{sum(len(v) for v in refreshed.values())} summary rows refreshed."
+        )
+        return refreshed
+
+    def _refresh_salary(self, keyword: str, groups: Iterable[Tuple[str, str, str]]) -> pd.DataFrame:
+        rows = []
+        for dimension, value, currency in groups:
+            column = {'keyword': 'keyword', 'city': 'city', 'company': 'company'}[dimension]
+            salaries = np.array([r[0] for r in self.conn.execute(
+                f"SELECT salary FROM salary_facts WHERE keyword = ? AND {column} = ? AND currency = ?",
+                (keyword, value, currency)
+            )])
+            if salaries.size == 0:
+                continue
+            p25, p50, p75 = np.percentile(salaries, [25, 50, 75])
+            rows.append((f"{keyword}|{dimension}|{value}|{currency}", keyword, dimension, value, currency,
+                         int(salaries.size), p25, p50, p75, salaries.min(), salaries.max()))
+        self.conn.executemany("INSERT OR REPLACE INTO salary_summary VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return self._fetch('salary_summary', [r[0] for r in rows])
+
+    def _refresh_volume(self, keyword: str, dates: Iterable[str]) -> pd.DataFrame:
+        dates = list(dates)
+        if not dates:
+            return self._fetch('volume_daily', [])
+        rows = self.conn.execute(
+            f"SELECT keyword || '|' || date, keyword, date, COUNT(*), SUM(match_score >= 80), AVG(match_score) "
+            f"FROM posting_facts WHERE keyword = ? AND date IN ({', '.join('?' * len(dates))}) GROUP BY date",
+            [keyword] + dates
+        ).fetchall()
+        self.conn.executemany("INSERT OR REPLACE INTO volume_daily VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return self._fetch('volume_daily', [r[0] for r in rows])
+
+    def _postings(self, keyword: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM posting_facts WHERE keyword = ?", (keyword,)).fetchone()[0]
+
+    def _refresh_skills(self, keyword: str, skills: Iterable[str], postings_before: int = None) -> pd.DataFrame:
+        """
+        Recounts the touched skills. When the keyword gained postings, every skill's share
+        is rescaled to the new total too, so untouched skills do not keep a stale denominator.
+        """
+        skills = list(skills)
+        postings = self._postings(keyword)
+        rescale = postings_before is not None and postings != postings_before
+        total = postings or 1
+        if not skills and not rescale:
+            return self._fetch('skill_frequency', [])
+        placeholders = ', '.join('?' * len(skills))
+        # Most common original spelling becomes the display label.
+        counts = self.conn.execute(
+            f"SELECT skill, COUNT(DISTINCT job_key), "
+            f"(SELECT label FROM skill_index s2 WHERE s2.skill = s.skill AND s2.keyword = s.keyword "
+            f" GROUP BY label ORDER BY COUNT(*) DESC LIMIT 1) "
+            f"FROM skill_index s WHERE keyword = ? AND skill IN ({placeholders}) GROUP BY skill",
+            [keyword] + skills
+        ).fetchall()
+        found = {skill for skill, _, _ in counts}
+        self.conn.executemany(
+            "DELETE FROM skill_frequency WHERE key = ?", [(f"{keyword}|{s}",) for s in skills if s not in found]
+        )
+        rows = [(f"{keyword}|{skill}", keyword, skill, label, jobs, jobs / total) for skill, jobs, label in counts]
+        self.conn.executemany("INSERT OR REPLACE INTO skill_frequency VALUES (?, ?, ?, ?, ?, ?)", rows)
+        if rescale:
+            self.conn.execute("UPDATE skill_frequency SET share = jobs * 1.0 / ? WHERE keyword = ?", (total, keyword))
+            keys = [r[0] for r in self.conn.execute("SELECT key FROM skill_frequency WHERE keyword = ?", (keyword,))]
+            return self._fetch('skill_frequency', keys)
+        return self._fetch('skill_frequency', [r[0] for r in rows])
+
+    def _fetch(self, table: str, keys: List[str]) -> pd.DataFrame:
+        if not keys:
+            return pd.read_sql_query(f"SELECT * FROM {table} WHERE 0", self.conn)
+        return pd.read_sql_query(
+            f"SELECT * FROM {table} WHERE key IN ({', '.join('?' * len(keys))})", self.conn, params=keys
+        )
+
+    def summary(self, table: str, keyword: str = None) -> pd.DataFrame:
+        """Reads a whole summary table, optionally for one keyword."""
+        if table not in DESTINATIONS:
+            raise ValueError(f"Unknown summary table '{table}'. Valid options: {list(DESTINATIONS)}")
+        if keyword is None:
+            return pd.read_sql_query(f"SELECT * FROM {table}", self.conn)
+        return pd.read_sql_query(f"SELECT * FROM {table} WHERE keyword = ?", self.conn, params=[keyword])
+
+    def jobs_for_skill(self, skill: str, keyword: str = None) -> List[str]:
+        """Returns the job keys whose missing skills include `skill` (any spelling)."""
+        sql, args = "SELECT job_key FROM skill_index WHERE skill = ?", [normalize_skill(skill)]
+        if keyword:
+            sql += " AND keyword = ?"
+            args.append(keyword)
+        return [r[0] for r in self.conn.execute(sql, args)]
+
+
+def update_market_analytics(df: pd.DataFrame, params: dict, upload: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Pipeline stage run after process_job_data: refreshes local summaries and queues the
+    changed summary rows for Supabase (MARKET_SALARY, MARKET_VOLUME, MARKET_SKILLS).
+
+    Args:
+        df: Scored jobs.
+        params (dict): Run configuration.
+        upload (bool): If True, queue refreshed rows in the upload outbox.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Refreshed summary rows keyed by Supabase destination.
+    """
+    with MarketAnalytics() as analytics:
+        refreshed = analytics.update(df, keyword=params['search']['keyword'])
+
+    out = {}
+    for table, frame in refreshed.items():
+        destination, columns = DESTINATIONS[table]
+        out[destination] = frame.rename(columns=columns)
+
+    if upload:
+        # Imported here so the offline dashboard can read DESTINATIONS without supabase installed
+        from data_uploader import upload_table_to_supabase
+        for destination, frame in out.items():
+            if not frame.empty:
+                upload_table_to_supabase(frame, params, destination=destination, key_column='Key', sync=False)
+    return out
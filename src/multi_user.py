@@ -0,0 +1,152 @@
+import os
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from utils.logger import setup_logging
+from utils.config_loader import get_run_parameters
+from utils.file_path import CONFIG_DIR
+from pathlib import Path
+from utils import tracing, metrics
+
+SearchKey = Tuple[str, str, str, int]
+
+
+def search_key(params: dict) -> SearchKey:
+    """
+    Identifies a LinkedIn search. Configs with the same key get the same job cards,
+    so the search only needs to be scraped once for all of them.
+    """
+    search = params['search']
+    return (
+        search['keyword'].strip().lower(),
+        search['city'].strip().lower(),
+        search['period'],
+        int(search['distance']),
+    )
+
+
+def group_by_search(params_by_config: Dict[str, dict]) -> Dict[SearchKey, List[str]]:
+    """Groups config names by their search key, keeping the order they were given in."""
+    groups: Dict[SearchKey, List[str]] = {}
+    for name, params in params_by_config.items():
+        groups.setdefault(search_key(params), []).append(name)
+    return groups
+
+
+def _init_worker():
+    setup_logging(logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _process_user(config_name: str, df):
+    """Worker-process entry point: runs one user's stages on a shared scrape."""
+    from main import process_user_jobs
+    params = get_run_parameters(CONFIG_DIR / config_name)
+    tracing.tracer.configure(profile=params['profile'], profiler=params['profiler'])
+    # Per-user metrics file; the endpoint (if any) belongs to the parent process
+    metrics.reset()
+    exporter = metrics.start_exporter({**params['metrics'], 'port': None}, name=Path(config_name).stem)
+    try:
+        with tracing.run('user', config=config_name, user=params['user_name']):
+            result = process_user_jobs(df, params)
+    finally:
+        if exporter:
+            exporter.stop()
+    return 0 if result is None else len(result)
+
+
+def run_multi_user(config_names: List[str], max_workers: int = None) -> Dict[str, int]:
+    """
+    Runs CareerCopilot for many users, scraping each distinct search only once.
+
+    1. Configs are grouped by search (keyword, city, period, distance).
+    2. Each distinct search is scraped once on a single browser, with the largest
+       max_page in its group, then stored and queued to JOB_POSTS under each user's name.
+    3. Every user's filter, salary parsing and matching runs in a process pool on a
+       copy of their search's jobs. DeepSeek spend is bounded per user by the
+       `api_budget` section of their config.
+
+    Args:
+        config_names (List[str]): Config files in CONFIG_DIR, one per user.
+        max_workers (int): Worker processes. Defaults to min(users, CPU count).
+
+    Returns:
+        Dict[str, int]: Matched job count per config, or -1 if that user's run failed.
+    """
+    from job_scraper import LinkedInScraper
+    from data_uploader import upload_table_to_supabase, start_background_sync
+    logger = logging.getLogger('MultiUser')
+
+    params_by_config = {name: get_run_parameters(CONFIG_DIR / name) for name in config_names}
+    groups = group_by_search(params_by_config)
+    logger.info(f"{len(config_names)} configs share {len(groups)} distinct searches.")
+
+    sync_worker = start_background_sync()
+    exporter = metrics.start_exporter(params_by_config[config_names[0]]['metrics'], name='multi_user')
+    results: Dict[str, int] = {}
+    try:
+        scraped = {}
+        scraper = LinkedInScraper()
+        first = params_by_config[config_names[0]]
+        scraper.start_browser(headless=first['headless'], enable_tracing=first['tracing'],
+                              trace_window=first['trace_window'], trace_sample_rate=first['trace_sample_rate'])
+        try:
+            for key, names in groups.items():
+                members = [params_by_config[n] for n in names]
+                shared = dict(members[0])
+                shared['max_page'] = max(p['max_page'] for p in members)
+                shared['csv_export'] = any(p['csv_export'] for p in members)
+                users = [p['user_name'] for p in members]
+                with tracing.stage('scrape', users=len(names), keyword=shared['search']['keyword']) as span:
+                    df = scraper.scrape(shared, users=users)
+                    span.set(jobs=0 if df is None else len(df))
+                if df is None or df.empty:
+                    logger.warning(f"No jobs scraped for {key}. Skipping {', '.join(names)}.")
+                    results.update({n: -1 for n in names})
+                    continue
+                scraped[key] = df
+                try:
+                    # Queued under each user's own name, as separate single-user runs would
+                    for member in members:
+                        upload_table_to_supabase(df, member, destination='JOB_POSTS', sync=False)
+                    sync_worker.trigger()
+                except Exception as e:
+                    logger.error(f"Unable to queue data for Supabase: {e}. Skipping.")
+        finally:
+            scraper.close()
+
+        jobs = [(name, scraped[key]) for key, names in groups.items() if key in scraped for name in names]
+        workers = max_workers or max(1, min(len(jobs), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(_process_user, name, df): name for name, df in jobs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                    logger.info(f"{name}: {results[name]} jobs matched.")
+                except (Exception, SystemExit) as e:
+                    # process_user_jobs exits on a failed stage; only that user's run is lost.
+                    results[name] = -1
+                    logger.error(f"{name} failed: {e!r}")
+    finally:
+        sync_worker.stop()
+        if exporter:
+            exporter.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run CareerCopilot for several users with shared scraping.")
+    parser.add_argument('configs', nargs='+', help="Config files in config/, one per user.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes for per-user stages.")
+    args = parser.parse_args()
+
+    _init_worker()
+    results = run_multi_user(args.configs, args.workers)
+    for name, count in results.items():
+        print(f"{name:<40}{'failed' if count < 0 else count}")
+
+
+if __name__ == '__main__':
+    main()
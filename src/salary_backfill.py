@@ -0,0 +1,103 @@
+"""
+Re-extracts the Salary column of stored jobs with the salary span extractor (utils.job_text).
+
+Covers the daily CSVs in data/job_posts/ and data/output/ and both job store tables. Rows
+where the extractor finds nothing keep their old value. Min/Max Salary are not recomputed;
+run parse-salary on a file to refresh them.
+
+    python src/salary_backfill.py --dry-run
+    python src/salary_backfill.py --csv data/job_posts/2026*.csv --no-store
+"""
+
+import os
+import sys
+import logging
+import argparse
+import pandas as pd
+from pathlib import Path
+from typing import Iterable, List, Tuple
+from utils.job_text import extract_salary_column
+from utils.file_path import JD_DIR, OUTPUT_DIR
+from utils.logger import setup_logging
+from job_store import JobStore, TABLES
+
+logger = logging.getLogger('SalaryBackfill')
+
+
+def backfill_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, dict]:
+    """
+    Returns df with the Salary column re-extracted from 'Job Description' and 'Job Title', and counts:
+    'rows', 'changed' (Salary differs), 'found' (had no salary, has one now) and 'kept' (the
+    extractor found nothing, old value kept).
+    """
+    old = df['Salary'].fillna('').astype(str) if 'Salary' in df.columns else pd.Series('', index=df.index)
+    new = extract_salary_column(df['Job Description'], df.get('Job Title'))
+    salary = new.where(new != '', old)
+    stats = {
+        'rows': len(df),
+        'changed': int((salary != old).sum()),
+        'found': int(((old == '') & (new != '')).sum()),
+        'kept': int(((old != '') & (new == '')).sum()),
+    }
+    return df.assign(Salary=salary), stats
+
+
+def _add(total: dict, stats: dict):
+    for key, value in stats.items():
+        total[key] = total.get(key, 0) + value
+
+
+def backfill_csvs(paths: Iterable[Path], dry_run: bool = False) -> dict:
+    """Backfills CSV files in place (atomically). Files without a 'Job Description' column are skipped."""
+    total = {'files': 0}
+    for path in paths:
+        df = pd.read_csv(path, keep_default_na=False)
+        if 'Job Description' not in df.columns:
+            logger.debug(f"{path.name} has no descriptions. Skipping.")
+            continue
+        df, stats = backfill_frame(df)
+        _add(total, stats)
+        if stats['changed'] and not dry_run:
+            tmp = path.with_suffix('.csv.tmp')
+            df.to_csv(tmp, index=False, encoding='utf-8-sig')
+            os.replace(tmp, path)
+            total['files'] += 1
+        logger.info(f"{path.name}: {stats}")
+    return total
+
+
+def backfill_store(store: JobStore, dry_run: bool = False) -> dict:
+    """Backfills both job store tables, rewriting only the files whose Salary changed."""
+    total = {'files': 0}
+
+    def transform(df: pd.DataFrame):
+        df, stats = backfill_frame(df)
+        _add(total, stats)
+        return df if stats['changed'] and not dry_run else None
+
+    for table in TABLES:
+        total['files'] += store.rewrite(table, transform)
+    return total
+
+
+def default_csvs() -> List[Path]:
+    return sorted(JD_DIR.glob('*.csv')) + sorted(OUTPUT_DIR.glob('*.csv'))
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Re-extract the Salary column of stored jobs.")
+    parser.add_argument('--csv', nargs='*', type=Path, default=None,
+                        help="CSV files to backfill. Defaults to data/job_posts/*.csv and data/output/*.csv.")
+    parser.add_argument('--no-store', action='store_true', help="Leave the job store alone.")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would change.")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    report = {'csv': backfill_csvs(args.csv if args.csv is not None else default_csvs(), dry_run=args.dry_run)}
+    if not args.no_store:
+        report['store'] = backfill_store(JobStore(), dry_run=args.dry_run)
+    logger.info(f"{'Dry run: ' if args.dry_run else ''}{report}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import logging
 import pandas as pd
 import ollama
@@ -8,6 +9,7 @@ from typing import Dict, Union
 from utils.logger import setup_logging
 import numpy as np
 from utils.file_path import OUTPUT_DIR
+from utils import tracing, metrics
 
 class SalaryParser:
     """
@@ -15,14 +17,16 @@ class SalaryParser:
     using a local Large Language Model (LLM).
     """
 
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, host: str = None):
         """
         Initializes the SalaryParser with a specific LLM model.
 
         Args:
             model_name (str): The name of the Ollama model to use (e.g., 'llama3.1').
+            host (str): Ollama server URL. Defaults to OLLAMA_HOST or the local Ollama server.
         """
         self.model = model_name
+        self.client = ollama.Client(host=host) if host else ollama
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def parse(self, raw_text: str) -> Dict[str, Union[int, str]]:
@@ -58,21 +62,33 @@ class SalaryParser:
         "{raw_text}"
         """
 
-        try:
-            # Inference using Ollama with temperature 0 for deterministic results
-            response = ollama.chat(
-                model=self.model,
-                messages=[{'role': 'user', 'content': prompt}],
-                format='json', 
-                options={'temperature': 0}
+        with tracing.span('salary', kind='job', model=self.model, bytes=len(str(raw_text))):
+            start = time.perf_counter()
+            try:
+                # Inference using Ollama with temperature 0 for deterministic results
+                response = self.client.chat(
+                    model=self.model,
+                    messages=[{'role': 'user', 'content': prompt}],
+                    format='json', 
+                    options={'temperature': 0}
+                )
+            except Exception as e:
+                metrics.record_llm_call('ollama', 'salary', time.perf_counter() - start, status='error')
+                self.logger.warning(f"Error parsing '{raw_text}': {e}")
+                return {"min": 0, "max": 0, "currency": "Error"}
+
+            metrics.record_llm_call(
+                'ollama', 'salary', time.perf_counter() - start,
+                prompt_tokens=response.get('prompt_eval_count') or 0,
+                completion_tokens=response.get('eval_count') or 0,
             )
-            
-            content = response['message']['content']
-            return json.loads(content)
+            try:
+                content = response['message']['content']
+                return json.loads(content)
 
-        except Exception as e:
-            self.logger.warning(f"Error parsing '{raw_text}': {e}")
-            return {"min": 0, "max": 0, "currency": "Error"}
+            except Exception as e:
+                self.logger.warning(f"Error parsing '{raw_text}': {e}")
+                return {"min": 0, "max": 0, "currency": "Error"}
 
     def process_file(self, filename: str):
         """
@@ -113,7 +129,8 @@ class SalaryParser:
             self.logger.info(f"Processing salary data.")
             
             # Apply parsing logic across the 'Salary' column
-            salary_data = df['Salary'].apply(lambda x: pd.Series(self.parse(x)))
+            # Parsed dicts become one frame at once instead of a Series per row
+            salary_data = pd.DataFrame.from_records([self.parse(x) for x in df['Salary']], index=df.index)
             df[['Min Salary', 'Max Salary', 'Currency']] = salary_data
             
             # Return df
@@ -0,0 +1,343 @@
+import sys
+import json
+import time
+import queue
+import random
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from utils.logger import setup_logging
+from utils.config_loader import get_run_parameters
+from utils.file_path import CONFIG_DIR
+from utils import metrics
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 8765
+HEALTH_INTERVAL = 300  # seconds between browser health checks while idle
+
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+
+_STOP = object()
+
+
+class CronSchedule:
+    """
+    A standard five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Supports '*', lists ('8,12,17'), ranges ('1-5'), steps ('*/15', '9-17/2') and the
+    @hourly/@daily/@weekly/@monthly aliases. Day of week is 0-6 with 0 (or 7) = Sunday.
+    As in cron, when both day fields are restricted a day matches if either does.
+    """
+
+    FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = ALIASES.get(expression.strip(), expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression '{expression}': expected 5 fields.")
+        fields = [self._parse(part, low, high) for part, (low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = parts[2] == '*'
+        self.any_weekday = parts[4] == '*'
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in part.split(','):
+            step = 1
+            if '/' in item:
+                item, step = item.split('/')
+                step = int(step)
+            if item == '*':
+                start, end = low, high
+            elif '-' in item:
+                start, end = map(int, item.split('-'))
+            else:
+                start = end = int(item)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Cron field '{part}' out of range {low}-{high}.")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """Returns the first matching minute strictly after `after`."""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 4)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"Cron expression '{self.expression}' never matches.")
+
+
+class ScheduledSearch:
+    """One config file and when it runs next."""
+
+    def __init__(self, config_name: str, cron: str, jitter_minutes: float):
+        self.config_name = config_name
+        self.schedule = CronSchedule(cron)
+        self.jitter = timedelta(minutes=jitter_minutes)
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+
+    def reschedule(self, now: datetime):
+        # Jitter spreads runs so searches never hit LinkedIn at the same second every day.
+        self.next_run = self.schedule.next_after(now) + self.jitter * random.random()
+
+    def status(self) -> dict:
+        return {
+            'config': self.config_name,
+            'cron': self.schedule.expression,
+            'next_run': self.next_run.isoformat(timespec='seconds') if self.next_run else None,
+            'last_run': self.last_run.isoformat(timespec='seconds') if self.last_run else None,
+        }
+
+
+class SchedulerDaemon:
+    """
+    Runs CareerCopilot for one or more configs on cron schedules with a single warm browser.
+
+    Chromium is launched and signed in once; each scheduled (or triggered) run reuses the
+    same LinkedInScraper context, so a run starts with a search instead of a browser launch.
+    The context is health-checked while idle and before every run, and relaunched if it died.
+
+    Runs always execute on the main thread because the Playwright sync API is bound to the
+    thread that started it. The control socket only enqueues commands:
+
+        run <config.yaml>   queue an immediate run of a config
+        status              JSON with the schedule and browser state
+        stop                finish the current run, close the browser and exit
+    """
+
+    def __init__(self, config_names: List[str], host: str = CONTROL_HOST, port: int = CONTROL_PORT,
+                 health_interval: float = HEALTH_INTERVAL):
+        """
+        Args:
+            config_names (List[str]): Config files in CONFIG_DIR. Each uses its `schedule` section.
+            host (str): Control socket address. Keep it on localhost; the socket is unauthenticated.
+            port (int): Control socket port.
+            health_interval (float): Seconds between browser health checks while idle.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.host, self.port = host, port
+        self.health_interval = health_interval
+        self.commands: queue.Queue = queue.Queue()
+        self.scraper = None
+        self.running: Optional[str] = None
+        self.searches: Dict[str, ScheduledSearch] = {}
+        now = datetime.now()
+        for name in config_names:
+            schedule = get_run_parameters(CONFIG_DIR / name)['schedule']
+            search = ScheduledSearch(name, schedule['cron'], schedule['jitter_minutes'])
+            search.reschedule(now)
+            self.searches[name] = search
+            self.logger.info(f"Scheduled {name} ({schedule['cron']}), next run {search.next_run:%Y-%m-%d %H:%M:%S}")
+        # The single browser is shared, so its options come from the first config.
+        self.browser_params = get_run_parameters(CONFIG_DIR / config_names[0])
+
+    # -- control socket (background thread) --
+
+    def _handle(self, line: str) -> dict:
+        command, _, argument = line.strip().partition(' ')
+        if command == 'run':
+            path = (CONFIG_DIR / argument.strip()).resolve()
+            if not argument.strip() or path.suffix != '.yaml' or path.parent != CONFIG_DIR.resolve() \
+                    or not path.is_file():
+                return {'ok': False, 'error': f"Config not found in {CONFIG_DIR}: '{argument}'"}
+            argument = path.name
+            self.commands.put(argument)
+            return {'ok': True, 'queued': argument}
+        if command == 'status':
+            return {
+                'ok': True,
+                'running': self.running,
+                'browser': 'up' if self.scraper is not None else 'down',
+                'queued': self.commands.qsize(),
+                'searches': [s.status() for s in self.searches.values()],
+            }
+        if command == 'stop':
+            self.commands.put(_STOP)
+            return {'ok': True, 'stopping': True}
+        return {'ok': False, 'error': f"Unknown command '{command}'. Use run/status/stop."}
+
+    def _start_control_server(self) -> socketserver.TCPServer:
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline().decode('utf-8')
+                self.wfile.write((json.dumps(daemon._handle(line)) + "\n").encode('utf-8'))
+
+        socketserver.TCPServer.allow_reuse_address = True
+        server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='SchedulerControl', daemon=True).start()
+        self.logger.info(f"Control socket listening on {self.host}:{self.port}")
+        return server
+
+    # -- browser lifecycle (main thread) --
+
+    def _close_browser(self):
+        if self.scraper is None:
+            return
+        try:
+            self.scraper.close()
+        except Exception as e:
+            self.logger.warning(f"Error while closing browser: {e}")
+        self.scraper = None
+
+    def ensure_browser(self):
+        """Starts the shared browser, or relaunches it if the health check fails."""
+        from job_scraper import LinkedInScraper
+        if self.scraper is not None and self.scraper.is_healthy():
+            return
+        if self.scraper is not None:
+            self.logger.warning("Browser context is unhealthy. Relaunching.")
+            self._close_browser()
+        scraper = LinkedInScraper()
+        try:
+            scraper.start_browser(headless=self.browser_params['headless'], enable_tracing=self.browser_params['tracing'],
+                                  trace_window=self.browser_params['trace_window'],
+                                  trace_sample_rate=self.browser_params['trace_sample_rate'])
+            scraper.sign_in()
+        except Exception:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+            raise
+        self.scraper = scraper
+
+    def _try_browser(self):
+        """ensure_browser that logs a failure instead of raising; the next health check retries."""
+        try:
+            self.ensure_browser()
+        except Exception as e:
+            self.logger.error(f"Browser launch failed: {e!r}. Retrying in {self.health_interval:.0f}s.")
+
+    def run_search(self, config_name: str):
+        """Runs the full pipeline for one config on the shared browser. Never raises."""
+        from main import CareerCopilot
+        self.running = config_name
+        start = time.perf_counter()
+        try:
+            self.ensure_browser()
+            CareerCopilot(config_name, scraper=self.scraper)
+            self.logger.info(f"Run of {config_name} finished in {time.perf_counter() - start:.1f}s")
+        except (Exception, SystemExit) as e:
+            # CareerCopilot exits the process on stage failures; the daemon keeps going.
+            self.logger.error(f"Run of {config_name} failed: {e!r}")
+        finally:
+            self.running = None
+
+    def serve_forever(self):
+        server = self._start_control_server()
+        # One exporter for the daemon's lifetime; counters accumulate across runs
+        exporter = metrics.start_exporter(self.browser_params['metrics'], name='scheduler')
+        try:
+            self._try_browser()
+            while True:
+                now = datetime.now()
+                due = [s for s in self.searches.values() if s.next_run <= now]
+                for search in due:
+                    search.last_run = now
+                    self.run_search(search.config_name)
+                    search.reschedule(datetime.now())
+                if due:
+                    continue
+
+                next_run = min(s.next_run for s in self.searches.values())
+                timeout = min((next_run - now).total_seconds(), self.health_interval)
+                try:
+                    command = self.commands.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    if self.scraper is None or not self.scraper.is_healthy():
+                        if self.scraper is not None:
+                            self.logger.warning("Browser context died while idle. Relaunching.")
+                            self._close_browser()
+                        self._try_browser()
+                    continue
+                if command is _STOP:
+                    self.logger.info("Stop requested.")
+                    break
+                self.run_search(command)
+        except KeyboardInterrupt:
+            self.logger.info("Interrupted.")
+        finally:
+            server.shutdown()
+            server.server_close()
+            self._close_browser()
+            if exporter:
+                exporter.stop()
+
+
+def send_command(command: str, host: str = CONTROL_HOST, port: int = CONTROL_PORT, timeout: float = 5.0) -> dict:
+    """Sends one command to a running daemon and returns its JSON reply."""
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall((command + "\n").encode('utf-8'))
+        reply = conn.makefile('r', encoding='utf-8').readline()
+    return json.loads(reply)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run CareerCopilot searches on a schedule with a warm browser.")
+    parser.add_argument('--host', default=CONTROL_HOST)
+    parser.add_argument('--port', type=int, default=CONTROL_PORT)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('start', help="Start the daemon in the foreground.")
+    p.add_argument('configs', nargs='+', help="Config files in config/, each with a `schedule` section.")
+    p.add_argument('--health-interval', type=float, default=HEALTH_INTERVAL)
+
+    p = sub.add_parser('trigger', help="Run a config now on the running daemon.")
+    p.add_argument('config')
+
+    sub.add_parser('status', help="Show the schedule of the running daemon.")
+    sub.add_parser('stop', help="Stop the running daemon.")
+
+    args = parser.parse_args()
+    if args.command == 'start':
+        setup_logging(logging.INFO)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        SchedulerDaemon(args.configs, args.host, args.port, args.health_interval).serve_forever()
+        return
+
+    command = f"run {args.config}" if args.command == 'trigger' else args.command
+    try:
+        print(json.dumps(send_command(command, args.host, args.port), indent=2))
+    except OSError as e:
+        print(f"Scheduler not reachable on {args.host}:{args.port}: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import random
+import logging
+from datetime import datetime
+from pathlib import Path
+from utils.file_path import PACING_PATH
+from utils import metrics
+
+# Congestion signals and how hard each one backs off: the delay is multiplied by backoff ** value
+SIGNALS = {
+    'slow': 1,  # A card or page took much longer than usual
+    'timeout': 1,  # A selector wait ran out (e.g. the details panel never loaded)
+    'throttled': 2,  # HTTP 429 / LinkedIn's 999 status
+    'challenge': 4,  # Security check, checkpoint or authwall page
+}
+
+
+class PacingController:
+    """
+    AIMD pacing for the scraper's card clicks, with state kept between runs.
+
+    Two knobs are adjusted:
+
+    - delay: seconds between two cards. Each clean card takes `step` off it (additive
+      increase of the click rate); a congestion signal multiplies it by `backoff`.
+    - burst: cards handled back-to-back before a longer `burst_pause`. The scraper drives
+      one page, so this stands in for concurrency: each clean burst allows one more card,
+      a congestion signal halves it.
+
+    Signals are slow cards (latency above `slow_factor` times the running average),
+    timeouts, throttling responses and bot challenges; stronger signals back off harder
+    (see SIGNALS). The state is saved to PACING_PATH after every run, so the next run
+    starts at the rate the last one found sustainable.
+    """
+
+    def __init__(self, min_delay: float = 0.5, max_delay: float = 30.0, step: float = 0.25,
+                 backoff: float = 2.0, max_burst: int = 10, burst_pause: float = 5.0,
+                 slow_factor: float = 3.0, path: Path = PACING_PATH):
+        """
+        Args:
+            min_delay (float): Shortest delay between cards, in seconds.
+            max_delay (float): Longest delay between cards, in seconds.
+            step (float): Seconds taken off the delay after each clean card.
+            backoff (float): Delay multiplier on a congestion signal.
+            max_burst (int): Most cards handled between two burst pauses.
+            burst_pause (float): Pause after each burst, in seconds.
+            slow_factor (float): A card slower than this many times the average counts as 'slow'.
+            path (Path): JSON file holding the state between runs. None = not persisted.
+        """
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.backoff = backoff
+        self.max_burst = max(1, int(max_burst))
+        self.burst_pause = burst_pause
+        self.slow_factor = slow_factor
+        self.path = Path(path) if path else None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.delay = min(max_delay, min_delay * 4)  # Cautious start when there is no saved state
+        self.burst = 1
+        self.latency = None  # Moving average of clean card latency, seconds
+        self.events = {}
+        self._in_burst = 0
+        self._clean_in_burst = 0
+        self._load()
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'PacingController':
+        pacing = params.get('pacing') or {}
+        return cls(**{k: v for k, v in pacing.items() if v is not None and k != 'enabled'})
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            state = json.loads(self.path.read_text(encoding='utf-8'))
+            self.delay = float(state.get('delay', self.delay))
+            self.burst = int(state.get('burst', self.burst))
+            self.latency = state.get('latency')
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable pacing state {self.path}: {e}")
+        # Config bounds may have changed since the state was written
+        self.delay = min(self.max_delay, max(self.min_delay, self.delay))
+        self.burst = min(self.max_burst, max(1, self.burst))
+
+    def save(self):
+        """Writes the current state (atomically) for the next run."""
+        if not self.path:
+            return
+        state = {
+            'delay': round(self.delay, 3),
+            'burst': self.burst,
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.json.tmp')
+            tmp.write_text(json.dumps(state), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not save pacing state to {self.path}: {e}")
+
+    def _publish(self):
+        metrics.set_gauge('pacing_delay_seconds', round(self.delay, 3))
+        metrics.set_gauge('pacing_burst', self.burst)
+
+    def wait(self):
+        """Sleeps before the next card: the delay, or the burst pause once a burst is complete."""
+        if self._in_burst >= self.burst:
+            pause, self._in_burst = self.burst_pause, 0
+        else:
+            pause = self.delay
+        self._in_burst += 1
+        time.sleep(pause * random.uniform(0.8, 1.2))  # Jitter, so clicks do not land on a fixed beat
+
+    def success(self, latency: float):
+        """
+        Records a card that loaded in `latency` seconds. The average follows slow cards too,
+        capped at slow_factor times itself, so a lasting slowdown becomes the new baseline after
+        a few 'slow' signals while a single outlier barely moves it.
+        """
+        if self.latency is None:
+            self.latency = latency
+        else:
+            limit = self.slow_factor * self.latency
+            self.latency = 0.8 * self.latency + 0.2 * min(latency, limit)
+            if latency > limit:
+                self.signal('slow')
+                return
+        self.delay = max(self.min_delay, self.delay - self.step)
+        self._clean_in_burst += 1
+        if self._clean_in_burst >= self.burst:
+            self.burst = min(self.max_burst, self.burst + 1)
+            self._clean_in_burst = 0
+        self._publish()
+
+    def signal(self, reason: str) -> float:
+        """
+        Backs off after a congestion signal (a key of SIGNALS).
+
+        Returns:
+            float: Seconds the caller should cool down before going on (0 unless challenged).
+        """
+        factor = self.backoff ** SIGNALS.get(reason, 1)
+        self.delay = min(self.max_delay, max(self.delay, self.min_delay) * factor)
+        self.burst = 1 if reason == 'challenge' else max(1, self.burst // 2)
+        self._in_burst = self._clean_in_burst = 0
+        self.events[reason] = self.events.get(reason, 0) + 1
+        metrics.inc('pacing_signals_total', reason=reason)
+        self._publish()
+        self.logger.info(f"Pacing backed off ({reason}): delay {self.delay:.2f}s, burst {self.burst}.")
+        return self.max_delay * 2 if reason == 'challenge' else 0.0
+
+    def summary(self) -> dict:
+        return {'delay': round(self.delay, 2), 'burst': self.burst, 'signals': dict(self.events)}
@@ -0,0 +1,227 @@
+import json
+import sqlite3
+import contextvars
+import logging
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from utils.file_path import OUTBOX_PATH
+from utils import tracing
+
+# Compact (VACUUM) once this many acknowledged rows have been removed since the last compaction.
+VACUUM_THRESHOLD = 5000
+# Seconds stop() waits for the final drain; the run ends without it and the rest syncs next run.
+STOP_TIMEOUT = 5.0
+
+
+class UploadOutbox:
+    """
+    Durable local queue of records waiting to be upserted to Supabase.
+
+    Records are keyed by (destination, row_key): enqueuing the same key again replaces
+    the pending payload, so the outbox only ever holds the latest version of a row and
+    every send is an idempotent upsert. Rows are marked acknowledged after a successful
+    send and removed by compact().
+    """
+
+    def __init__(self, path: Path = OUTBOX_PATH):
+        """
+        Args:
+            path (Path): SQLite file backing the outbox. Created on first use.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY,
+                destination TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                key_column TEXT NOT NULL DEFAULT 'URL',
+                hash TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                enqueued_at TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                acked_at TEXT,
+                UNIQUE (destination, row_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(destination, id) WHERE acked_at IS NULL;
+            CREATE TABLE IF NOT EXISTS outbox_meta (key TEXT PRIMARY KEY, value INTEGER);
+            """
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")]
+        if 'key_column' not in columns:  # outboxes created before per-table conflict keys
+            with self.conn:
+                self.conn.execute("ALTER TABLE outbox ADD COLUMN key_column TEXT NOT NULL DEFAULT 'URL'")
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, destination: str, entries: List[Tuple[str, str, dict]], key_column: str = 'URL') -> int:
+        """
+        Adds or replaces pending records.
+
+        Args:
+            destination (str): Target table name.
+            entries: (row_key, content_hash, record) tuples.
+            key_column (str): Upsert conflict column of the destination; row_key is its value.
+
+        Returns:
+            int: Number of records inserted or changed; re-enqueuing an identical pending record counts 0.
+        """
+        now = pd.Timestamp.now().isoformat()
+        rows = [(destination, key, key_column, digest, json.dumps(record, ensure_ascii=False, default=str), now)
+                for key, digest, record in entries]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO outbox (destination, row_key, key_column, hash, payload, enqueued_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(destination, row_key) DO UPDATE SET "
+                "key_column = excluded.key_column, hash = excluded.hash, payload = excluded.payload, enqueued_at = excluded.enqueued_at, "
+                "attempts = 0, last_error = NULL, acked_at = NULL "
+                "WHERE outbox.hash <> excluded.hash OR outbox.acked_at IS NOT NULL",
+                rows
+            )
+            queued = self.conn.total_changes - before
+        return queued
+
+    def pending(self, destination: str = None, limit: int = None) -> List[Dict]:
+        """
+        Returns unacknowledged records in enqueue order.
+
+        Each item has 'id', 'destination', 'row_key', 'key_column', 'hash' and the decoded 'record'.
+        """
+        sql = "SELECT id, destination, row_key, key_column, hash, payload FROM outbox WHERE acked_at IS NULL"
+        args = []
+        if destination:
+            sql += " AND destination = ?"
+            args.append(destination)
+        sql += " ORDER BY id"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [{'id': i, 'destination': d, 'row_key': k, 'key_column': c, 'hash': h, 'record': json.loads(p)}
+                for i, d, k, c, h, p in rows]
+
+    def destinations(self) -> List[str]:
+        with self._lock:
+            rows = self.conn.execute("SELECT DISTINCT destination FROM outbox WHERE acked_at IS NULL").fetchall()
+        return [r[0] for r in rows]
+
+    def ack(self, entries: List[Tuple[int, str]]):
+        """
+        Marks records as delivered. Takes (id, hash) pairs so a row re-enqueued with new
+        content while its old version was in flight stays pending.
+        """
+        now = pd.Timestamp.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET acked_at = ? WHERE id = ? AND hash = ?",
+                [(now, i, h) for i, h in entries]
+            )
+
+    def fail(self, ids: List[int], error: str):
+        """Records a failed delivery attempt; the records stay pending."""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(str(error)[:500], i) for i in ids]
+            )
+
+    def compact(self) -> int:
+        """
+        Deletes acknowledged records and reclaims file space once enough have accumulated.
+
+        Returns:
+            int: Number of records removed.
+        """
+        with self._lock:
+            with self.conn:
+                removed = self.conn.execute("DELETE FROM outbox WHERE acked_at IS NOT NULL").rowcount
+                self.conn.execute(
+                    "INSERT INTO outbox_meta (key, value) VALUES ('removed_since_vacuum', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value", (removed,)
+                )
+                since_vacuum = self.conn.execute(
+                    "SELECT value FROM outbox_meta WHERE key = 'removed_since_vacuum'"
+                ).fetchone()[0]
+            if since_vacuum >= VACUUM_THRESHOLD:
+                self.conn.execute("VACUUM")
+                with self.conn:
+                    self.conn.execute("UPDATE outbox_meta SET value = 0 WHERE key = 'removed_since_vacuum'")
+        if removed:
+            self.logger.debug(f"Compacted outbox: removed {removed} acknowledged records.")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending, acked = self.conn.execute(
+                "SELECT SUM(acked_at IS NULL), SUM(acked_at IS NOT NULL) FROM outbox"
+            ).fetchone()
+        return {'pending': pending or 0, 'acked': acked or 0}
+
+
+class OutboxSyncWorker(threading.Thread):
+    """
+    Background thread that periodically drains the outbox.
+
+    The pipeline only ever writes to the local outbox; this worker does the network
+    work off the critical path. Call trigger() after enqueuing to sync right away,
+    and stop() at the end of a run for a final drain attempt. Whatever is still
+    pending afterwards is picked up by the next run.
+    """
+
+    def __init__(self, drain: Callable[[], dict], interval: float = 30.0):
+        """
+        Args:
+            drain: Callable that sends pending records (e.g. data_uploader.sync_outbox).
+            interval (float): Seconds between drain attempts when not triggered.
+        """
+        super().__init__(name='OutboxSync', daemon=True)
+        self.drain = drain
+        self.interval = interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        # Threads start with empty contextvars; the creator's context puts drains under its span
+        self._context = contextvars.copy_context()
+
+    def trigger(self):
+        self._wake.set()
+
+    def _drain_once(self):
+        try:
+            with tracing.span('sync', kind='sync'):
+                self.drain()
+        except Exception as e:
+            self.logger.warning(f"Outbox sync failed; records stay queued for the next attempt: {e}")
+
+    def run(self):
+        self._context.run(self._loop)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            self._drain_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        self._drain_once()
+
+    def stop(self, timeout: float = STOP_TIMEOUT):
+        """
+        Requests a final drain and waits up to `timeout` seconds for it to finish, so an
+        unreachable Supabase never holds up the end of a run. The daemon thread keeps
+        draining in the background until the process exits.
+        """
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+        if self.is_alive():
+            self.logger.warning("Outbox sync still running at shutdown; remaining records will sync on the next run.")
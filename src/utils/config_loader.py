@@ -81,11 +81,53 @@ def get_run_parameters(config_path: str | Path) -> dict:
         params['headless'] = options.get('headless', False)
         params['tracing'] = options.get('tracing', False)
         params['trace_path'] = options.get('trace_path', 'trace.zip')
+        params['trace_window'] = options.get('trace_window', 5)
+        params['trace_sample_rate'] = options.get('trace_sample_rate', 0.0)
+        params['profile'] = options.get('profile') or []
+        params['profiler'] = options.get('profiler', 'auto')
         params['company_list'] = config_data.get('company_list', [])
         params['repost'] = config_data.get('repost', False)
         params['salary'] = config_data.get('salary', False)
         params['job_type'] = config_data.get('job_type', 'full time')
         params['current_salary'] = config_data.get('job_type', '')
+        params['csv_export'] = config_data.get('csv_export', True)
+        params['resume_token_budget'] = config_data.get('resume_token_budget')
+        budget = config_data.get('api_budget') or {}
+        params['api_budget'] = {
+            'max_jobs': budget.get('max_jobs'),
+            'max_tokens': budget.get('max_tokens'),
+            'daily_tokens': budget.get('daily_tokens'),
+            'daily_usd': budget.get('daily_usd'),
+            'throttle_at': budget.get('throttle_at', 0.8),
+            'max_delay': budget.get('max_delay', 10.0),
+            'pricing': budget.get('pricing') or {},
+            'deferred_max_days': budget.get('deferred_max_days', 3),
+        }
+        pacing = config_data.get('pacing') or {}
+        params['pacing'] = {
+            'enabled': pacing.get('enabled', True),
+            'min_delay': pacing.get('min_delay', 0.5),
+            'max_delay': pacing.get('max_delay', 30.0),
+            'max_burst': pacing.get('max_burst', 10),
+            'burst_pause': pacing.get('burst_pause', 5.0),
+        }
+        metrics_options = config_data.get('metrics') or {}
+        params['metrics'] = {
+            'file': metrics_options.get('file', True),
+            'port': metrics_options.get('port'),
+            'interval': metrics_options.get('interval', 15),
+        }
+        cascade = config_data.get('cascade') or {}
+        params['cascade'] = {
+            'local_model': cascade.get('local_model'),
+            'band': tuple(cascade.get('band') or (50, 85)),
+            'host': cascade.get('host'),
+        }
+        schedule = config_data.get('schedule') or {}
+        params['schedule'] = {
+            'cron': schedule.get('cron', '0 9 * * *'),
+            'jitter_minutes': schedule.get('jitter_minutes', 10),
+        }
         
     except ValueError as e:
         logger.critical(f"Invalid Configuration: {e}")
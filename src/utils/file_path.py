@@ -7,4 +7,12 @@ JD_DIR = DATA_DIR / "job_posts"
 OUTPUT_DIR = DATA_DIR / "output"
 USER_DATA_DIR = PROJECT_ROOT / 'browser_user'
 RESUME_DIR = PROJECT_ROOT / 'data' / 'resumes'
-EXTENSION_DIR = PROJECT_ROOT / 'extension' / '2.19.6_0'
\ No newline at end of file
+EXTENSION_DIR = PROJECT_ROOT / 'extension' / '2.19.6_0'
+STORE_DIR = DATA_DIR / "store"
+INDEX_PATH = DATA_DIR / "jobs.db"
+LEDGER_PATH = DATA_DIR / "upload_ledger.db"
+OUTBOX_PATH = DATA_DIR / "outbox.db"
+ANALYTICS_PATH = DATA_DIR / "analytics.db"
+RESUME_CACHE_DIR = DATA_DIR / "cache" / "resumes"
+BUDGET_PATH = DATA_DIR / "api_budget.db"
+PACING_PATH = DATA_DIR / "scraper_pacing.json"
@@ -0,0 +1,213 @@
+"""
+Pure text parsing for LinkedIn job cards and descriptions.
+
+Kept free of Playwright so the scraper's CPU-side work can be benchmarked and reused
+on stored text (see benchmarks/).
+"""
+
+import re
+import pandas as pd
+from typing import List, NamedTuple, Optional
+
+
+def parse_card_text(job_text: str) -> Optional[dict]:
+    """
+    Parses the inner text of a job card in the search results list.
+
+    Card text is blank-line separated: the title is the last line of the first block,
+    followed by the company and location blocks; posted-time lines contain 'ago',
+    'Posted on' or 'just posted'.
+
+    Returns:
+        dict: 'Job Title', 'Company', 'Location', 'Posted Time', 'Posted Ago',
+        or None if the text does not have the expected structure.
+    """
+    parts = job_text.split('\n\n')
+    if len(parts) < 3:
+        return None
+    job_title = parts[0].split('\n')[-1]
+    company = parts[1]
+    location = parts[2]
+
+    posted_time = None
+    posted_ago = None
+    posted_text = '\n'.join([t for t in parts if 'ago' in t or 'just posted' in t.lower()])
+    for time_text in posted_text.split('\n'):
+        if 'Posted on' in time_text:
+            posted_time = pd.to_datetime(time_text.replace('Posted on ', ''))
+        elif 'ago' in time_text or 'now' in time_text:
+            posted_ago = time_text
+        else:
+            posted_time = None
+            posted_ago = None
+
+    return {
+        'Job Title': job_title.replace('\u00a0', ' '),
+        'Company': company.replace('\u00a0', ' '),
+        'Location': location.replace('\u00a0', ' '),
+        'Posted Time': posted_time,
+        'Posted Ago': posted_ago,
+    }
+
+
+def clean_description(desc_text: str) -> str:
+    """Drops blank lines from the 'About the job' panel text."""
+    return '\n'.join([line for line in desc_text.split('\n') if line.strip()])
+
+
+# 'Posted Ago' card text: '3 hours ago', 'Reposted 2 weeks ago', 'just now'
+_POSTED_AGO = re.compile(r"(\d+)\s*(minute|hour|day|week|month|year)s?", re.IGNORECASE)
+_AGO_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400}
+
+
+def posted_timestamps(posted_time: pd.Series, posted_ago: pd.Series, now: pd.Timestamp = None) -> pd.Series:
+    """
+    When each job was posted: 'Posted Time' where the card gave a date, otherwise now minus
+    the 'Posted Ago' text. NaT where neither can be read.
+    """
+    now = now if now is not None else pd.Timestamp.now()
+    ago = posted_ago.fillna('').astype(str)
+    parts = ago.str.extract(_POSTED_AGO)
+    seconds = pd.to_numeric(parts[0], errors='coerce') * parts[1].str.lower().map(_AGO_SECONDS)
+    seconds = seconds.mask(seconds.isna() & ago.str.contains(r"\bnow\b", case=False), 0)
+    estimated = now - pd.to_timedelta(seconds, unit='s')
+    return pd.to_datetime(posted_time, errors='coerce').fillna(estimated)
+
+
+# Salary spans: one compiled pattern for amounts and ranges in the formats LinkedIn postings use,
+# e.g. '$120,000 - $150,000 CAD', 'CA$179K - CA$314K', '131,000 - 181,000 CAD / Annual',
+# '67 000 $ - 73 500 $', 'CAD 100/hr', '$30-55 /hour', '120-150k'.
+# Atomic: a number never ends right before more of its digits, so '$2.5 million' cannot shrink to '$2'
+_NUMBER = r"(?:\d{1,3}(?:[,.\u00a0\u202f ]\d{3})+(?:[.,]\d{1,2})?|\d+(?:\.\d+)?)(?![.,]?\d)"
+_PREFIX = r"(?:(?:US|CA|CAN|C|A)\s?\$|\$|(?:CAD|USD)\b\s?\$?)"
+_SUFFIX = r"(?:\s?\$|\s?(?:CAD|USD)\b)"
+_PERIOD = (r"(?i:\s?(?:/|per|an|a|par)\s?(?:year|yr|annum|annual|an|hour|hr|h|month|mo)\b"
+           r"|\s(?:annually|yearly|hourly|monthly)\b)")
+_THOUSANDS = r"(?:\s?[kK]\b)"
+# Funding rounds and market sizes ('$25M', '$7-trillion') are not pay
+_NOT_PAY = r"(?!\s?-?(?i:ms?\b|mm\b|bn?\b|tn\b|million|billion|trillion))"
+_AMOUNT = rf"{_NUMBER}{_THOUSANDS}?{_NOT_PAY}\+?"
+_MONEY = rf"(?:{_PREFIX}\s?{_AMOUNT}{_SUFFIX}?|{_AMOUNT}{_SUFFIX}){_PERIOD}?"
+_LOOSE = rf"{_PREFIX}?\s?{_AMOUNT}{_SUFFIX}?{_PERIOD}?"
+_SEPARATOR = r"\s?(?:-|\u2013|\u2014|to|and|\u00e0)\s?"
+
+SALARY_PATTERN = re.compile(
+    rf"{_MONEY}(?:{_SEPARATOR}{_LOOSE})?"  # '$90,000-130,000', '$53,000 and $88,000', 'CAD 100/hr'
+    rf"|{_AMOUNT}{_SEPARATOR}{_MONEY}"  # '131,000 - 181,000 CAD'
+    rf"|{_NUMBER}{_THOUSANDS}?{_SEPARATOR}{_NUMBER}{_THOUSANDS}{_PERIOD}?"  # '120-150k'
+)
+# Lines worth matching at all: str containment for currency signs and codes, and a '150k' test.
+# The letter comes first (digit checked by lookbehind) so re scans for a literal instead of a class.
+_CURRENCY_MARKS = ('$', 'CAD', 'USD')
+_THOUSANDS_HINTS = (re.compile(r"k\b(?<=\dk)|k\b(?<=\d k)"), re.compile(r"K\b(?<=\dK)|K\b(?<=\d K)"))
+
+# Where a span's context stops inside its line: clause ends, but not decimal points
+_BOUNDARY = re.compile(r"[!?;|]|\.(?!\d)")
+_EXCLUDE = re.compile(
+    r"\b(?:raise|stipend|allowance|reimburs|budget|wellness|well-?being|mental health|spending account|tuition|per diem)",
+    re.IGNORECASE
+)
+# Right after a span: '$5,000 per year for health benefits' is a perk, '$120k plus benefits' is pay
+_FOR_PERK = re.compile(r"\s*(?:for|towards?|on)\s+(?:[\w-]+\s+){0,3}?(?:benefits?|perks?)\b", re.IGNORECASE)
+# Spans without a currency mark ('120-150k') only count in a clause that talks about pay
+_CURRENCY_SPAN = re.compile(r"\$|CAD|USD")
+_PAY_WORDS = re.compile(
+    r"\b(?:salary|salaries|pay|paid|compensation|comp|wages?|rate|base|earn\w*|remuneration|ote|package|range)\b"
+    r"|\b(?:salaire|rémunération)",
+    re.IGNORECASE
+)
+_NONZERO = re.compile(r"[1-9]")
+
+CONTEXT_BEFORE = 60
+CONTEXT_AFTER = 40
+SALARY_SOURCES = ('pill', 'title', 'description')
+
+
+class SalarySpan(NamedTuple):
+    """A salary amount or range found in a job's text."""
+    text: str  # The match itself, e.g. '$120,000 - $150,000 CAD'
+    context: str  # The clause around it, what SalaryParser reads
+    source: str  # 'pill' (LinkedIn's pay-range pill on the card), 'title' or 'description'
+    start: int
+    end: int
+
+
+def _may_hold_salary(text: str) -> bool:
+    return any(mark in text for mark in _CURRENCY_MARKS) or any(h.search(text) for h in _THOUSANDS_HINTS)
+
+
+def _context(line: str, start: int, end: int) -> str:
+    """Up to CONTEXT_BEFORE / CONTEXT_AFTER characters of the clause around line[start:end]."""
+    left = max(0, start - CONTEXT_BEFORE)
+    cuts = [m.end() for m in _BOUNDARY.finditer(line, left, start)]
+    if cuts:
+        left = cuts[-1]
+    elif left and line[left - 1] != ' ':
+        left = line.find(' ', left, start) + 1  # Do not start mid-word
+    right = min(len(line), end + CONTEXT_AFTER)
+    cut = _BOUNDARY.search(line, end, right)
+    if cut:
+        right = cut.start()
+    elif right < len(line) and line[right] != ' ':
+        right = max(line.rfind(' ', end, right), end)
+    return line[left:right].strip()
+
+
+def find_salary_spans(text: str, source: str = 'description') -> List[SalarySpan]:
+    """
+    Finds salary amounts and ranges in text.
+
+    Lines without a currency sign, currency code or 'k' amount are skipped by cheap tests;
+    SALARY_PATTERN runs once over each remaining line. A span's context is its clause, cut
+    to CONTEXT_BEFORE / CONTEXT_AFTER characters, so 'The base salary is $120,000 - $150,000
+    CAD.' keeps its wording but not the rest of the paragraph. Spans in pay-raise, stipend,
+    allowance and budget clauses, perks ('... for wellness benefits'), bare 'k' ranges outside
+    a clause about pay ('10-20k users') and amounts of zero are skipped.
+    """
+    spans = []
+    if not text:
+        return spans
+    offset = 0
+    for line in text.split('\n'):
+        if _may_hold_salary(line):
+            for match in SALARY_PATTERN.finditer(line):
+                start, end = match.span()
+                context = _context(line, start, end)
+                if _EXCLUDE.search(context) or not _NONZERO.search(match.group()) or _FOR_PERK.match(line, end):
+                    continue
+                if not _CURRENCY_SPAN.search(match.group()) and not _PAY_WORDS.search(context):
+                    continue
+                spans.append(SalarySpan(match.group().strip(), context, source, offset + start, offset + end))
+        offset += len(line) + 1
+    return spans
+
+
+def salary_spans(description: str = '', pill: str = '', title: str = '') -> List[SalarySpan]:
+    """Spans from the pay-range pill, the title and the description, in that order, without repeats."""
+    spans, seen = [], set()
+    for source, text in zip(SALARY_SOURCES, (pill, title, description)):
+        for span in find_salary_spans(text, source):
+            key = re.sub(r"\s", '', span.text)
+            if key not in seen:
+                seen.add(key)
+                spans.append(span)
+    return spans
+
+
+def salary_text(spans: List[SalarySpan]) -> str:
+    """The Salary column value: the distinct span contexts joined with ' | ', or '' if none."""
+    return ' | '.join(dict.fromkeys(span.context for span in spans))
+
+
+def extract_salary(description: str = '', pill: str = '', title: str = '') -> str:
+    return salary_text(salary_spans(description, pill, title))
+
+
+def extract_salary_column(descriptions: pd.Series, titles: pd.Series = None) -> pd.Series:
+    """extract_salary over whole columns (e.g. to backfill stored jobs), aligned with descriptions."""
+    descriptions = descriptions.fillna('').astype(str)
+    titles = titles.fillna('').astype(str) if titles is not None else pd.Series('', index=descriptions.index)
+    return pd.Series(
+        [extract_salary(description, title=title) for description, title in zip(descriptions, titles)],
+        index=descriptions.index, dtype=object
+    )
@@ -0,0 +1,244 @@
+"""
+Live counters, gauges and latency histograms for CareerCopilot runs, in Prometheus text format.
+
+The matcher, salary parser, scraper and uploader record into the process-wide `registry`.
+While a run is in progress, an exporter rewrites a textfile (data/log/metrics/<name>.prom,
+e.g. for node_exporter's textfile collector) every few seconds. It can also serve the same
+text on http://127.0.0.1:<port>/metrics. Configure both with the `metrics` block of the config.
+
+    careercopilot_llm_requests_total{provider="deepseek",stage="match",status="ok"} 42
+    careercopilot_llm_tokens_total{provider="deepseek",kind="cache_hit"} 43008
+    careercopilot_llm_cost_usd_total{provider="deepseek"} 0.0731
+    careercopilot_llm_latency_seconds_bucket{provider="deepseek",stage="match",le="2.5"} 37
+    careercopilot_cards_per_minute 11.8
+"""
+
+import os
+import bisect
+import logging
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from utils.file_path import LOG_DIR
+
+METRICS_DIR = LOG_DIR / 'metrics'
+PREFIX = 'careercopilot_'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    'llm_requests_total': ('counter', 'LLM calls by provider, stage and outcome.'),
+    'llm_tokens_total': ('counter', 'LLM tokens by provider and kind (prompt, completion, cache_hit).'),
+    'llm_cost_usd_total': ('counter', 'Estimated LLM spend in USD.'),
+    'llm_latency_seconds': ('histogram', 'LLM call latency.'),
+    'cards_total': ('counter', 'Scraped job cards by outcome.'),
+    'cards_per_minute': ('gauge', 'Cards scraped per minute in the current search.'),
+    'upload_rows_total': ('counter', 'Rows delivered to Supabase by destination and outcome.'),
+    'upload_batch_seconds': ('histogram', 'Supabase upsert batch latency, including retries.'),
+    'pacing_delay_seconds': ('gauge', 'Scraper delay between cards set by the pacing controller.'),
+    'pacing_burst': ('gauge', 'Cards the scraper handles back-to-back before a pause.'),
+    'pacing_signals_total': ('counter', 'Congestion signals seen by the scraper pacing controller.'),
+    'budget_used_ratio': ('gauge', "Share of today's API budget used (the larger of tokens and USD)."),
+    'jobs_deferred_total': ('counter', 'Jobs deferred to the next run by the API budget.'),
+    'jobs_deferred_expired_total': ('counter', 'Deferred jobs dropped after api_budget.deferred_max_days.'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format(name: str, labels: Labels, value: float, extra: Tuple[str, str] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    label_text = ','.join(f'{k}="{v}"' for k, v in pairs)
+    return f"{PREFIX}{name}{{{label_text}}} {value:g}" if label_text else f"{PREFIX}{name} {value:g}"
+
+
+class Registry:
+    """Thread-safe metric store. Metrics are created on first use."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, list]] = {}  # [bucket counts..., sum, count]
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.setdefault(_labels(labels), [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge (0 if unset), e.g. for reports."""
+        key = _labels(labels)
+        with self._lock:
+            return self._counters.get(name, self._gauges.get(name, {})).get(key, 0)
+
+    def reset(self):
+        with self._lock:
+            self._counters, self._gauges, self._histograms = {}, {}, {}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, store in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, series in sorted(store.items()):
+                    lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, (kind, name))[1]}")
+                    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                    lines.extend(_format(name, labels, value) for labels, value in sorted(series.items()))
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, ('histogram', name))[1]}")
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for labels, state in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, state):
+                        cumulative += count
+                        lines.append(_format(f"{name}_bucket", labels, cumulative, ('le', f"{bound:g}")))
+                    lines.append(_format(f"{name}_bucket", labels, state[-1], ('le', '+Inf')))
+                    lines.append(_format(f"{name}_sum", labels, round(state[-2], 6)))
+                    lines.append(_format(f"{name}_count", labels, state[-1]))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+_active: Optional['Exporter'] = None
+
+
+def reset():
+    """
+    Clears all metrics and forgets the active exporter. For worker processes: a forked
+    child inherits both, but not the exporter's threads.
+    """
+    global _active
+    registry.reset()
+    _active = None
+
+
+def inc(name: str, value: float = 1, **labels):
+    registry.inc(name, value, **labels)
+
+
+def set_gauge(name: str, value: float, **labels):
+    registry.set(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    registry.observe(name, value, **labels)
+
+
+def record_llm_call(provider: str, stage: str, seconds: float, status: str = 'ok', prompt_tokens: int = 0,
+                    completion_tokens: int = 0, cache_hit_tokens: int = 0, cost: float = 0.0):
+    """Records one LLM call: request count, latency, token counters and estimated cost."""
+    registry.inc('llm_requests_total', provider=provider, stage=stage, status=status)
+    registry.observe('llm_latency_seconds', seconds, provider=provider, stage=stage)
+    for kind, tokens in (('prompt', prompt_tokens), ('completion', completion_tokens), ('cache_hit', cache_hit_tokens)):
+        if tokens:
+            registry.inc('llm_tokens_total', tokens, provider=provider, kind=kind)
+    if cost:
+        registry.inc('llm_cost_usd_total', cost, provider=provider)
+
+
+class Exporter:
+    """
+    Rewrites the textfile every `interval` seconds and optionally serves /metrics until stopped.
+    """
+
+    def __init__(self, name: str, file: bool = True, port: int = None, interval: float = 15,
+                 directory: Path = METRICS_DIR, host: str = '127.0.0.1'):
+        self.path = Path(directory) / f"{name}.prom" if file else None
+        self.interval = interval
+        self.logger = logging.getLogger('Metrics')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        if port:
+            try:
+                self._server = ThreadingHTTPServer((host, int(port)), _handler())
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name='MetricsHTTP', daemon=True).start()
+                self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+            except OSError as e:
+                self.logger.warning(f"Could not serve metrics on port {port}: {e}")
+        if self.path:
+            self._thread = threading.Thread(target=self._loop, name='MetricsFile', daemon=True)
+            self._thread.start()
+
+    def write(self):
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.prom.tmp')
+            tmp.write_text(registry.render(), encoding='utf-8')
+            os.replace(tmp, self.path)  # Atomic, so collectors never read a half-written file
+        except OSError as e:
+            self.logger.debug(f"Could not write metrics to {self.path}: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Writes the final values and stops the file loop and the endpoint."""
+        global _active
+        if _active is self:
+            _active = None
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.write()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def _handler():
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            payload = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+    return Handler
+
+
+def start_exporter(settings: dict, name: str = 'careercopilot') -> Optional[Exporter]:
+    """
+    Starts an Exporter from the config's `metrics` block ({'file', 'port', 'interval'}).
+    Returns None when both outputs are off, or when this process already runs an exporter
+    (e.g. the scheduler daemon's, which then also covers each run).
+    """
+    global _active
+    settings = settings or {}
+    if _active is not None or (not settings.get('file') and not settings.get('port')):
+        return None
+    _active = Exporter(name, file=bool(settings.get('file')), port=settings.get('port'),
+                       interval=settings.get('interval') or 15)
+    return _active
@@ -1,42 +1,197 @@
 import fitz  # PyMuPDF
 import re
+import os
+import json
+import hashlib
 import logging
 import sys
 from pathlib import Path
-from utils.file_path import RESUME_DIR
+from typing import Callable, Dict, List
+from utils.file_path import RESUME_DIR, RESUME_CACHE_DIR
 
-def load_resume_pdf(file_name: str, logger: logging.Logger) -> str:
+# Bump when extraction or sectioning changes so stale cache entries are ignored.
+CACHE_VERSION = 1
+
+# Canonical section -> headings that start it (matched on a line of their own, case-insensitive).
+SECTION_HEADINGS = {
+    'summary': ['summary', 'professional summary', 'profile', 'about me', 'objective', 'career objective'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'relevant experience'],
+    'skills': ['skills', 'technical skills', 'core skills', 'key skills', 'skills & tools', 'skills and tools',
+               'technologies', 'core competencies', 'tools'],
+    'education': ['education', 'academic background', 'education & certifications', 'education and certifications'],
+    'projects': ['projects', 'personal projects', 'selected projects', 'research projects', 'research'],
+    'certifications': ['certifications', 'certificates', 'licenses & certifications'],
+    'publications': ['publications', 'papers'],
+    'awards': ['awards', 'honors', 'honours', 'awards & honors', 'achievements'],
+}
+_HEADING_LOOKUP = {h: section for section, headings in SECTION_HEADINGS.items() for h in headings}
+
+# Order in which sections are kept when the resume must fit a token budget.
+SECTION_PRIORITY = ['skills', 'experience', 'projects', 'summary', 'education', 'certifications',
+                    'publications', 'awards', 'header', 'other']
+
+
+def _normalize(text: str) -> str:
+    """Collapses multiple newlines/spaces into a single space to reduce LLM token usage."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_text(path: Path) -> str:
+    """Extracts raw text, keeping line breaks so headings can be detected."""
+    if path.suffix.lower() in ('.txt', '.md'):
+        return path.read_text(encoding='utf-8')
+    with fitz.open(path) as doc:
+        return "\n\n".join(page.get_text() for page in doc)
+
+
+def split_sections(raw_text: str) -> Dict[str, str]:
     """
-    Loads and extracts text content specifically from a PDF file.
-    
+    Splits resume text into canonical sections by detecting heading lines.
+
+    Text before the first recognised heading is kept as 'header' (name, contact line).
+    Unrecognised content under an unknown heading stays with the previous section.
+
+    Returns:
+        Dict[str, str]: Section name -> whitespace-normalized text.
+    """
+    sections: Dict[str, List[str]] = {}
+    current = 'header'
+    for line in raw_text.splitlines():
+        heading = re.sub(r'[^a-z& ]', '', line.lower()).strip()
+        if heading in _HEADING_LOOKUP and len(line.strip()) <= 40:
+            current = _HEADING_LOOKUP[heading]
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: _normalize('\n'.join(lines)) for name, lines in sections.items() if _normalize('\n'.join(lines))}
+
+
+def load_resume(file_name: str, logger: logging.Logger) -> dict:
+    """
+    Loads a resume with its structured sections, using a cache keyed by file content hash.
+
+    The first call for a given file extracts the text and splits it into sections; later
+    calls (and later runs) read the cached JSON from RESUME_CACHE_DIR without reopening
+    the PDF. Editing the resume changes its hash, which invalidates the cache entry.
+
     Args:
-        file_name (str): The filename of the PDF resume (must be inside RESUME_DIR).
+        file_name (str): The filename of the resume inside RESUME_DIR (PDF, or .txt/.md).
         logger (logging.Logger): The logger instance for recording events.
-        
+
     Returns:
-        str: The cleaned, normalized string content of the PDF.
-             Returns an empty string if the file is invalid or unreadable.
+        dict: {'hash', 'file', 'text', 'sections'}, or an empty dict if the file is invalid or unreadable.
     """
     path = Path(RESUME_DIR / file_name)
-    
-    # Validation: Ensure file exists and has the correct extension
-    if not path.exists() or path.suffix.lower() != ".pdf":
-        logger.error(f"Error: File not found or invalid format (PDF required): {path}")
-        return ""  # Return empty string as per docstring, instead of crashing
+
+    # Validation: Ensure file exists and has a supported extension
+    if not path.exists() or path.suffix.lower() not in (".pdf", ".txt", ".md"):
+        logger.error(f"Error: File not found or invalid format (PDF, .txt or .md required): {path}")
+        return {}
 
     try:
-        text = ""
-        # Open the PDF document
-        with fitz.open(path) as doc:
-            # Iterate through every page to extract raw text
-            for page in doc:
-                text += page.get_text() + "\n\n"
-        
-        # Data Cleaning: Normalize whitespace
-        # Collapses multiple newlines/spaces into a single space to reduce LLM token usage.
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        file_hash = _file_hash(path)
+        cache_path = RESUME_CACHE_DIR / f"{file_hash}.v{CACHE_VERSION}.json"
+        if cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text(encoding='utf-8'))
+                if isinstance(cached, dict) and cached.get('text'):
+                    logger.debug(f"Resume cache hit: {cache_path.name}")
+                    return cached
+                logger.warning(f"Ignoring empty resume cache entry {cache_path.name}.")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable resume cache entry {cache_path.name}: {e}")
+
+        raw_text = _extract_text(path)
+        resume = {
+            'hash': file_hash,
+            'file': path.name,
+            'text': _normalize(raw_text),
+            'sections': split_sections(raw_text),
+        }
+        try:
+            RESUME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix('.json.tmp')
+            tmp.write_text(json.dumps(resume, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp, cache_path)  # Atomic, so a crash never leaves a truncated entry
+        except OSError as e:
+            logger.warning(f"Could not cache resume sections: {e}")
+        logger.info(f"Extracted resume sections: {', '.join(resume['sections'])}")
+        return resume
 
     except Exception as e:
-        logger.error(f"Critical Error: Failed to read PDF file: {e}")
-        return ""
\ No newline at end of file
+        logger.error(f"Critical Error: Failed to read resume file: {e}")
+        return {}
+
+
+def compact_resume(resume: dict, token_budget: int = None, count_tokens: Callable[[str], int] = None) -> str:
+    """
+    Builds the resume text sent to the LLM, keeping the most relevant sections within a token budget.
+
+    Sections are added in SECTION_PRIORITY order; the first one that does not fit is
+    truncated to the remaining budget and everything after it is dropped.
+
+    Args:
+        resume (dict): Output of load_resume.
+        token_budget (int): Maximum tokens for the resume. None sends the full normalized text.
+        count_tokens: Token counter. Defaults to a 4-characters-per-token estimate.
+
+    Returns:
+        str: The compact resume text.
+    """
+    if not resume:
+        return ""
+    if token_budget is None or not resume.get('sections'):
+        return resume.get('text', '')
+
+    count_tokens = count_tokens or (lambda s: len(s) // 4)
+    parts, cut = [], []
+    remaining = token_budget
+    for name in SECTION_PRIORITY:
+        body = resume['sections'].get(name)
+        if not body:
+            continue
+        if cut:
+            cut.append(name)
+            continue
+        block = body if name == 'header' else f"{name.upper()}: {body}"
+        tokens = count_tokens(block)
+        if tokens <= remaining:
+            parts.append(block)
+            remaining -= tokens
+            continue
+        # Truncate on a word boundary, using the block's own chars-per-token ratio.
+        keep_chars = int(len(block) * remaining / max(tokens, 1))
+        if keep_chars > 80:
+            parts.append(block[:keep_chars].rsplit(' ', 1)[0] + " ...")
+            cut.append(f"{name} (truncated)")
+        else:
+            cut.append(name)
+    if cut:
+        logging.getLogger(__name__).warning(
+            f"Resume exceeds resume_token_budget={token_budget}; cut from every match prompt: {', '.join(cut)}. "
+            f"Raise or unset resume_token_budget to send the full resume."
+        )
+    return "\n".join(parts)
+
+
+def load_resume_pdf(file_name: str, logger: logging.Logger) -> str:
+    """
+    Loads and extracts text content specifically from a PDF file.
+
+    Args:
+        file_name (str): The filename of the PDF resume (must be inside RESUME_DIR).
+        logger (logging.Logger): The logger instance for recording events.
+
+    Returns:
+        str: The cleaned, normalized string content of the PDF.
+             Returns an empty string if the file is invalid or unreadable.
+    """
+    return load_resume(file_name, logger).get('text', '')
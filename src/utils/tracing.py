@@ -0,0 +1,238 @@
+"""
+Lightweight spans for CareerCopilot runs.
+
+Spans nest as run > stage > page > job and are appended as JSON lines to
+data/log/<YYYYMMDD>.trace.jsonl, next to the daily text log:
+
+    {"trace": "...", "span": "...", "parent": "...", "kind": "job", "name": "deepseek",
+     "start": "2026-01-28T09:12:03.120", "ms": 2311.4, "status": "ok",
+     "attrs": {"job_id": "...", "total_tokens": 1840, "cache_hit_tokens": 1024}}
+
+Stages can also be profiled (cProfile, or pyinstrument when installed). Pick the stages with
+`options.profile` in the config or the CAREERCOPILOT_PROFILE environment variable
+(comma-separated stage names, or "all").
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from utils.file_path import LOG_DIR
+
+PROFILE_ENV = 'CAREERCOPILOT_PROFILE'
+PROFILE_DIR = LOG_DIR / 'profiles'
+
+_current: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation. Attributes can be added while it is open."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'kind', 'name', 'attrs', 'started', 'start', 'ms', 'status')
+
+    def __init__(self, trace_id: str, parent: Optional['Span'], kind: str, name: str, attrs: dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.started = datetime.now()
+        self.start = time.perf_counter()
+        self.ms = None
+        self.status = 'ok'
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float = 1):
+        """Increments a numeric attribute, e.g. retries or bytes."""
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            'trace': self.trace_id,
+            'span': self.span_id,
+            'parent': self.parent_id,
+            'kind': self.kind,
+            'name': self.name,
+            'start': self.started.isoformat(timespec='milliseconds'),
+            'ms': round(self.ms, 2) if self.ms is not None else None,
+            'status': self.status,
+            'attrs': self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Writes finished spans to the daily trace file and keeps per-run aggregates for the summary table.
+    """
+
+    def __init__(self, log_dir: Path = LOG_DIR):
+        self.log_dir = Path(log_dir)
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.profile_stages = self._parse_profile(os.getenv(PROFILE_ENV, ''))
+        self.profiler = 'auto'
+        self._lock = threading.Lock()
+        self._durations: Dict[tuple, List[float]] = {}
+
+    @staticmethod
+    def _parse_profile(value) -> set:
+        if isinstance(value, str):
+            value = value.split(',')
+        return {v.strip() for v in value or [] if v and v.strip()}
+
+    def configure(self, profile=None, profiler: str = None):
+        """
+        Args:
+            profile: Stage names to profile (list or comma-separated string), or "all".
+                Added to any stages named in CAREERCOPILOT_PROFILE.
+            profiler (str): "cprofile", "pyinstrument", or "auto" (pyinstrument if installed).
+        """
+        self.profile_stages |= self._parse_profile(profile)
+        if profiler:
+            self.profiler = profiler
+
+    def _path(self) -> Path:
+        return self.log_dir / f"{datetime.now().strftime('%Y%m%d')}.trace.jsonl"
+
+    def finish(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str, ensure_ascii=False)
+        with self._lock:
+            self._durations.setdefault((span.kind, span.name), []).append(span.ms)
+            try:
+                with open(self._path(), 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                logging.getLogger('Tracer').debug(f"Could not write span: {e}")
+
+    def reset(self):
+        """Starts a new trace id and clears the aggregates (called at the start of each run)."""
+        with self._lock:
+            self.trace_id = uuid.uuid4().hex[:16]
+            self._durations = {}
+
+    def summary(self) -> str:
+        """Table of wall time per stage, and count/mean/p95/max per page and job span."""
+        with self._lock:
+            durations = {k: sorted(v) for k, v in self._durations.items()}
+        lines = [f"{'kind':<8}{'name':<24}{'count':>7}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        order = {'run': 0, 'stage': 1, 'page': 2, 'job': 3}
+        for (kind, name), values in sorted(durations.items(), key=lambda kv: (order.get(kv[0][0], 9), kv[0][1])):
+            p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+            lines.append(
+                f"{kind:<8}{name[:23]:<24}{len(values):>7}{sum(values) / 1000:>10.1f}"
+                f"{sum(values) / len(values):>10.1f}{p95:>10.1f}{values[-1]:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def should_profile(self, stage: str) -> bool:
+        return 'all' in self.profile_stages or stage in self.profile_stages
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, kind: str = 'job', **attrs):
+    """
+    Times the enclosed block as a child of the current span.
+
+    Yields the Span so attributes can be added with span.set(...) / span.add(...).
+    Exceptions mark the span as an error and propagate.
+    """
+    current = Span(tracer.trace_id, _current.get(), kind, name, attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = 'error'
+        current.attrs['error'] = repr(e)[:200]
+        raise
+    finally:
+        current.ms = (time.perf_counter() - current.start) * 1000
+        _current.reset(token)
+        tracer.finish(current)
+
+
+def set_attributes(**attrs):
+    """Adds attributes to the innermost open span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def add_attribute(key: str, value: float = 1):
+    """Increments a numeric attribute on the innermost open span, if any."""
+    current = _current.get()
+    if current is not None:
+        current.add(key, value)
+
+
+def _profile_path(name: str, suffix: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{name}.{suffix}"
+
+
+@contextmanager
+def _profiled(name: str):
+    logger = logging.getLogger('Tracer')
+    use_pyinstrument = tracer.profiler == 'pyinstrument'
+    if tracer.profiler == 'auto':
+        try:
+            import pyinstrument  # noqa: F401
+            use_pyinstrument = True
+        except ImportError:
+            use_pyinstrument = False
+
+    if use_pyinstrument:
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = _profile_path(name, 'html')
+            path.write_text(profiler.output_html(), encoding='utf-8')
+            logger.info(f"Profile of stage '{name}' saved to {path}")
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = _profile_path(name, 'prof')
+            profiler.dump_stats(path)
+            logger.info(f"Profile of stage '{name}' saved to {path} (view with `python -m pstats` or snakeviz)")
+
+
+@contextmanager
+def stage(name: str, **attrs):
+    """A 'stage' span, profiled when the stage is selected for profiling."""
+    with span(name, kind='stage', **attrs) as current:
+        if tracer.should_profile(name):
+            with _profiled(name):
+                yield current
+        else:
+            yield current
+
+
+@contextmanager
+def run(name: str, **attrs):
+    """The root span of a run. Logs the summary table when the run ends."""
+    tracer.reset()
+    try:
+        with span(name, kind='run', **attrs) as current:
+            yield current
+    finally:
+        logging.getLogger('Tracer').info(f"Run summary (trace {tracer.trace_id}):\n{tracer.summary()}")
@@ -0,0 +1,106 @@
+"""
+Drains the upload outbox through benchmarks/mock_postgrest.py with a real Supabase client.
+
+    python -m pytest tests/test_outbox_sync.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+supabase = pytest.importorskip('supabase')
+
+import data_uploader  # noqa: E402
+from utils import tracing  # noqa: E402
+from upload_outbox import UploadOutbox  # noqa: E402
+from mock_postgrest import MOCK_API_KEY, MockPostgrestServer  # noqa: E402
+
+PARAMS = {'user_name': 'tester', 'search': {'keyword': 'data scientist'}}
+
+
+@pytest.fixture
+def server():
+    with MockPostgrestServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return supabase.create_client(server.url, MOCK_API_KEY)
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_uploader, 'BACKOFF_BASE', 0.0)
+    monkeypatch.setattr(tracing.tracer, 'log_dir', tmp_path)  # keep upsert spans out of data/log
+    return {'outbox_path': tmp_path / 'outbox.db', 'ledger_path': tmp_path / 'ledger.db'}
+
+
+def jobs(n: int, title: str = 'Data Scientist') -> pd.DataFrame:
+    return pd.DataFrame({
+        'Job Title': [f"{title} {i}" for i in range(n)],
+        'Company': ['Acme'] * n,
+        'URL': [f"https://www.linkedin.com/jobs/view/{1000 + i}" for i in range(n)],
+    })
+
+
+def outbox_stats(paths: dict) -> dict:
+    outbox = UploadOutbox(paths['outbox_path'])
+    try:
+        return outbox.stats()
+    finally:
+        outbox.close()
+
+
+def queue(df: pd.DataFrame, paths: dict) -> dict:
+    return data_uploader.upload_table_to_supabase(df, PARAMS, 'JOB_POSTS', sync=False, **paths)
+
+
+def test_sync_acks_and_compacts(server, client, paths):
+    assert queue(jobs(5), paths)['rows_queued'] == 5
+    assert outbox_stats(paths) == {'pending': 5, 'acked': 0}
+
+    report = data_uploader.sync_outbox(client, **paths)
+
+    assert report['rows_sent'] == 5 and report['rows_failed'] == 0
+    assert len(server.state.rows('JOB_POSTS')) == 5
+    assert [row['Destination'] for row in server.state.rows(data_uploader.UPLOAD_STATE_TABLE)] == ['JOB_POSTS']
+    # Acknowledged rows are compacted away and recorded in the ledger, so nothing is queued again
+    assert outbox_stats(paths) == {'pending': 0, 'acked': 0}
+    assert queue(jobs(5), paths)['rows_queued'] == 0
+
+
+def test_sync_retries_transient_errors(server, client, paths):
+    queue(jobs(3), paths)
+    server.state.fail_next(2)
+
+    report = data_uploader.sync_outbox(client, **paths)
+
+    assert report['rows_sent'] == 3
+    assert server.state.stats()['counts']['upsert 503'] == 2
+    assert outbox_stats(paths)['pending'] == 0
+
+
+def test_failed_batches_stay_queued(server, client, paths):
+    queue(jobs(3), paths)
+    server.state.fail_next(data_uploader.MAX_RETRIES + 1)
+
+    report = data_uploader.sync_outbox(client, **paths)
+
+    assert report['rows_failed'] == 3 and report['rows_sent'] == 0
+    assert server.state.rows('JOB_POSTS') == []
+    assert outbox_stats(paths) == {'pending': 3, 'acked': 0}
+
+    # The next sync delivers them; changed content replaces the queued version of a row
+    queue(jobs(3, title='ML Engineer'), paths)
+    report = data_uploader.sync_outbox(client, **paths)
+
+    assert report['rows_sent'] == 3
+    assert sorted(row['Job Title'] for row in server.state.rows('JOB_POSTS')) == [f"ML Engineer {i}" for i in range(3)]
+    assert outbox_stats(paths) == {'pending': 0, 'acked': 0}